@@ -1,12 +1,24 @@
 import logging
+import time
 from unittest.mock import Mock
+from unittest.mock import patch
 
 import fakeredis
 import pytest
+from rest_framework.test import APIClient
 
+from civil_registry.core.api.authentication import VerifiedKeyCache
+from civil_registry.core.circuitbreaker import CircuitBreaker
 from civil_registry.core.middleware.apitrack import APICallTrackingMiddleware
 from civil_registry.core.middleware.requestid import RequestIDMiddleware
+from civil_registry.core.quotas import RedisQuotaTracker
+from civil_registry.core.ratelimit import LocalRateLimiter
 from civil_registry.core.ratelimit import RedisRateLimiter
+from civil_registry.core.ratelimit import local_fallback_limiter
+from civil_registry.core.ratelimit import ratelimit_redis_shards
+from civil_registry.core.ratelimit import redis_circuit_breaker
+from civil_registry.core.tiers import TierCache
+from civil_registry.core.types import RateLimitStorage
 
 
 def pytest_configure():
@@ -68,6 +80,32 @@ def response():
     return res
 
 
+@pytest.fixture
+def api_client(settings):
+    """
+    API client going through the whole middleware stack, RequestIDMiddleware
+    included to attach request_id to requests.
+    """
+    settings.MIDDLEWARE = [
+        *settings.MIDDLEWARE,
+        "civil_registry.core.middleware.requestid.RequestIDMiddleware",
+    ]
+    return APIClient()
+
+
+@pytest.fixture
+def wait_for():
+    """Polls a condition until it holds, e.g. once a listener thread caught up."""
+
+    def wait_for(condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    return wait_for
+
+
 @pytest.fixture
 def fake_redis_server():
     """
@@ -88,8 +126,57 @@ def redis_client(fake_redis_server):
     client.flushall()  # Clear data after each test
 
 
-@pytest.fixture
-def rate_limiter(redis_client):
-    rate_limiter = RedisRateLimiter()
+@pytest.fixture(autouse=True)
+def _reset_rate_limiter_fallback():
+    """Don't carry a tripped breaker or fallback counters across tests."""
+    yield
+    for shard in ratelimit_redis_shards().clients:
+        redis_circuit_breaker(shard).close()
+    local_fallback_limiter.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def tier_cache(redis_client, wait_for):
+    """
+    Rate limit tiers cached and invalidated through fakeredis. Subscribed up
+    front, as subscribing drops whatever was cached before.
+    """
+    tier_cache = TierCache(redis_client)
+    tier_cache.listener.start()
+    wait_for(tier_cache.listener.subscribed.is_set)
+    with patch("civil_registry.core.tiers.tier_cache", return_value=tier_cache):
+        yield tier_cache
+    tier_cache.listener.stop()
+
+
+@pytest.fixture(autouse=True)
+def api_key_cache(redis_client, wait_for):
+    """
+    Verified API keys cached and revoked through fakeredis. Subscribed up
+    front, as subscribing drops whatever was cached before.
+    """
+    api_key_cache = VerifiedKeyCache(redis_client)
+    api_key_cache.listener.start()
+    wait_for(api_key_cache.listener.subscribed.is_set)
+    with patch(
+        "civil_registry.core.api.authentication.api_key_cache",
+        return_value=api_key_cache,
+    ):
+        yield api_key_cache
+    api_key_cache.listener.stop()
+
+
+@pytest.fixture(params=list(RateLimitStorage))
+def rate_limiter(request, redis_client):
+    rate_limiter = RedisRateLimiter(
+        breaker=CircuitBreaker("test", probe=redis_client.ping),
+        fallback=LocalRateLimiter(),
+        storage=request.param,
+    )
     rate_limiter.client = redis_client
     return rate_limiter
+
+
+@pytest.fixture
+def quota_tracker(redis_client):
+    return RedisQuotaTracker(client=redis_client)
@@ -1,3 +1,34 @@
 from django.contrib import admin
 
-# Register your models here.
+from civil_registry.core.models import APIKey
+from civil_registry.core.models import RateLimitTier
+
+
+@admin.register(RateLimitTier)
+class RateLimitTierAdmin(admin.ModelAdmin):
+    list_display = [
+        "name",
+        "priority",
+        "rate_limit",
+        "rate_limit_window",
+        "concurrency_limit",
+        "daily_quota",
+        "monthly_quota",
+        "updated_at",
+    ]
+    search_fields = ["name"]
+    filter_horizontal = ["users", "groups"]
+
+
+@admin.register(APIKey)
+class APIKeyAdmin(admin.ModelAdmin):
+    list_display = ["prefix", "name", "user", "created_at", "expires_at", "revoked"]
+    list_filter = ["revoked"]
+    search_fields = ["prefix", "name", "user__username"]
+    raw_id_fields = ["user"]
+    # Keys are issued through the API, the admin can only revoke them
+    fields = ["prefix", "name", "user", "created_at", "expires_at", "revoked"]
+    readonly_fields = ["prefix", "user", "created_at"]
+
+    def has_add_permission(self, request):
+        return False
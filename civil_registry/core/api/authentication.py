@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from functools import cache as memoize
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authentication import get_authorization_header
+
+from civil_registry.core.pubsub import InvalidationListener
+from civil_registry.core.pubsub import pubsub_client
+from civil_registry.core.utils import md5_text
+
+if TYPE_CHECKING:
+    from redis import StrictRedis
+
+logger = logging.getLogger("core")
+
+
+def _token_cache_key(key: str) -> str:
+    # Never store the raw token in the cache key
+    return f"auth-token:{md5_text(key).hexdigest()}"
+
+
+def invalidate_cached_token(key: str) -> None:
+    """Drops a cached token lookup, e.g. after the token has been revoked."""
+    cache.delete(_token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` backed by a short-TTL cache.
+
+    The ``(user, token)`` pair is cached after the first successful lookup so
+    repeat calls with the same token skip the database. Entries are dropped
+    when the token is deleted or its user is saved (see ``core.signals``), and
+    expire after ``AUTH_TOKEN_CACHE_TIMEOUT`` seconds regardless.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = _token_cache_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is not None:
+            return credentials
+
+        credentials = super().authenticate_credentials(key)
+        cache.set(cache_key, credentials, timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        logger.debug("Cached token credentials for user: %s", credentials[0].pk)
+        return credentials
+
+
+API_KEYS_CHANNEL = "api-keys:revoke"
+
+
+class VerifiedKeyCache:
+    """
+    Per-process LRU of verified API keys and their credentials, holding at
+    most ``max_size`` keys for ``timeout`` seconds each.
+
+    Entries are keyed by the raw key, which never leaves the process, so a
+    hit costs neither a query nor a hash. Revoking a key publishes its prefix
+    on ``API_KEYS_CHANNEL`` and every process drops it.
+    """
+
+    def __init__(
+        self,
+        client: StrictRedis[str],
+        max_size: int = 10_000,
+        timeout: float = 60,
+    ) -> None:
+        self.max_size = max_size
+        self.timeout = timeout
+        self.listener = InvalidationListener(
+            client,
+            API_KEYS_CHANNEL,
+            on_message=self.evict,
+            on_missed=self.clear,
+        )
+        self._entries: OrderedDict[str, tuple[float, tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple | None:
+        self.listener.start()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, credentials = entry
+            if expires_at <= monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return credentials
+
+    def set(self, key: str, credentials: tuple, timeout: float | None = None) -> None:
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        with self._lock:
+            self._entries[key] = (monotonic() + timeout, credentials)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(f"{prefix}.")]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def revoke(self, *prefixes: str) -> None:
+        """Drop keys from every process, call once the change is committed."""
+        for prefix in prefixes:
+            self.evict(prefix)
+            self.listener.publish(prefix)
+
+
+@memoize
+def api_key_cache() -> VerifiedKeyCache:
+    return VerifiedKeyCache(
+        pubsub_client(),
+        max_size=settings.API_KEY_CACHE_SIZE,
+        timeout=settings.API_KEY_CACHE_TIMEOUT,
+    )
+
+
+def revoke_cached_api_keys(*prefixes: str) -> None:
+    api_key_cache().revoke(*prefixes)
+
+
+class APIKeyAuthentication(BaseAuthentication):
+    """
+    Authenticates ``Authorization: Api-Key <prefix>.<secret>`` headers.
+
+    The key is looked up by its indexed prefix and the secret checked against
+    the salted hash. Verified keys are then served from ``api_key_cache``, for
+    ``API_KEY_CACHE_TIMEOUT`` seconds or until they are revoked.
+    """
+
+    keyword = "Api-Key"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:  # noqa: PLR2004
+            msg = "Invalid API key header."
+            raise exceptions.AuthenticationFailed(msg)
+        try:
+            key = auth[1].decode()
+        except UnicodeError as exc:
+            msg = "Invalid API key header."
+            raise exceptions.AuthenticationFailed(msg) from exc
+        return self.authenticate_credentials(key)
+
+    def authenticate_credentials(self, key: str):
+        key_cache = api_key_cache()
+        credentials = key_cache.get(key)
+        if credentials is not None:
+            return credentials
+
+        # Imported late, DRF loads the default authentication classes while
+        # core.models is still importing
+        from civil_registry.core.models import APIKey
+
+        prefix, _, secret = key.partition(".")
+        api_key = (
+            APIKey.objects.select_related("user").filter(prefix=prefix).first()
+            if secret
+            else None
+        )
+        if api_key is None or not api_key.check_secret(secret):
+            msg = "Invalid API key."
+            raise exceptions.AuthenticationFailed(msg)
+        if not api_key.is_usable:
+            msg = "API key revoked or expired."
+            raise exceptions.AuthenticationFailed(msg)
+        if not api_key.user.is_active:
+            msg = "User inactive or deleted."
+            raise exceptions.AuthenticationFailed(msg)
+
+        credentials = (api_key.user, api_key)
+        timeout = None
+        if api_key.expires_at is not None:
+            timeout = (api_key.expires_at - timezone.now()).total_seconds()
+        key_cache.set(key, credentials, timeout=timeout)
+        logger.debug("Cached API key credentials for user: %s", api_key.user_id)
+        return credentials
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,114 @@
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first keyset pagination on ``(ordering_field, pk)``.
+
+    The cursor encodes the position of the last row of the current page, and
+    the next page is fetched with a ``WHERE (timestamp, id) < (...)`` style
+    filter instead of an OFFSET, so every page costs the same index range
+    scan no matter how deep the client paginates.
+    """
+
+    ordering_field = "timestamp"
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.next_position = None
+
+        queryset = queryset.order_by(f"-{self.ordering_field}", "-pk")
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, pk = position
+            queryset = queryset.filter(
+                Q(**{f"{self.ordering_field}__lt": value})
+                | Q(**{self.ordering_field: value, "pk__lt": pk}),
+            )
+
+        # Fetch one extra row to find out whether there is a next page
+        results = list(queryset[: self.page_size + 1])
+        if len(results) > self.page_size:
+            results = results[: self.page_size]
+            last = results[-1]
+            self.next_position = (getattr(last, self.ordering_field), last.pk)
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            value, pk = (
+                urlsafe_b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            )
+            position = (parse_datetime(value), int(pk))
+        except (TypeError, ValueError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        value, pk = position
+        encoded = urlsafe_b64encode(f"{value.isoformat()}|{pk}".encode("ascii"))
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encoded.decode("ascii"),
+        )
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("results", data),
+                ],
+            ),
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
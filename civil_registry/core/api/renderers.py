@@ -0,0 +1,64 @@
+import datetime
+import decimal
+import uuid
+
+import msgpack
+from rest_framework.renderers import BaseRenderer
+from rest_framework.renderers import JSONRenderer
+
+
+def _msgpack_default(obj):
+    """Mirror what DRF's JSON encoder does for types msgpack can't pack."""
+    if isinstance(obj, datetime.datetime | datetime.date | datetime.time):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID | decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, set | frozenset | tuple):
+        return list(obj)
+    msg = f"Object of type {type(obj).__name__} is not MessagePack serializable"
+    raise TypeError(msg)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders responses as MessagePack, a compact binary alternative to JSON."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_msgpack_default)
+
+
+class ColumnarRenderer(BaseRenderer):
+    """
+    Negotiates columnar downloads, which views stream themselves. Anything
+    else that gets rendered, such as errors, falls back to JSON.
+    """
+
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response = renderer_context.get("response")
+        if response is not None:
+            response["Content-Type"] = JSONRenderer.media_type
+        return JSONRenderer().render(
+            data,
+            JSONRenderer.media_type,
+            renderer_context,
+        )
+
+
+class ParquetRenderer(ColumnarRenderer):
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+
+
+class ArrowStreamRenderer(ColumnarRenderer):
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
@@ -0,0 +1,107 @@
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import parse_etags
+from drf_spectacular.authentication import TokenScheme
+from drf_spectacular.contrib.rest_framework_simplejwt import (
+    SimpleJWTStatelessUserScheme,
+)
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from drf_spectacular.plumbing import build_bearer_security_scheme_object
+from drf_spectacular.views import SpectacularAPIView
+
+from civil_registry.core.utils import md5_text
+
+logger = logging.getLogger("core")
+
+
+# The validate views authenticate with their own classes. They read the same
+# header as the defaults, but need components of their own so the schema does
+# not hold two different classes under one name.
+class CachedTokenScheme(TokenScheme):
+    target_class = "civil_registry.core.api.authentication.CachedTokenAuthentication"
+    name = "cachedTokenAuth"
+    priority = 0
+
+
+class JWTStatelessUserScheme(SimpleJWTStatelessUserScheme):
+    name = "jwtStatelessAuth"
+    priority = 1
+
+
+class APIKeyScheme(OpenApiAuthenticationExtension):
+    target_class = "civil_registry.core.api.authentication.APIKeyAuthentication"
+    name = "apiKeyAuth"
+
+    def get_security_definition(self, auto_schema):
+        return build_bearer_security_scheme_object(
+            header_name="Authorization",
+            token_prefix=self.target.keyword,
+        )
+
+
+def schema_file_path(directory: str | Path, renderer) -> Path:
+    return Path(directory) / f"schema.{renderer.format}"
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    ``SpectacularAPIView`` serving a pre-rendered schema.
+
+    Introspecting every view and serializer is slow, so the schema is rendered
+    once per process and kept as bytes, keyed by API version, format and
+    language. If ``API_SCHEMA_DIR`` points to the output of the
+    ``export_schema`` command, the files there are served instead of
+    generating anything at runtime. Responses carry an ETag so pollers get a
+    304 while the schema has not changed.
+    """
+
+    # (version, format, language) -> (content, etag)
+    _rendered: dict[tuple[str | None, str, str | None], tuple[bytes, str]] = {}
+
+    @classmethod
+    def clear_cache(cls):
+        cls._rendered.clear()
+
+    def _get_schema_response(self, request):
+        if not self.serve_public:
+            # The schema depends on the permissions of the requesting user
+            return super()._get_schema_response(request)
+
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+        renderer = request.accepted_renderer
+        cache_key = (version, renderer.format, translation.get_language())
+        if cache_key not in self._rendered:
+            content = self.load_schema(request, renderer, version)
+            self._rendered[cache_key] = (content, f'"{md5_text(content).hexdigest()}"')
+        content, etag = self._rendered[cache_key]
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(content, content_type=renderer.media_type)
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, version)}"'
+            )
+        response["ETag"] = etag
+        return response
+
+    def load_schema(self, request, renderer, version) -> bytes:
+        if settings.API_SCHEMA_DIR and version is None:
+            path = schema_file_path(settings.API_SCHEMA_DIR, renderer)
+            if path.is_file():
+                return path.read_bytes()
+            logger.warning("Precomputed API schema not found: %s", path)
+
+        generator = self.generator_class(
+            urlconf=self.urlconf,
+            api_version=version,
+            patterns=self.patterns,
+        )
+        schema = generator.get_schema(request=request, public=self.serve_public)
+        return renderer.render(schema, renderer_context={"request": request})
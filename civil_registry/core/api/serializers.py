@@ -1,22 +1,30 @@
-from django.core.validators import RegexValidator
+import re
+from typing import Any
+
 from rest_framework import serializers
 
+from civil_registry.core.models import ApiCall
+from civil_registry.core.models import APIKey
+from civil_registry.core.models import BulkJob
 from civil_registry.core.models import EgyptianNationalID
+from civil_registry.core.types import NationalIDResult
+
+# Bulk job inputs are stored one ID per line
+_LINE_UNSAFE = re.compile(r"[\s\x00-\x1f\x7f]")
 
 
 class NationalIDInputSerializer(serializers.Serializer):
-    id_number = serializers.CharField(
-        validators=[
-            RegexValidator(
-                EgyptianNationalID.ID_REGEX,
-                "National ID must be a 14-digit number.",
-            ),
-        ],
-    )
+    id_number = serializers.CharField()
 
     class Meta:
         fields = ["id_number"]
 
+    def validate_id_number(self, value: str) -> str:
+        result = EgyptianNationalID.parse(value)
+        if not result.is_valid:
+            raise serializers.ValidationError(result.detail, code=result.error.value)
+        return result.id_number
+
 
 class NationalIDSerializer(serializers.Serializer):
     is_valid = serializers.SerializerMethodField()
@@ -39,3 +47,128 @@ class NationalIDSerializer(serializers.Serializer):
     def get_is_valid(self, obj: dict):
         detail = obj.get("detail")
         return detail is None or not bool(detail)
+
+
+def national_id_result_data(result: NationalIDResult) -> dict[str, Any]:
+    """
+    Plain ``dict`` rendering of a parse result, shaped like the validate
+    response. Cheaper than a serializer when rendering results one by one.
+    """
+    if not result.is_valid:
+        return {
+            "is_valid": False,
+            "id_number": result.id_number,
+            "detail": result.detail,
+            "error_code": result.error.value,
+        }
+    return {
+        "is_valid": True,
+        "id_number": result.id_number,
+        "birth_date": result.birth_date.isoformat(),
+        "governorate": result.governorate,
+        "gender": result.gender,
+        "detail": "",
+    }
+
+
+class ApiCallSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ApiCall
+        fields = [
+            "id",
+            "timestamp",
+            "request_id",
+            "request_method",
+            "path",
+            "user_id",
+            "status_code",
+            "client_ip",
+            "user_agent",
+            "id_number",
+            "detail",
+            "processing_time",
+        ]
+
+
+class ApiCallFilterSerializer(serializers.Serializer):
+    """Validates the query parameters used to filter ``ApiCall`` records."""
+
+    user_id = serializers.IntegerField(required=False)
+    path = serializers.CharField(required=False)
+    status_code = serializers.IntegerField(required=False)
+    request_id = serializers.UUIDField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    class Meta:
+        fields = ["user_id", "path", "status_code", "request_id", "since", "until"]
+
+
+class APIKeySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = APIKey
+        fields = ["prefix", "name", "created_at", "expires_at", "revoked"]
+        read_only_fields = ["prefix", "created_at", "revoked"]
+
+
+class APIKeyCreatedSerializer(APIKeySerializer):
+    # Only known when the key is issued
+    key = serializers.CharField(read_only=True)
+
+    class Meta(APIKeySerializer.Meta):
+        fields = [*APIKeySerializer.Meta.fields, "key"]
+
+
+class BulkJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BulkJob
+        fields = [
+            "id",
+            "status",
+            "mode",
+            "total",
+            "processed",
+            "valid",
+            "duplicates_within_chunk",
+            "statistics",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+
+
+class BulkJobCreateSerializer(serializers.Serializer):
+    """
+    IDs of a bulk job: an uploaded text file with one per line, a Parquet or
+    Arrow IPC file, or a JSON list.
+    """
+
+    file = serializers.FileField(required=False)
+    column = serializers.CharField(
+        default="id_number",
+        help_text="Column holding the IDs, in a Parquet or Arrow file.",
+    )
+    id_numbers = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+    )
+    mode = serializers.ChoiceField(
+        choices=BulkJob.Mode.choices,
+        default=BulkJob.Mode.RESULTS,
+        help_text="Keep the result of every ID, or only demographic counts.",
+    )
+
+    class Meta:
+        fields = ["file", "column", "id_numbers", "mode"]
+
+    def validate_id_numbers(self, value: list[str]) -> list[str]:
+        if any(_LINE_UNSAFE.search(id_number) for id_number in value):
+            msg = "ID numbers can't contain whitespace or control characters."
+            raise serializers.ValidationError(msg)
+        return value
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        if ("file" in attrs) == ("id_numbers" in attrs):
+            msg = "Send either a file or a list of id_numbers."
+            raise serializers.ValidationError(msg)
+        return attrs
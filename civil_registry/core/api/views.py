@@ -1,27 +1,201 @@
+import csv
+import io
+import json
 import logging
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
 from dataclasses import asdict
+from functools import partial
+from itertools import islice
+from time import time
 from typing import Any
 
+import msgpack
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
 from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.exceptions import Throttled
+from rest_framework.generics import DestroyAPIView
+from rest_framework.generics import ListAPIView
+from rest_framework.generics import ListCreateAPIView
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.permissions import IsAdminUser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 
-from civil_registry.core.exceptions import InvalidBirthDateError
-from civil_registry.core.exceptions import InvalidCenturyDigitError
+from civil_registry.core import bulk
+from civil_registry.core import columnar
+from civil_registry.core.constants import GOVERNORATES_MAPPING_VERSION
+from civil_registry.core.exceptions import InvalidColumnarFileError
+from civil_registry.core.models import ApiCall
+from civil_registry.core.models import APIKey
+from civil_registry.core.models import BulkJob
 from civil_registry.core.models import EgyptianNationalID
+from civil_registry.core.quotas import RedisQuotaTracker
 from civil_registry.core.ratelimit import RedisRateLimiter
+from civil_registry.core.tasks import start_bulk_job
+from civil_registry.core.tiers import get_user_tier
+from civil_registry.core.types import Quota
 from civil_registry.core.types import RateLimit
 from civil_registry.core.types import RateLimitCategory
+from civil_registry.core.types import RequestPriority
 
+from .authentication import APIKeyAuthentication
+from .authentication import CachedTokenAuthentication
+from .pagination import KeysetPagination
+from .parsers import MessagePackParser
+from .renderers import ArrowStreamRenderer
+from .renderers import ColumnarRenderer
+from .renderers import MessagePackRenderer
+from .renderers import ParquetRenderer
+from .serializers import ApiCallFilterSerializer
+from .serializers import ApiCallSerializer
+from .serializers import APIKeyCreatedSerializer
+from .serializers import APIKeySerializer
+from .serializers import BulkJobCreateSerializer
+from .serializers import BulkJobSerializer
 from .serializers import NationalIDInputSerializer
 from .serializers import NationalIDSerializer
+from .serializers import national_id_result_data
 
 logger = logging.getLogger("core")
 
 
-class NationalIDView(APIView):
+class TieredLimitsMixin:
+    """
+    Resolves the limits of a request: those of the user's ``RateLimitTier``
+    where it sets one, else the view's ``rate_limits`` and ``quota``. Tiers
+    come from an in-process cache, see ``core.tiers``.
+    """
+
+    rate_limits: dict[str, dict[RateLimitCategory, RateLimit]]
+    quota: Quota
+
+    def get_rate_limit(
+        self,
+        request: Request,
+        category: RateLimitCategory,
+    ) -> RateLimit | None:
+        # HEAD is a GET without the body, it costs the same
+        method = "GET" if request.method == "HEAD" else request.method
+        default = self.rate_limits.get(method, {}).get(category)
+        tier = get_user_tier(request.user.id)
+        return default if tier is None else tier.get_rate_limit(category, default)
+
+    def get_quota(self, request: Request) -> Quota:
+        tier = get_user_tier(request.user.id)
+        return self.quota if tier is None else tier.get_quota(self.quota)
+
+
+class ConcurrencyLimitMixin(TieredLimitsMixin):
+    """
+    Caps the requests a user has in flight at their ``CONCURRENCY`` limit.
+
+    A slot is taken once the request is authenticated and given back once the
+    view returns, or for a streamed body once it has been sent out. Slots
+    are leased for the limit's window, so one held by a killed worker frees
+    up on its own.
+    """
+
+    concurrency_slot: tuple[str, str | None] | None = None
+
+    def initial(self, request: Request, *args, **kwargs) -> None:
+        super().initial(request, *args, **kwargs)
+        concurrency_limit = self.get_rate_limit(
+            request,
+            RateLimitCategory.CONCURRENCY,
+        )
+        if not concurrency_limit or not concurrency_limit.limit:
+            return
+
+        key: str = f"id-validate:{{{request.user.id}}}"
+        acquired, token = RedisRateLimiter().acquire_slot(
+            key,
+            limit=concurrency_limit.limit,
+            lease=concurrency_limit.window,
+        )
+        if not acquired:
+            logger.debug(
+                "core.api.concurrency-limit.exceeded Key: %s Limit: %s",
+                key,
+                concurrency_limit.limit,
+            )
+            raise Throttled(
+                detail="You have too many requests in progress. Please try again later.",
+            )
+        self.concurrency_slot = (key, token)
+
+    def finalize_response(self, request: Request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.concurrency_slot is not None:
+            key, token = self.concurrency_slot
+            self.concurrency_slot = None
+            release = partial(RedisRateLimiter().release_slot, key, token)
+            if response.streaming:
+                response.streaming_content = _ClosingIterator(
+                    response.streaming_content,
+                    on_close=release,
+                )
+            else:
+                release()
+        return response
+
+
+class _ClosingIterator:
+    """
+    Iterates a streamed body and calls ``on_close`` once it's closed.
+
+    Django closes the iterator of a streaming response when the response is
+    closed, i.e. by the WSGI server once the body is sent or the client went
+    away. Unlike a generator's ``finally``, this also runs for a body that
+    was never iterated.
+    """
+
+    def __init__(self, iterable: Iterable[bytes], on_close: Callable[[], object]):
+        self._iterator = iter(iterable)
+        self._on_close = on_close
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self._iterator)
+
+    def close(self) -> None:
+        try:
+            if hasattr(self._iterator, "close"):
+                self._iterator.close()
+        finally:
+            self._on_close()
+
+
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class NationalIDView(ConcurrencyLimitMixin, APIView):
+    """
+    Validates a national ID and extracts the information it encodes.
+
+    Validation never writes to the database, so the view opts out of
+    ``ATOMIC_REQUESTS`` to skip the per-request BEGIN/COMMIT round trips.
+    Authentication doesn't query it either: JWT claims provide the user id
+    and DRF tokens are served from a short-TTL cache.
+    """
+
+    authentication_classes = [
+        JWTStatelessUserAuthentication,
+        CachedTokenAuthentication,
+        APIKeyAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
     serializer_class = NationalIDInputSerializer
 
@@ -29,75 +203,644 @@ class NationalIDView(APIView):
         "POST": {
             RateLimitCategory.IP: RateLimit(limit=5, window=1),
             RateLimitCategory.USER: RateLimit(limit=10, window=1),
+            RateLimitCategory.CONCURRENCY: RateLimit(limit=20, window=60),
         },
     }
+    quota: Quota = Quota(daily=100, monthly=3000)
     track_endpoint: bool = True
 
+    def check_limits(self, request: Request) -> Response | None:
+        """
+        Applies the per-user rate limit and quota of ``request.method``, or
+        those of the user's tier.
+
+        Returns the 429 response to send back, or None when the request may
+        proceed.
+        """
+        rate_limit: RateLimit | None = self.get_rate_limit(
+            request,
+            RateLimitCategory.USER,
+        )
+        quota: Quota = self.get_quota(request)
+        ratelimiter = RedisRateLimiter()
+        quota_tracker = RedisQuotaTracker(
+            client=ratelimiter.get_client(request.user.id),
+        )
+        # Tagged with the user id to share a redis server with their quota
+        key: str = f"id-validate:{{{request.user.id}}}"
+        if rate_limit is None:
+            # Not rate limited, only charged to the quota
+            is_limited = False
+            request_time = time()
+            quota_meta = quota_tracker.increment(
+                request.user.id,
+                quota,
+                request_time=request_time,
+            )
+            if quota_meta is not None and quota_meta.is_exceeded:
+                quota_tracker.refund(request.user.id, request_time)
+        else:
+            is_limited, _, _, quota_meta = ratelimiter.is_limited_with_quota(
+                key,
+                limit=rate_limit.limit,
+                quota_tracker=quota_tracker,
+                subject=request.user.id,
+                quota=quota,
+                window=rate_limit.window,
+            )
+        if rate_limit is not None and rate_limit.limit and is_limited:
+            logger.debug(
+                "core.api.rate-limit.exceeded Key: %s Limit: %s Window: %s",
+                key,
+                rate_limit.limit,
+                rate_limit.window,
+            )
+            return Response(
+                {
+                    "detail": "You are attempting to validate too many IDs. Please try again later.",
+                },
+                status=429,
+            )
+        if quota_meta is not None and quota_meta.is_exceeded:
+            logger.debug(
+                "core.api.quota.exceeded User: %s Quota: %s",
+                request.user.id,
+                quota,
+            )
+            return Response(
+                {
+                    "detail": "You have used up your validation quota. Please try again later.",
+                },
+                status=429,
+            )
+        return None
+
     def post(self, request: Request) -> Response:
+        data: dict[str, Any] = {"is_valid": False, "id_number": None, "detail": ""}
         try:
-            rate_limit: RateLimit = self.rate_limits.get("POST", {}).get(
-                RateLimitCategory.USER,
-            )
-            ratelimiter = RedisRateLimiter()
-            limit: int = rate_limit.limit
-            window: int = rate_limit.window
-            key: str = f"id-validate:{request.user.id}"
-            if limit and ratelimiter.is_limited(
-                key,
-                limit=limit,
-                window=window,
-            ):
-                logger.debug(
-                    "core.api.rate-limit.exceeded Key: %s Limit: %s Window: %s",
-                    key,
-                    limit,
-                    window,
+            if not isinstance(request.data, dict):
+                data["detail"] = "Expected an object with an id_number key."
+                return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+            limited_response = self.check_limits(request)
+            if limited_response is not None:
+                return limited_response
+
+            data["id_number"] = request.data.get("id_number")
+            result = EgyptianNationalID.parse(data["id_number"])
+            if not result.is_valid:
+                data["detail"] = result.detail
+                data["error_code"] = result.error.value
+                return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response(
+                NationalIDSerializer(asdict(result)).data,
+                status=status.HTTP_200_OK,
+            )
+
+        except APIException:
+            # e.g. a malformed body, let the exception handler answer it
+            raise
+        except Exception:
+            logger.exception(
+                "An unexpected error occurred:",
+            )
+            data["detail"] = "An unexpected error occurred. Please try again later."
+            return Response(
+                data,
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class NationalIDLookupView(NationalIDView):
+    """
+    Cacheable ``GET`` variant of the validate endpoint.
+
+    A decoded ID is a pure function of the ID and ``GOVERNORATES_MAPPING``,
+    so successful responses carry a strong ETag built from both and the
+    response format, a public ``Cache-Control`` and ``Vary: Accept,
+    Authorization``, letting a reverse proxy absorb repeated lookups.
+    Requests that do reach the app are still rate limited, charged to the
+    quota and tracked, and a matching ``If-None-Match`` gets an empty 304.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    rate_limits: dict[str, dict[RateLimitCategory, RateLimit]] = {
+        "GET": NationalIDView.rate_limits["POST"],
+    }
+    cache_max_age: int = 24 * 60 * 60
+
+    def get(self, request: Request, id_number: str) -> Response:
+        limited_response = self.check_limits(request)
+        if limited_response is not None:
+            return limited_response
+
+        result = EgyptianNationalID.parse(id_number)
+        if not result.is_valid:
+            return Response(
+                national_id_result_data(result),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # JSON, MessagePack and the browsable API are different bytes for the
+        # same ID, so each representation gets its own tag.
+        response_format = request.accepted_renderer.format
+        etag = f'"{GOVERNORATES_MAPPING_VERSION}-{response_format}-{result.id_number}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.cache_max_age}",
+            "Vary": "Accept, Authorization",
+        }
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or etag in [tag.removeprefix("W/") for tag in parse_etags(if_none_match)]
+        ):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(
+            NationalIDSerializer(asdict(result)).data,
+            status=status.HTTP_200_OK,
+            headers=headers,
+        )
+
+
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class NationalIDStreamView(ConcurrencyLimitMixin, APIView):
+    """
+    Validates a stream of IDs and answers with a stream of results.
+
+    The body is either newline delimited JSON, one ID per line given as a JSON
+    string or as an object with an ``id_number`` key, or a sequence of
+    MessagePack values of the same shape. Results are written back as NDJSON,
+    or as a MessagePack sequence when the client accepts it.
+
+    The body is read and the response written incrementally, so memory stays
+    flat whatever the payload size and results start flowing before the upload
+    is done. IDs are charged to the quota for every ``chunk_size`` IDs read.
+    A stream cut short, by the quota or a malformed body, ends with a record
+    holding only a ``detail`` message.
+    """
+
+    authentication_classes = NationalIDView.authentication_classes
+    permission_classes = [IsAuthenticated]
+
+    rate_limits = NationalIDView.rate_limits
+    quota = NationalIDView.quota
+    chunk_size = 100
+    track_endpoint: bool = True
+    load_shedding_priority = RequestPriority.LOW
+    # Why the body couldn't be read to the end, sent as the last record
+    body_error: str | None = None
+
+    @extend_schema(
+        request={
+            "application/x-ndjson": OpenApiTypes.STR,
+            "application/msgpack": OpenApiTypes.BINARY,
+        },
+        responses={
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+            (200, "application/msgpack"): OpenApiTypes.BINARY,
+        },
+    )
+    def post(self, request: Request) -> Response | StreamingHttpResponse:
+        rate_limit: RateLimit = self.get_rate_limit(request, RateLimitCategory.USER)
+        # Read by stream_results
+        self.quota = self.get_quota(request)
+        ratelimiter = RedisRateLimiter()
+        key: str = f"id-validate:{{{request.user.id}}}"
+        if rate_limit.limit and ratelimiter.is_limited(
+            key,
+            limit=rate_limit.limit,
+            window=rate_limit.window,
+        ):
+            return Response(
+                {
+                    "detail": "You are attempting to validate too many IDs. Please try again later.",
+                },
+                status=429,
+            )
+
+        stream = self.get_body_stream(request)
+        if stream is None:
+            return Response(
+                {
+                    "detail": "Send a Content-Length, or a chunked body through a server that supports it.",
+                },
+                status=status.HTTP_411_LENGTH_REQUIRED,
+            )
+        if request.content_type.startswith(MessagePackParser.media_type):
+            id_numbers = self.read_msgpack(stream)
+        else:
+            id_numbers = self.read_ndjson(stream)
+
+        if request.accepted_renderer.format == MessagePackRenderer.format:
+            encode, content_type = self.encode_msgpack, MessagePackRenderer.media_type
+        else:
+            encode, content_type = self.encode_ndjson, "application/x-ndjson"
+
+        return StreamingHttpResponse(
+            self.stream_results(
+                id_numbers,
+                RedisQuotaTracker(client=ratelimiter.get_client(request.user.id)),
+                request.user.id,
+                encode,
+            ),
+            content_type=content_type,
+        )
+
+    def get_body_stream(self, request: Request) -> Any | None:
+        """
+        The body, to read as it arrives. Without a Content-Length, e.g. for a
+        chunked upload, Django sees an empty body: the server's input is read
+        directly when it marks it as ending with the body
+        (``wsgi.input_terminated``, set by gunicorn), else None.
+        """
+        if request.META.get("CONTENT_LENGTH"):
+            return request.stream or io.BytesIO()
+        if request.META.get("wsgi.input_terminated"):
+            return request.META["wsgi.input"]
+        return None
+
+    def read_ndjson(self, stream: Iterable[bytes]) -> Iterator[Any]:
+        for raw_line in stream:
+            line = raw_line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Not JSON, take the line as the raw ID and let parsing reject it
+                yield line.decode(errors="replace")
+
+    def read_msgpack(self, stream: Any) -> Iterator[Any]:
+        try:
+            yield from msgpack.Unpacker(stream, raw=False)
+        except (ValueError, msgpack.UnpackException):
+            logger.warning("Malformed MessagePack stream, stopping validation")
+            # Reported by stream_results once the values read so far are done
+            self.body_error = "Malformed MessagePack body, the values after the last result were not validated."
+
+    def encode_ndjson(self, data: dict[str, Any]) -> bytes:
+        return json.dumps(data).encode() + b"\n"
+
+    def encode_msgpack(self, data: dict[str, Any]) -> bytes:
+        return msgpack.packb(data)
+
+    def stream_results(
+        self,
+        id_numbers: Iterable[Any],
+        quota_tracker: RedisQuotaTracker,
+        subject: str | int,
+        encode: Callable[[dict[str, Any]], bytes],
+    ) -> Iterator[bytes]:
+        id_numbers = iter(id_numbers)
+        while chunk := list(islice(id_numbers, self.chunk_size)):
+            request_time = time()
+            quota_meta = quota_tracker.increment(
+                subject,
+                self.quota,
+                request_time=request_time,
+                amount=len(chunk),
+            )
+            over_quota = 0
+            if quota_meta is not None and quota_meta.is_exceeded:
+                over_quota = min(
+                    max(
+                        quota_meta.daily_used - self.quota.daily,
+                        quota_meta.monthly_used - self.quota.monthly,
+                    ),
+                    len(chunk),
                 )
-                return Response(
+                quota_tracker.refund(subject, request_time, amount=over_quota)
+                chunk = chunk[: len(chunk) - over_quota]
+
+            yield b"".join(encode(self.validate(id_number)) for id_number in chunk)
+
+            if over_quota:
+                yield encode(
                     {
-                        "detail": "You are attempting to validate too many IDs. Please try again later.",
+                        "detail": "You have used up your validation quota. Please try again later.",
                     },
-                    status=429,
                 )
-            data: dict[str, Any] = {
-                "is_valid": False,
-                "id_number": request.data.get("id_number"),
-                "detail": "",
-            }
+                return
 
-            serializer = NationalIDInputSerializer(data=request.data)
+        if self.body_error is not None:
+            yield encode({"detail": self.body_error})
 
-            if not serializer.is_valid():
-                data["detail"] = serializer.errors.get("id_number")[0]
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
+    def validate(self, id_number: Any) -> dict[str, Any]:
+        if isinstance(id_number, dict):
+            id_number = id_number.get("id_number")
+        return national_id_result_data(EgyptianNationalID.parse(id_number))
 
-            id_number: str = serializer.validated_data["id_number"]
-            egyptian_national_id = EgyptianNationalID(id_number)
-            output_serializer = NationalIDSerializer(data=asdict(egyptian_national_id))
 
-            if output_serializer.is_valid():
-                return Response(
-                    output_serializer.data,
-                    status=status.HTTP_200_OK,
-                )
+class QuotaView(TieredLimitsMixin, APIView):
+    """Remaining validation quota of the current user, read straight from redis."""
+
+    authentication_classes = NationalIDView.authentication_classes
+    permission_classes = [IsAuthenticated]
+    rate_limits = NationalIDView.rate_limits
+    quota = NationalIDView.quota
 
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request: Request) -> Response:
+        quota_tracker = RedisQuotaTracker(
+            client=RedisRateLimiter().get_client(request.user.id),
+        )
+        quota_meta = quota_tracker.usage(request.user.id, self.get_quota(request))
+        if quota_meta is None:
             return Response(
-                output_serializer.errors,
-                status=status.HTTP_400_BAD_REQUEST,
+                {"detail": "Quota usage is temporarily unavailable."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response(asdict(quota_meta), status=status.HTTP_200_OK)
+
+
+class ApiCallFilterMixin:
+    """Filters ``ApiCall`` records by the validated query parameters."""
+
+    filter_lookups = {
+        "user_id": "user_id",
+        "path": "path",
+        "status_code": "status_code",
+        "request_id": "request_id",
+        "since": "timestamp__gte",
+        "until": "timestamp__lt",
+    }
+
+    def get_queryset(self):
+        filters = ApiCallFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return ApiCall.objects.filter(
+            **{
+                self.filter_lookups[name]: value
+                for name, value in filters.validated_data.items()
+            },
+        )
+
+
+class ApiCallListView(ApiCallFilterMixin, ListAPIView):
+    """Lists tracked API calls, newest first, using keyset pagination."""
+
+    permission_classes = [IsAdminUser]
+    serializer_class = ApiCallSerializer
+    pagination_class = KeysetPagination
+    load_shedding_priority = RequestPriority.LOW
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the value back to ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class ApiCallExportView(ApiCallFilterMixin, APIView):
+    """
+    Streams the filtered API calls as CSV.
+
+    Rows are read through a server-side cursor in ``chunk_size`` batches and
+    written out as they arrive, so exports run in constant memory.
+    """
+
+    permission_classes = [IsAdminUser]
+    chunk_size = 2000
+    load_shedding_priority = RequestPriority.LOW
+
+    @extend_schema(responses={(200, "text/csv"): OpenApiTypes.STR})
+    def get(self, request: Request) -> StreamingHttpResponse:
+        fields = ApiCallSerializer.Meta.fields
+        rows = (
+            self.get_queryset()
+            .order_by("-timestamp", "-id")
+            .values_list(*fields)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        writer = csv.writer(_Echo())
+
+        def stream():
+            yield writer.writerow(fields)
+            for row in rows:
+                yield writer.writerow(row)
+
+        return StreamingHttpResponse(
+            stream(),
+            content_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="api-calls.csv"'},
+        )
+
+
+class APIKeyListView(ListCreateAPIView):
+    """
+    Lists the current user's API keys and issues new ones. The key itself is
+    only returned once, in the ``key`` field of the creation response.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = APIKeySerializer
+
+    def get_queryset(self):
+        return APIKey.objects.filter(user=self.request.user)
+
+    @extend_schema(responses={201: APIKeyCreatedSerializer})
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        api_key, key = APIKey.objects.create_key(
+            request.user,
+            **serializer.validated_data,
+        )
+        api_key.key = key
+        return Response(
+            APIKeyCreatedSerializer(api_key).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class APIKeyRevokeView(DestroyAPIView):
+    """Revokes one of the current user's API keys, in every process at once."""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = APIKeySerializer
+    lookup_field = "prefix"
+
+    def get_queryset(self):
+        return APIKey.objects.filter(user=self.request.user, revoked=False)
+
+    def perform_destroy(self, instance: APIKey) -> None:
+        # Kept for the record, see core.signals for the cache invalidation
+        instance.revoked = True
+        instance.save(update_fields=["revoked"])
+
+
+class BulkJobListView(TieredLimitsMixin, ListAPIView):
+    """
+    Lists the current user's bulk validation jobs and submits new ones.
+
+    The IDs are stored in chunks and charged to the quota up front, then
+    validated by Celery workers across all nodes, see ``core.bulk``. The
+    response points to the job to poll for its status.
+    """
+
+    authentication_classes = NationalIDView.authentication_classes
+    permission_classes = [IsAuthenticated]
+    serializer_class = BulkJobSerializer
+    rate_limits = NationalIDView.rate_limits
+    quota = NationalIDView.quota
+    load_shedding_priority = RequestPriority.LOW
+
+    def get_queryset(self):
+        return BulkJob.objects.filter(user=self.request.user)
+
+    @extend_schema(request=BulkJobCreateSerializer, responses={202: BulkJobSerializer})
+    def post(self, request: Request) -> Response:
+        serializer = BulkJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            id_numbers = self.read_id_numbers(serializer.validated_data)
+        except InvalidColumnarFileError as e:
+            return Response({"file": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = BulkJob.objects.create(
+            user=request.user,
+            mode=serializer.validated_data["mode"],
+        )
+        try:
+            job.total, job.chunks = bulk.write_input_chunks(
+                job.pk,
+                id_numbers,
+                settings.BULK_JOB_CHUNK_SIZE,
             )
+        except InvalidColumnarFileError as e:
+            bulk.delete_job_files(job.pk)
+            job.delete()
+            return Response({"file": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+        limited_response = self.charge_quota(request, job)
+        if limited_response is not None:
+            bulk.delete_job_files(job.pk)
+            job.delete()
+            return limited_response
+
+        job.save(update_fields=["total", "chunks"])
+        # Workers must find the job committed
+        transaction.on_commit(partial(start_bulk_job, job))
+        return Response(
+            BulkJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": f"{request.path}{job.pk}/"},
+        )
 
-        except (InvalidCenturyDigitError, InvalidBirthDateError) as e:
-            data["detail"] = str(e)
+    def read_id_numbers(self, data: dict[str, Any]) -> Iterator[str]:
+        """The IDs sent, read lazily and without blanks."""
+        if "id_numbers" in data:
+            lines = iter(data["id_numbers"])
+        elif columnar.detect_format(data["file"]) is not None:
+            return columnar.read_id_column(
+                data["file"],
+                data["column"],
+                batch_size=settings.BULK_JOB_CHUNK_SIZE,
+            )
+        else:
+            lines = (line.decode(errors="replace") for line in data["file"])
+        id_numbers = (line.strip() for line in lines)
+        return (id_number for id_number in id_numbers if id_number)
+
+    def charge_quota(self, request: Request, job: BulkJob) -> Response | None:
+        if not job.total:
             return Response(
-                data,
+                {"detail": "No ID numbers were sent."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        except Exception:
-            logger.exception(
-                "An unexpected error occurred:",
+        quota = self.get_quota(request)
+        quota_tracker = RedisQuotaTracker(
+            client=RedisRateLimiter().get_client(request.user.id),
+        )
+        request_time = time()
+        quota_meta = quota_tracker.increment(
+            request.user.id,
+            quota,
+            request_time=request_time,
+            amount=job.total,
+        )
+        if quota_meta is not None and quota_meta.is_exceeded:
+            quota_tracker.refund(request.user.id, request_time, amount=job.total)
+            return Response(
+                {
+                    "detail": "This job would exceed your validation quota. Please try again later.",
+                },
+                status=429,
             )
-            data["detail"] = "An unexpected error occurred. Please try again later."
+        return None
+
+
+class BulkJobDetailView(RetrieveAPIView):
+    """Status and progress of one of the current user's bulk jobs."""
+
+    authentication_classes = NationalIDView.authentication_classes
+    permission_classes = [IsAuthenticated]
+    serializer_class = BulkJobSerializer
+
+    def get_queryset(self):
+        return BulkJob.objects.filter(user=self.request.user)
+
+
+class BulkJobResultsView(BulkJobDetailView):
+    """
+    Streams the results of a finished job in input order, as NDJSON or, when
+    the client accepts it, as a Parquet file or an Arrow IPC stream.
+    """
+
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        ParquetRenderer,
+        ArrowStreamRenderer,
+    ]
+    load_shedding_priority = RequestPriority.LOW
+
+    @extend_schema(
+        responses={
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+            (200, ParquetRenderer.media_type): OpenApiTypes.BINARY,
+            (200, ArrowStreamRenderer.media_type): OpenApiTypes.BINARY,
+        },
+    )
+    def get(
+        self,
+        request: Request,
+        *args,
+        **kwargs,
+    ) -> Response | StreamingHttpResponse:
+        job = self.get_object()
+        if job.mode == BulkJob.Mode.STATISTICS:
             return Response(
-                data,
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                {"detail": "This job only computed statistics, see the job."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if job.status != BulkJob.Status.SUCCEEDED:
+            return Response(
+                {"detail": f"The job is {job.status}, results are not available."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        renderer = request.accepted_renderer
+        if isinstance(renderer, ColumnarRenderer):
+            write = (
+                columnar.write_parquet
+                if isinstance(renderer, ParquetRenderer)
+                else columnar.write_arrow_stream
+            )
+            content = write(
+                columnar.results_table(bulk.read_result_chunk(job.pk, index))
+                for index in range(job.chunks)
             )
+            content_type, extension = renderer.media_type, renderer.format
+        else:
+            content = bulk.read_results(job.pk, job.chunks)
+            content_type, extension = "application/x-ndjson", "ndjson"
+        return StreamingHttpResponse(
+            content,
+            content_type=content_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="{job.pk}.{extension}"',
+            },
+        )
@@ -0,0 +1,215 @@
+"""
+Chunked storage of bulk validation jobs.
+
+A job's IDs are split into chunks of ``BULK_JOB_CHUNK_SIZE`` when it is
+submitted, each one a text file with an ID per line. Every chunk is then
+validated by its own Celery task, on whichever node picks it up, and its
+results written next to it as NDJSON. Downloads stream the result chunks back
+in order, so no process ever holds a whole job in memory.
+
+IDs repeated within a chunk, common in family records and resubmitted files,
+are parsed once and their result line reused. The repeats are counted.
+
+Jobs in statistics mode store no results: each chunk is reduced to counts by
+governorate, gender, age bucket and birth year, small enough to travel back
+as the task result and be merged into the job.
+"""
+
+from __future__ import annotations
+
+import json
+from bisect import bisect_right
+from collections import Counter
+from itertools import islice
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import NamedTuple
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+
+from civil_registry.core.api.serializers import national_id_result_data
+from civil_registry.core.models import EgyptianNationalID
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from datetime import date
+    from uuid import UUID
+
+    from django.core.files.storage import Storage
+
+# Bytes read at a time when streaming results back
+READ_SIZE = 64 * 1024
+
+# Lower bounds of the age buckets, in years
+AGE_BUCKETS = (0, 18, 30, 45, 60)
+
+STATISTICS_FIELDS = ("governorates", "genders", "age_buckets", "birth_years", "errors")
+
+
+class ChunkStats(NamedTuple):
+    processed: int
+    valid: int
+    # IDs that already appeared earlier in the chunk
+    duplicates: int
+    # Counts of every STATISTICS_FIELDS, in statistics mode
+    statistics: dict[str, dict[str, int]] | None = None
+
+
+def bulk_storage() -> Storage:
+    return storages["bulk_jobs"]
+
+
+def input_chunk_path(job_id: UUID | str, index: int) -> str:
+    return f"{job_id}/input/{index:06d}.txt"
+
+
+def result_chunk_path(job_id: UUID | str, index: int) -> str:
+    return f"{job_id}/results/{index:06d}.ndjson"
+
+
+def write_input_chunks(
+    job_id: UUID | str,
+    id_numbers: Iterable[str],
+    chunk_size: int,
+) -> tuple[int, int]:
+    """Store ``id_numbers`` in chunks. Returns the number of IDs and chunks."""
+    storage = bulk_storage()
+    id_numbers = iter(id_numbers)
+    total = chunks = 0
+    while chunk := list(islice(id_numbers, chunk_size)):
+        storage.save(
+            input_chunk_path(job_id, chunks),
+            ContentFile("\n".join(chunk).encode()),
+        )
+        total += len(chunk)
+        chunks += 1
+    return total, chunks
+
+
+def read_input_chunk(job_id: UUID | str, index: int) -> list[str]:
+    with bulk_storage().open(input_chunk_path(job_id, index), "rb") as file:
+        return file.read().decode().split("\n")
+
+
+def validate_chunk(job_id: UUID | str, index: int) -> ChunkStats:
+    """Validate one input chunk and store its results."""
+    storage = bulk_storage()
+    id_numbers = read_input_chunk(job_id, index)
+
+    # Result line and validity of every distinct ID
+    seen: dict[str, tuple[str, bool]] = {}
+    valid = 0
+    lines = []
+    for id_number in id_numbers:
+        if id_number in seen:
+            line, is_valid = seen[id_number]
+        else:
+            result = EgyptianNationalID.parse(id_number)
+            line, is_valid = seen[id_number] = (
+                json.dumps(national_id_result_data(result)),
+                result.is_valid,
+            )
+        valid += is_valid
+        lines.append(line)
+    lines.append("")
+
+    path = result_chunk_path(job_id, index)
+    # A retried task overwrites its own earlier attempt
+    storage.delete(path)
+    storage.save(path, ContentFile("\n".join(lines).encode()))
+    return ChunkStats(len(id_numbers), valid, len(id_numbers) - len(seen))
+
+
+def age_bucket(birth_date: date, on: date) -> str:
+    """Label of the ``AGE_BUCKETS`` bucket of someone's age on ``on``."""
+    age = (
+        on.year
+        - birth_date.year
+        - ((on.month, on.day) < (birth_date.month, birth_date.day))
+    )
+    position = bisect_right(AGE_BUCKETS, max(age, 0)) - 1
+    if position + 1 == len(AGE_BUCKETS):
+        return f"{AGE_BUCKETS[position]}+"
+    return f"{AGE_BUCKETS[position]}-{AGE_BUCKETS[position + 1] - 1}"
+
+
+def aggregate_chunk(job_id: UUID | str, index: int, on: date) -> ChunkStats:
+    """
+    Validate one input chunk into demographic counts, ages as of ``on``.
+    Invalid IDs are counted by error code.
+    """
+    id_numbers = read_input_chunk(job_id, index)
+    # Group by ID, then valid IDs by birth date, parsing and dating each once
+    occurrences = Counter(id_numbers)
+    birth_dates: Counter[date] = Counter()
+    governorates: Counter[str] = Counter()
+    genders: Counter[str] = Counter()
+    errors: Counter[str] = Counter()
+    for id_number, count in occurrences.items():
+        result = EgyptianNationalID.parse(id_number)
+        if not result.is_valid:
+            errors[result.error.value] += count
+            continue
+        birth_dates[result.birth_date] += count
+        governorates[result.governorate] += count
+        genders[result.gender] += count
+
+    age_buckets: Counter[str] = Counter()
+    birth_years: Counter[str] = Counter()
+    for birth_date, count in birth_dates.items():
+        age_buckets[age_bucket(birth_date, on)] += count
+        birth_years[str(birth_date.year)] += count
+
+    return ChunkStats(
+        processed=len(id_numbers),
+        valid=len(id_numbers) - errors.total(),
+        duplicates=len(id_numbers) - len(occurrences),
+        statistics={
+            "governorates": dict(governorates),
+            "genders": dict(genders),
+            "age_buckets": dict(age_buckets),
+            "birth_years": dict(birth_years),
+            "errors": dict(errors),
+        },
+    )
+
+
+def merge_statistics(
+    chunks: Iterable[dict[str, dict[str, int]]],
+) -> dict[str, dict[str, Any]]:
+    """Sum the statistics of several chunks, each field sorted by key."""
+    totals: dict[str, Counter[str]] = {field: Counter() for field in STATISTICS_FIELDS}
+    for statistics in chunks:
+        for field, counts in statistics.items():
+            totals[field].update(counts)
+    return {field: dict(sorted(counts.items())) for field, counts in totals.items()}
+
+
+def read_results(job_id: UUID | str, chunks: int) -> Iterator[bytes]:
+    """The NDJSON results of a finished job, in input order."""
+    storage = bulk_storage()
+    for index in range(chunks):
+        with storage.open(result_chunk_path(job_id, index), "rb") as file:
+            while data := file.read(READ_SIZE):
+                yield data
+
+
+def read_result_chunk(job_id: UUID | str, index: int) -> bytes:
+    with bulk_storage().open(result_chunk_path(job_id, index), "rb") as file:
+        return file.read()
+
+
+def delete_job_files(job_id: UUID | str) -> None:
+    storage = bulk_storage()
+    for folder in ("input", "results"):
+        directory = f"{job_id}/{folder}"
+        if not storage.exists(directory):
+            continue
+        _, files = storage.listdir(directory)
+        for name in files:
+            storage.delete(f"{directory}/{name}")
+        # Removes the emptied folder from a file system, no-op on object stores
+        storage.delete(directory)
+    storage.delete(str(job_id))
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+import threading
+from time import monotonic
+from time import sleep
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a degraded backend until it is healthy again.
+
+    Calls report how they went with ``record_success`` (with their latency)
+    or ``record_failure``. After ``failure_threshold`` consecutive failures,
+    where a call slower than ``latency_threshold`` seconds counts as one, the
+    circuit opens: ``allow_request`` returns False and callers should use
+    their fallback right away instead of waiting on the backend. A background
+    thread then calls ``probe`` every ``probe_interval`` seconds and closes the
+    circuit once it succeeds in time.
+
+    State is per process and shared by all threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], object],
+        failure_threshold: int = 5,
+        latency_threshold: float = 0.05,
+        probe_interval: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.probe_interval = probe_interval
+        self.consecutive_failures = 0
+        self.is_open = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        return not self.is_open
+
+    def record_success(self, latency: float) -> None:
+        if latency > self.latency_threshold:
+            self.record_failure()
+            return
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.is_open or self.consecutive_failures < self.failure_threshold:
+                return
+            self.is_open = True
+
+        logger.warning(
+            "Circuit %s opened after %s consecutive failures",
+            self.name,
+            self.consecutive_failures,
+        )
+        threading.Thread(
+            target=self._probe_until_closed,
+            name=f"{self.name}-probe",
+            daemon=True,
+        ).start()
+
+    def close(self) -> None:
+        with self._lock:
+            was_open = self.is_open
+            self.is_open = False
+            self.consecutive_failures = 0
+        if was_open:
+            logger.warning("Circuit %s closed", self.name)
+
+    def probe_once(self) -> bool:
+        """Call ``probe`` and close the circuit if it succeeded in time."""
+        start = monotonic()
+        try:
+            self.probe()
+        except Exception:  # noqa: BLE001
+            return False
+        if monotonic() - start > self.latency_threshold:
+            return False
+        self.close()
+        return True
+
+    def _probe_until_closed(self) -> None:
+        while self.is_open:
+            sleep(self.probe_interval)
+            if self.is_open:
+                self.probe_once()
@@ -0,0 +1,226 @@
+"""
+Parquet and Arrow IPC support for bulk validation jobs.
+
+Uploaded files are read one record batch at a time, and only their ID column,
+so memory stays bounded by the batch size whatever the file size. Results are
+converted a job chunk at a time from the NDJSON written by the workers into
+typed columns: ``date32`` birth dates, and governorates and genders encoded
+against fixed dictionaries so every batch of a download shares them.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import TYPE_CHECKING
+from typing import BinaryIO
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc
+import pyarrow.json
+import pyarrow.parquet as pq
+
+from civil_registry.core.constants import GOVERNORATES_MAPPING
+from civil_registry.core.exceptions import InvalidColumnarFileError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+PARQUET_MAGIC = b"PAR1"
+ARROW_FILE_MAGIC = b"ARROW1"
+# Continuation marker opening every message of an IPC stream
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+
+GOVERNORATES = pa.array(sorted(set(GOVERNORATES_MAPPING.values())), pa.string())
+GENDERS = pa.array(["Female", "Male"], pa.string())
+
+RESULT_SCHEMA = pa.schema(
+    [
+        ("id_number", pa.string()),
+        ("is_valid", pa.bool_()),
+        ("birth_date", pa.date32()),
+        ("governorate", pa.dictionary(pa.int8(), pa.string())),
+        ("gender", pa.dictionary(pa.int8(), pa.string())),
+        ("detail", pa.string()),
+        ("error_code", pa.string()),
+    ],
+)
+
+# How the NDJSON results are read, before typing the columns
+_NDJSON_SCHEMA = pa.schema(
+    [
+        ("id_number", pa.string()),
+        ("is_valid", pa.bool_()),
+        ("birth_date", pa.string()),
+        ("governorate", pa.string()),
+        ("gender", pa.string()),
+        ("detail", pa.string()),
+        ("error_code", pa.string()),
+    ],
+)
+
+
+def detect_format(file: BinaryIO) -> str | None:
+    """
+    "parquet", "arrow_file" or "arrow_stream" after the magic bytes of
+    ``file``, else None.
+    """
+    position = file.tell()
+    magic = file.read(len(ARROW_FILE_MAGIC))
+    file.seek(position)
+    if magic.startswith(PARQUET_MAGIC):
+        return "parquet"
+    if magic == ARROW_FILE_MAGIC:
+        return "arrow_file"
+    if magic.startswith(ARROW_STREAM_MAGIC):
+        return "arrow_stream"
+    return None
+
+
+def _record_batches(
+    file: BinaryIO,
+    column: str,
+    batch_size: int,
+) -> tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+    file_format = detect_format(file)
+    if file_format == "parquet":
+        parquet_file = pq.ParquetFile(file)
+        return parquet_file.schema_arrow, parquet_file.iter_batches(
+            batch_size=batch_size,
+            columns=[column],
+        )
+    if file_format == "arrow_file":
+        reader = pa.ipc.open_file(file)
+        return reader.schema, (
+            reader.get_batch(index) for index in range(reader.num_record_batches)
+        )
+    # IPC batches come as they were written, whatever their size
+    reader = pa.ipc.open_stream(file)
+    return reader.schema, iter(reader)
+
+
+def read_id_column(
+    file: BinaryIO,
+    column: str,
+    batch_size: int,
+) -> Iterator[str]:
+    """
+    IDs of ``column`` of a Parquet or Arrow IPC (file or stream) ``file``,
+    read ``batch_size`` rows at a time. Integer columns are accepted, nulls
+    and blank values skipped, values with inner whitespace or control
+    characters rejected.
+
+    The file and the column are checked right away, a batch that fails to
+    read later on raises ``InvalidColumnarFileError`` while iterating.
+    """
+    try:
+        schema, batches = _record_batches(file, column, batch_size)
+    except (pa.ArrowException, OSError) as e:
+        msg = f"Unreadable Parquet or Arrow file: {e}"
+        raise InvalidColumnarFileError(msg) from e
+    if column not in schema.names:
+        msg = f'The file has no "{column}" column.'
+        raise InvalidColumnarFileError(msg)
+    return _read_ids(batches, column)
+
+
+# RE2 syntax, as used by pyarrow.compute
+_LINE_UNSAFE = r"[\s\x00-\x1f\x7f]"
+
+
+def _read_ids(batches: Iterator[pa.RecordBatch], column: str) -> Iterator[str]:
+    try:
+        for batch in batches:
+            values = pc.utf8_trim_whitespace(
+                pc.cast(batch.column(column), pa.string()),
+            )
+            # Bulk job inputs are stored one ID per line
+            if pc.any(pc.match_substring_regex(values, _LINE_UNSAFE)).as_py():
+                msg = (
+                    f'The "{column}" column holds values with whitespace or '
+                    "control characters."
+                )
+                raise InvalidColumnarFileError(msg)
+            yield from pc.filter(values, pc.not_equal(values, "")).to_pylist()
+    except (pa.ArrowException, OSError) as e:
+        msg = f"Unreadable Parquet or Arrow file: {e}"
+        raise InvalidColumnarFileError(msg) from e
+
+
+def _dictionary_encode(values: pa.Array, dictionary: pa.Array) -> pa.DictionaryArray:
+    indices = pc.cast(pc.index_in(values, value_set=dictionary), pa.int8())
+    return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+
+def results_table(ndjson: bytes) -> pa.Table:
+    """``RESULT_SCHEMA`` table of a chunk of NDJSON results."""
+    table = pyarrow.json.read_json(
+        io.BytesIO(ndjson),
+        parse_options=pyarrow.json.ParseOptions(
+            explicit_schema=_NDJSON_SCHEMA,
+            unexpected_field_behavior="ignore",
+        ),
+    ).combine_chunks()
+    return pa.Table.from_arrays(
+        [
+            table["id_number"],
+            table["is_valid"],
+            pc.cast(table["birth_date"], pa.date32()),
+            _dictionary_encode(table["governorate"].combine_chunks(), GOVERNORATES),
+            _dictionary_encode(table["gender"].combine_chunks(), GENDERS),
+            table["detail"],
+            table["error_code"],
+        ],
+        schema=RESULT_SCHEMA,
+    )
+
+
+class _ChunkSink:
+    """Write-only file handing out what pyarrow writes to it, as it goes."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        return
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def write_parquet(tables: Iterable[pa.Table]) -> Iterator[bytes]:
+    """Parquet file of ``tables``, a row group each, streamed as written."""
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, RESULT_SCHEMA) as writer:
+        for table in tables:
+            writer.write_table(table)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def write_arrow_stream(tables: Iterable[pa.Table]) -> Iterator[bytes]:
+    """Arrow IPC stream of ``tables``, streamed as written."""
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, RESULT_SCHEMA) as writer:
+        for table in tables:
+            writer.write_table(table)
+            yield sink.drain()
+    yield sink.drain()
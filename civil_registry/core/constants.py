@@ -1,3 +1,5 @@
+from hashlib import sha256
+
 GOVERNORATES_MAPPING = {
     "01": "Cairo",
     "02": "Alexandria",
@@ -28,3 +30,8 @@ GOVERNORATES_MAPPING = {
     "35": "South Sinai",
     "88": "Foreign",
 }
+
+# Changes whenever the mapping does, so cached decoding results can be versioned
+GOVERNORATES_MAPPING_VERSION = sha256(
+    repr(sorted(GOVERNORATES_MAPPING.items())).encode(),
+).hexdigest()[:12]
@@ -60,3 +60,7 @@ class InvalidBirthDateError(Exception):
 
 class InvalidConfigurationError(Exception):
     pass
+
+
+class InvalidColumnarFileError(Exception):
+    """Raised when an uploaded Parquet or Arrow file can't be read."""
@@ -0,0 +1,156 @@
+"""
+Large sets of national IDs in a sorted, fixed-width binary file.
+
+The file is a 16 bytes header, the ``MAGIC`` bytes then the number of IDs as
+an unsigned 64-bit integer, followed by every ID packed by
+``EgyptianNationalID.pack`` as a little-endian signed 64-bit integer, sorted
+and without duplicates. A hundred million IDs take 800 MB.
+
+``IDSet`` memory-maps the file read only: opening it reads nothing but the
+header, a lookup is a binary search touching about log2(n) pages, and every
+process mapping the same file shares its pages through the page cache.
+"""
+
+from __future__ import annotations
+
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from contextlib import ExitStack
+from itertools import groupby
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from civil_registry.core.exceptions import InvalidNationalIDError
+from civil_registry.core.models import EgyptianNationalID
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from typing import BinaryIO
+    from typing import Self
+
+MAGIC = b"NIDSET1\x00"
+HEADER = struct.Struct("<8sQ")
+ITEM_SIZE = 8
+# IDs sorted in memory at once while writing a set, 8 MB as an array
+RUN_SIZE = 1_000_000
+# IDs read or written at a time when streaming a run
+BUFFER_SIZE = 64 * 1024
+
+
+def _batches(values: Iterable[int], size: int) -> Iterator[array[int]]:
+    values = iter(values)
+    while batch := array("q", islice(values, size)):
+        yield batch
+
+
+def _to_bytes(values: array[int]) -> bytes:
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_run(file: BinaryIO) -> Iterator[int]:
+    file.seek(0)
+    while data := file.read(BUFFER_SIZE * ITEM_SIZE):
+        values = array("q", data)
+        if sys.byteorder != "little":
+            values.byteswap()
+        yield from values
+
+
+def write_id_set(path: str | Path, id_numbers: Iterable[str]) -> int:
+    """
+    Write the IDs of ``id_numbers`` to an ID set file at ``path`` and return
+    how many distinct IDs it holds. Memory stays bounded by ``RUN_SIZE``: the
+    IDs are sorted in runs spilled to temporary files, then merged.
+
+    Raises ``InvalidNationalIDError`` for anything that isn't 14 digits.
+    """
+    with ExitStack() as stack:
+        runs = []
+        for batch in _batches(map(EgyptianNationalID.pack, id_numbers), RUN_SIZE):
+            run = stack.enter_context(tempfile.TemporaryFile())
+            run.write(_to_bytes(array("q", sorted(batch))))
+            runs.append(run)
+
+        count = 0
+        with Path(path).open("wb") as file:
+            file.write(HEADER.pack(MAGIC, 0))
+            merged = (value for value, _ in groupby(heapq.merge(*map(_read_run, runs))))
+            for batch in _batches(merged, BUFFER_SIZE):
+                file.write(_to_bytes(batch))
+                count += len(batch)
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, count))
+    return count
+
+
+class IDSet:
+    """
+    Read only view of an ID set file, see ``write_id_set``. Supports ``in``
+    with IDs as strings or packed, ``len`` and iteration in sorted order.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        with Path(path).open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            header = file.read(HEADER.size)
+            magic, self._count = (
+                HEADER.unpack(header) if len(header) == HEADER.size else (b"", 0)
+            )
+            if magic != MAGIC or size != HEADER.size + self._count * ITEM_SIZE:
+                msg = f"{path} is not an ID set file"
+                raise ValueError(msg)
+            # Mapping an empty file fails, and there's nothing to look up
+            self._mmap = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if self._count
+                else None
+            )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        """Packed ID at ``index`` in sorted order, for ``bisect``."""
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offset = HEADER.size + index * ITEM_SIZE
+        return int.from_bytes(
+            self._mmap[offset : offset + ITEM_SIZE],
+            "little",
+            signed=True,
+        )
+
+    def __contains__(self, id_number: object) -> bool:
+        if isinstance(id_number, str):
+            try:
+                id_number = EgyptianNationalID.pack(id_number)
+            except InvalidNationalIDError:
+                return False
+        if not isinstance(id_number, int):
+            return False
+        index = bisect_left(self, id_number)
+        return index < self._count and self[index] == id_number
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield EgyptianNationalID.unpack(self[index])
@@ -0,0 +1,75 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Boots the WSGI app in a fresh interpreter, then forks a "worker" that runs
+# a full garbage collection, like a worker does soon after it starts serving,
+# and reports how much memory it had to copy from the parent.
+BOOT_SCRIPT = """
+import gc, json, os, resource, sys, time
+
+start = time.perf_counter()
+import config.wsgi
+boot = time.perf_counter() - start
+
+if sys.argv[1] == "freeze":
+    from civil_registry.core.warmup import freeze
+    freeze()
+
+read_fd, write_fd = os.pipe()
+if os.fork() == 0:
+    gc.collect()
+    with open("/proc/self/smaps_rollup") as smaps:
+        private = sum(
+            int(line.split()[1])
+            for line in smaps
+            if line.startswith(("Private_Dirty:", "Private_Clean:"))
+        )
+    os.write(write_fd, str(private).encode())
+    os._exit(0)
+os.wait()
+print(json.dumps({
+    "boot": boot,
+    "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "private": int(os.read(read_fd, 32)),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Measures WSGI app boot time, master RSS and the memory each forked worker copies, with and without gc.freeze (Linux only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="Fresh interpreters per measurement",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'mode':<10}{'boot ms':>10}{'master RSS KiB':>16}{'worker private KiB':>20}",
+        )
+        for mode in ("no-freeze", "freeze"):
+            runs = [self.boot(mode) for _ in range(options["runs"])]
+            self.stdout.write(
+                f"{mode:<10}"
+                f"{statistics.median(run['boot'] for run in runs) * 1000:>10.1f}"
+                f"{statistics.median(run['rss'] for run in runs):>16.0f}"
+                f"{statistics.median(run['private'] for run in runs):>20.0f}",
+            )
+
+    def boot(self, mode):
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", BOOT_SCRIPT, mode],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        return json.loads(result.stdout.splitlines()[-1])
@@ -0,0 +1,58 @@
+import logging
+import timeit
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test import override_settings
+from django.utils.module_loading import import_string
+
+from civil_registry.core.middleware.apiexempt import APIExemptMixin
+
+
+def _django_equivalent(path):
+    """Dotted path of the stock Django middleware an apiexempt class wraps."""
+    middleware = import_string(path)
+    if not issubclass(middleware, APIExemptMixin):
+        return path
+    base = middleware.__mro__[middleware.__mro__.index(APIExemptMixin) + 1]
+    return f"{base.__module__}.{base.__qualname__}"
+
+
+class Command(BaseCommand):
+    help = "Measures the per-request middleware overhead of an API call with the stock and the API exempt middleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="/api/quota/",
+            help="API path to request, unauthenticated",
+        )
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=2000,
+            help="Requests per measurement",
+        )
+
+    def handle(self, *args, **options):
+        path, number = options["path"], options["number"]
+        # The 401 responses would otherwise be logged on every request
+        logging.disable(logging.CRITICAL)
+        request_factory = RequestFactory(SERVER_NAME=settings.ALLOWED_HOSTS[0])
+        stacks = [
+            ("django", [_django_equivalent(path) for path in settings.MIDDLEWARE]),
+            ("apiexempt", list(settings.MIDDLEWARE)),
+        ]
+        for name, middleware in stacks:
+            with override_settings(MIDDLEWARE=middleware):
+                handler = BaseHandler()
+                handler.load_middleware()
+                elapsed = timeit.timeit(
+                    lambda h=handler: h.get_response(request_factory.get(path)),
+                    number=number,
+                )
+            self.stdout.write(
+                f"{name:<12}{elapsed / number * 1_000_000:>10.1f} us/request",
+            )
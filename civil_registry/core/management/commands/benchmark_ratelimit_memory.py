@@ -0,0 +1,70 @@
+import fakeredis
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from redis import StrictRedis
+from redis.exceptions import ResponseError
+
+from civil_registry.core.ratelimit import RedisRateLimiter
+from civil_registry.core.types import RateLimitStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the redis memory used by the rate limit counters of the keys "
+        "and hash storage layouts. Writes short lived rl:* keys to --url and "
+        "deletes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=10_000,
+            help="Active clients, each checked once in the same window",
+        )
+        parser.add_argument(
+            "--url",
+            default=settings.REDIS_URL,
+            help="Redis to measure on, defaults to REDIS_URL",
+        )
+        parser.add_argument(
+            "--fake",
+            action="store_true",
+            help="Use fakeredis. It has no MEMORY command, only payload bytes are reported",
+        )
+
+    def handle(self, *args, **options):
+        if options["fake"]:
+            client = fakeredis.FakeStrictRedis()
+        else:
+            client = StrictRedis.from_url(options["url"])
+        clients = options["clients"]
+
+        self.stdout.write(
+            f"{'storage':<8}{'keys':>8}{'payload B':>12}{'MEMORY USAGE B':>16}{'B/client':>10}",
+        )
+        for storage in RateLimitStorage:
+            rate_limiter = RedisRateLimiter(storage=storage)
+            rate_limiter.client = client
+            counters = {
+                rate_limiter._construct_redis_counter(f"id-validate:{i}", window=60)  # noqa: SLF001
+                for i in range(clients)
+            }
+            for i in range(clients):
+                rate_limiter.is_limited(f"id-validate:{i}", limit=10, window=60)
+
+            keys = {redis_key for redis_key, _ in counters}
+            payload = sum(len(redis_key) for redis_key in keys) + sum(
+                len(field) + 1 for _, field in counters if field is not None
+            )
+            try:
+                memory = sum(client.memory_usage(key, samples=0) for key in keys)
+            except ResponseError:
+                memory = None
+            client.delete(*keys)
+
+            per_client = (memory if memory is not None else payload) / clients
+            self.stdout.write(
+                f"{storage.value:<8}{len(keys):>8}{payload:>12}"
+                f"{memory if memory is not None else 'n/a':>16}{per_client:>10.1f}",
+            )
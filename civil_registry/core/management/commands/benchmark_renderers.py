@@ -0,0 +1,53 @@
+import json
+import timeit
+from dataclasses import asdict
+
+import msgpack
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from civil_registry.core.api.renderers import MessagePackRenderer
+from civil_registry.core.api.serializers import NationalIDSerializer
+from civil_registry.core.models import EgyptianNationalID
+
+
+class Command(BaseCommand):
+    help = "Compares payload size and encode/decode time of the JSON and MessagePack renderers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=1000,
+            help="Results per payload",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Runs per measurement",
+        )
+
+    def handle(self, *args, **options):
+        size, repeat = options["size"], options["repeat"]
+        result = EgyptianNationalID.parse("29001011234567")
+        payload = [NationalIDSerializer(asdict(result)).data] * size
+
+        codecs = [
+            ("json", JSONRenderer(), json.loads),
+            ("msgpack", MessagePackRenderer(), msgpack.unpackb),
+        ]
+        self.stdout.write(
+            f"{'format':<10}{'bytes':>12}{'encode ms':>12}{'decode ms':>12}",
+        )
+        for name, renderer, decode in codecs:
+            encoded = renderer.render(payload)
+            encode_time = timeit.timeit(
+                lambda r=renderer: r.render(payload),
+                number=repeat,
+            )
+            decode_time = timeit.timeit(lambda d=decode, e=encoded: d(e), number=repeat)
+            self.stdout.write(
+                f"{name:<10}{len(encoded):>12}"
+                f"{encode_time / repeat * 1000:>12.3f}{decode_time / repeat * 1000:>12.3f}",
+            )
@@ -0,0 +1,40 @@
+from pathlib import Path
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from civil_registry.core.exceptions import InvalidNationalIDError
+from civil_registry.core.idsets import IDSet
+from civil_registry.core.idsets import write_id_set
+
+
+class Command(BaseCommand):
+    help = "Builds a sorted, memory-mappable ID set file from a text file with one national ID per line, for fast membership lookups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", type=Path, help="Text file, one ID per line")
+        parser.add_argument("destination", type=Path, help="ID set file to write")
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        with options["source"].open() as source:
+            lines = (line.strip() for line in source)
+            try:
+                count = write_id_set(
+                    options["destination"],
+                    (line for line in lines if line),
+                )
+            except InvalidNationalIDError as e:
+                options["destination"].unlink(missing_ok=True)
+                msg = f"Not a national ID: {e.id_number!r}"
+                raise CommandError(msg) from e
+        built = perf_counter() - started
+
+        started = perf_counter()
+        with IDSet(options["destination"]):
+            opened = perf_counter() - started
+        self.stdout.write(
+            f"{count} distinct IDs, {options['destination'].stat().st_size} bytes, "
+            f"built in {built:.2f}s, opened in {opened * 1000:.3f}ms",
+        )
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from civil_registry.core.api.schema import CachedSpectacularAPIView
+from civil_registry.core.api.schema import schema_file_path
+
+
+class Command(BaseCommand):
+    help = "Renders the OpenAPI schema once and writes it to schema.yaml and schema.json, to be served from API_SCHEMA_DIR."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=settings.API_SCHEMA_DIR,
+            help="Output directory, defaults to API_SCHEMA_DIR",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dir"]:
+            msg = "Pass --dir or set API_SCHEMA_DIR"
+            raise CommandError(msg)
+        directory = Path(options["dir"])
+        directory.mkdir(parents=True, exist_ok=True)
+
+        view = CachedSpectacularAPIView
+        schema = view.generator_class(urlconf=view.urlconf).get_schema(
+            request=None,
+            public=view.serve_public,
+        )
+        renderers = {
+            renderer.format: renderer for renderer in view.renderer_classes
+        }.values()
+        for renderer_class in renderers:
+            renderer = renderer_class()
+            path = schema_file_path(directory, renderer)
+            path.write_bytes(renderer.render(schema, renderer_context={}))
+            self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from civil_registry.core.circuitbreaker import CircuitBreaker
+from civil_registry.core.ratelimit import LocalRateLimiter
+from civil_registry.core.ratelimit import RedisRateLimiter
+from civil_registry.core.ratelimit_simulation import BalancedRateLimiter
+from civil_registry.core.ratelimit_simulation import counting_redis_client
+from civil_registry.core.ratelimit_simulation import load_trace
+from civil_registry.core.ratelimit_simulation import simulate
+from civil_registry.core.ratelimit_simulation import synthetic_trace
+from civil_registry.core.types import RateLimitStorage
+
+
+def redis_limiter(storage):
+    client = counting_redis_client()
+    limiter = RedisRateLimiter(
+        storage=storage,
+        breaker=CircuitBreaker("simulation", probe=client.ping),
+        fallback=LocalRateLimiter(),
+    )
+    limiter.client = client
+    return limiter
+
+
+def local_limiters(processes):
+    return BalancedRateLimiter(
+        [LocalRateLimiter(processes=processes) for _ in range(processes)],
+    )
+
+
+LIMITERS = {
+    "redis-keys": lambda: redis_limiter(RateLimitStorage.KEYS),
+    "redis-hash": lambda: redis_limiter(RateLimitStorage.HASH),
+    "local": lambda: LocalRateLimiter(),
+    "local-x4": lambda: local_limiters(4),
+}
+
+
+class Command(BaseCommand):
+    help = "Replays a synthetic or recorded trace against the rate limiters under a simulated clock and compares them with an ideal sliding window limiter."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limiter",
+            action="append",
+            choices=LIMITERS,
+            help="Limiter to simulate, repeatable, defaults to all. local-x4 is the in-memory fallback on 4 processes behind a load balancer",
+        )
+        parser.add_argument(
+            "--trace",
+            type=Path,
+            help="CSV trace with timestamp and key or user_id columns, e.g. an API calls export. Overrides the synthetic trace options",
+        )
+        parser.add_argument("--clients", type=int, default=100)
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=10,
+            help="Mean requests per second of each synthetic client",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=60,
+            help="Seconds of synthetic traffic",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--window", type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'limiter':<12}{'decisions':>10}{'rejected':>10}{'accuracy':>10}"
+            f"{'false acc':>11}{'false rej':>11}{'cmds/dec':>10}{'dec/s':>10}",
+        )
+        for name in options["limiter"] or LIMITERS:
+            result = simulate(
+                LIMITERS[name](),
+                self.trace(options),
+                limit=options["limit"],
+                window=options["window"],
+            )
+            self.stdout.write(
+                f"{name:<12}{result.decisions:>10}{result.rejected:>10}"
+                f"{result.accuracy:>10.2%}{result.false_accepts:>11}"
+                f"{result.false_rejects:>11}{result.commands_per_decision:>10.2f}"
+                f"{result.decisions_per_second:>10.0f}",
+            )
+
+    def trace(self, options):
+        if options["trace"]:
+            with options["trace"].open(newline="") as file:
+                return load_trace(file)
+        return synthetic_trace(
+            clients=options["clients"],
+            rate=options["rate"],
+            duration=options["duration"],
+            seed=options["seed"],
+        )
@@ -0,0 +1,54 @@
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import csrf
+from django.middleware import locale
+
+
+class APIExemptMixin:
+    """
+    Passes API requests straight through to the next middleware.
+
+    Token authenticated JSON endpoints don't use sessions, CSRF cookies,
+    messages or locale negotiation, so the browser oriented middleware below
+    is skipped for them. Frame options are left to Django's own middleware:
+    the Swagger UI and browsable API pages under /api/ are HTML and still
+    need clickjacking protection.
+    """
+
+    exempt_path_prefix = "/api/"
+
+    def is_exempt(self, request):
+        return request.path_info.startswith(self.exempt_path_prefix)
+
+    def __call__(self, request):
+        if self.is_exempt(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(APIExemptMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(APIExemptMixin, csrf.CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # Django calls process_view hooks directly, bypassing __call__
+        if self.is_exempt(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(
+    APIExemptMixin,
+    auth_middleware.AuthenticationMiddleware,
+):
+    pass
+
+
+class MessageMiddleware(APIExemptMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class LocaleMiddleware(APIExemptMixin, locale.LocaleMiddleware):
+    pass
@@ -52,17 +52,23 @@ class APICallTrackingMiddleware:
                 else None
             )
 
+            # Set by DRF authentication, session auth is skipped under /api/
+            user = getattr(request, "user", None)
+            # Streaming responses carry no data
+            response_data = getattr(response, "data", None) or {}
             data = {
                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
                 "request_id": request.request_id,
                 "request_method": request.method,
                 "path": request.path,
-                "user_id": request.user.id if request.user.is_authenticated else None,
+                "user_id": user.id
+                if user is not None and user.is_authenticated
+                else None,
                 "status_code": response.status_code,
                 "client_ip": self._get_client_ip(request),
                 "user_agent": request.headers.get("user-agent"),
-                "id_number": response.data.get("id_number", ""),
-                "detail": response.data.get("detail"),
+                "id_number": response_data.get("id_number", ""),
+                "detail": response_data.get("detail"),
                 "processing_time": processing_time,
             }
 
@@ -0,0 +1,148 @@
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from civil_registry.core.types import RequestPriority
+
+logger = logging.getLogger("core.requests")
+
+
+def parse_request_start(value: str) -> float | None:
+    """
+    Epoch seconds of an ``X-Request-Start`` header, as nginx sets it
+    (``t=${msec}``) or in milliseconds or microseconds like other proxies.
+    """
+    try:
+        start = float(value.strip().removeprefix("t="))
+    except ValueError:
+        return None
+    # Tell the units apart by magnitude, seconds are around 1e9 until 2286
+    if start > 1e14:  # noqa: PLR2004
+        return start / 1_000_000
+    if start > 1e11:  # noqa: PLR2004
+        return start / 1000
+    return start
+
+
+class LoadSheddingMiddleware:
+    """
+    Answers requests with a fast 503 while the server can't keep up, instead
+    of working on requests whose clients have already given up.
+
+    Requests that waited in the proxy and gunicorn backlog for more than
+    ``LOADSHED_MAX_QUEUE_TIME`` seconds, going by the proxy's
+    ``X-Request-Start`` header, are always dropped. The process also keeps
+    moving averages of the queue time and of the time it takes to respond.
+    Once either goes over its target, requests are dropped by priority: the
+    views' ``load_shedding_priority`` (``LOW`` for expensive ones), raised
+    one level for ``LOADSHED_PRIORITY_USER_IDS``. ``LOW`` requests go beyond
+    the target, ``NORMAL`` ones beyond twice the target and ``HIGH`` ones
+    beyond three times the target.
+
+    Dropped requests count towards the response time average, so the server
+    lets traffic back in as soon as it catches up.
+    """
+
+    # Weight of the latest request in the moving averages
+    smoothing = 0.1
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.LOADSHED_ENABLED
+        self.max_queue_time = settings.LOADSHED_MAX_QUEUE_TIME
+        self.target_queue_time = settings.LOADSHED_TARGET_QUEUE_TIME
+        self.target_latency = settings.LOADSHED_TARGET_LATENCY
+        self.priority_user_ids = {
+            str(user_id) for user_id in settings.LOADSHED_PRIORITY_USER_IDS
+        }
+        self.queue_time = 0.0
+        self.latency = 0.0
+
+    def __call__(self, request):
+        received_at = time.time()
+        request_start = parse_request_start(request.headers.get("X-Request-Start", ""))
+        request.queue_time = (
+            max(received_at - request_start, 0.0) if request_start is not None else None
+        )
+
+        response = self.get_response(request)
+
+        self.latency = self._average(self.latency, time.time() - received_at)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled:
+            return None
+
+        if request.queue_time is not None:
+            self.queue_time = self._average(self.queue_time, request.queue_time)
+            if request.queue_time > self.max_queue_time:
+                return self.shed(request, RequestPriority.HIGH)
+
+        load = self.load()
+        if load <= 1:
+            return None
+        view_class = getattr(view_func, "view_class", None)
+        priority = getattr(
+            view_class,
+            "load_shedding_priority",
+            RequestPriority.NORMAL,
+        )
+        if (
+            priority < RequestPriority.HIGH
+            and load > priority + 1
+            and self.is_priority_user(request, view_class)
+        ):
+            priority = RequestPriority(priority + 1)
+        if load > priority + 1:
+            return self.shed(request, priority)
+        return None
+
+    def load(self) -> float:
+        """Queue time or response time over its target, whichever is higher."""
+        return max(
+            self.queue_time / self.target_queue_time,
+            self.latency / self.target_latency,
+        )
+
+    def is_priority_user(self, request, view_class) -> bool:
+        """
+        Authenticates the request with the view's authentication classes,
+        only done for requests about to be dropped.
+        """
+        if not self.priority_user_ids or view_class is None:
+            return False
+        authenticators = [
+            authentication()
+            for authentication in getattr(view_class, "authentication_classes", [])
+        ]
+        try:
+            user = Request(request, authenticators=authenticators).user
+        except APIException:
+            return False
+        return user.is_authenticated and str(user.id) in self.priority_user_ids
+
+    def shed(self, request, priority: RequestPriority) -> JsonResponse:
+        logger.debug(
+            "core.requests.shed Path: %s Priority: %s Queue time: %s Load: %.2f",
+            request.path,
+            priority.name,
+            request.queue_time,
+            self.load(),
+            extra={"request_id": getattr(request, "request_id", "unknown")},
+        )
+        response = JsonResponse(
+            {"detail": "The server is overloaded. Please try again later."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = str(max(math.ceil(self.queue_time), 1))
+        return response
+
+    def _average(self, average: float, value: float) -> float:
+        return average + self.smoothing * (value - average)
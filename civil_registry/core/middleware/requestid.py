@@ -24,10 +24,8 @@ class RequestIDMiddleware:
         """
         Generate a UUID and attach it to the request object.
         """
-        request_id = request.headers.get(
-            "X-Request-ID",
-            uuid.uuid4().hex,
-        )  # Get from header or generate
+        # Get from header or generate, only paying for the UUID when needed
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
 
         request.request_id = request_id
 
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.10 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="apicall",
+            index=models.Index(
+                fields=["timestamp", "id"],
+                name="core_apicall_timestamp_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.10 on 2026-10-19 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_apicall_timestamp_id_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuotaUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("user_id", models.IntegerField(db_index=True)),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("day", "Day"), ("month", "Month")], max_length=5
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-period_start"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="quotausage",
+            constraint=models.UniqueConstraint(
+                fields=("user_id", "period", "period_start"),
+                name="core_quotausage_unique_period",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.10 on 2026-10-19 16:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0003_quotausage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitTier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('priority', models.IntegerField(default=0)),
+                ('rate_limit', models.PositiveIntegerField(blank=True, help_text='Requests per rate limit window', null=True)),
+                ('rate_limit_window', models.PositiveIntegerField(default=1, help_text='Seconds')),
+                ('concurrency_limit', models.PositiveIntegerField(blank=True, help_text='Requests in flight at once', null=True)),
+                ('daily_quota', models.PositiveIntegerField(blank=True, null=True)),
+                ('monthly_quota', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('groups', models.ManyToManyField(blank=True, related_name='rate_limit_tiers', to='auth.group')),
+                ('users', models.ManyToManyField(blank=True, related_name='rate_limit_tiers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-priority', 'name'],
+            },
+        ),
+    ]
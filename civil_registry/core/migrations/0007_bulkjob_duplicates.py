@@ -0,0 +1,18 @@
+# Generated by Django 5.0.10 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_bulkjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkjob',
+            name='duplicates',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.10 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_bulkjob_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkjob',
+            name='mode',
+            field=models.CharField(choices=[('results', 'Results'), ('statistics', 'Statistics')], default='results', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='bulkjob',
+            name='statistics',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.10 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_bulkjob_statistics'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='bulkjob',
+            old_name='duplicates',
+            new_name='duplicates_within_chunk',
+        ),
+        migrations.AlterField(
+            model_name='bulkjob',
+            name='duplicates_within_chunk',
+            field=models.PositiveIntegerField(default=0, help_text='IDs repeated within their chunk of the job, validated once. Repeats across chunks are not counted.'),
+        ),
+    ]
@@ -1,17 +1,29 @@
+import calendar
 import datetime
+import hashlib
+import hmac
 import logging
 import re
+import secrets
+import uuid
 from abc import ABC
 from abc import abstractmethod
 from dataclasses import dataclass
+from typing import Any
 
+from django.conf import settings
+from django.db import IntegrityError
 from django.db import models
+from django.db import transaction
+from django.utils import timezone
 
 from .constants import GOVERNORATES_MAPPING
 from .exceptions import InvalidBirthDateError
 from .exceptions import InvalidCenturyDigitError
 from .exceptions import InvalidGovernorateCodeError
 from .exceptions import InvalidNationalIDError
+from .types import NationalIDErrorCode
+from .types import NationalIDResult
 
 logger = logging.getLogger("core")
 
@@ -82,6 +94,97 @@ class EgyptianNationalID(NationalID):
         object.__setattr__(self, "governorate", self.extract_governorate())
         object.__setattr__(self, "gender", self.extract_gender())
 
+    @classmethod
+    def parse(cls, id_number: Any) -> NationalIDResult:  # noqa: PLR0911
+        """
+        Validates and decodes ``id_number`` in a single pass.
+
+        Unlike the constructor this never raises: an invalid ID yields a
+        result carrying an error code, so rejecting bad input costs no more
+        than accepting a good one.
+        """
+        if id_number is None or id_number == "":
+            return NationalIDResult(
+                id_number="",
+                error=NationalIDErrorCode.REQUIRED,
+                detail="This field is required.",
+            )
+        if isinstance(id_number, int) and not isinstance(id_number, bool):
+            id_number = str(id_number)
+        if not isinstance(id_number, str):
+            return NationalIDResult(
+                id_number=str(id_number),
+                error=NationalIDErrorCode.INVALID_FORMAT,
+                detail="National ID must be a 14-digit number.",
+            )
+
+        id_number = id_number.strip()
+        if len(id_number) != cls.ID_LENGTH or not id_number.isdecimal():
+            return NationalIDResult(
+                id_number=id_number,
+                error=NationalIDErrorCode.INVALID_FORMAT,
+                detail="National ID must be a 14-digit number.",
+            )
+
+        century_digit = int(id_number[0])
+        if century_digit == cls.MIN_CENTURY_DIGIT:
+            year = 1900
+        elif century_digit == cls.MAX_CENTURY_DIGIT:
+            year = 2000
+        else:
+            return NationalIDResult(
+                id_number=id_number,
+                error=NationalIDErrorCode.INVALID_CENTURY,
+                detail=f"Invalid century digit: {century_digit}. Must be between 2 and 3.",
+            )
+
+        year += int(id_number[1:3])
+        month = int(id_number[3:5])
+        day = int(id_number[5:7])
+        if not (1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]):  # noqa: PLR2004
+            return NationalIDResult(
+                id_number=id_number,
+                error=NationalIDErrorCode.INVALID_BIRTH_DATE,
+                detail=f"Invalid birth date: {year}-{month}-{day}.",
+            )
+
+        gov_code = id_number[7:9]
+        governorate = GOVERNORATES_MAPPING.get(gov_code)
+        if governorate is None:
+            return NationalIDResult(
+                id_number=id_number,
+                error=NationalIDErrorCode.INVALID_GOVERNORATE,
+                detail=f"Invalid governorate code: {gov_code}.",
+            )
+
+        return NationalIDResult(
+            id_number=id_number,
+            birth_date=datetime.date(year, month, day),
+            governorate=governorate,
+            gender="Female" if int(id_number[12]) % 2 == 0 else "Male",
+        )
+
+    @classmethod
+    def pack(cls, id_number: str) -> int:
+        """
+        ``id_number`` as an integer, 8 bytes instead of a ``str``'s 60 or so:
+        14 digits stay below 2**47 and fit a signed 64-bit integer. Only the
+        format is checked, not the date or governorate.
+        """
+        if not (
+            isinstance(id_number, str)
+            and len(id_number) == cls.ID_LENGTH
+            and id_number.isascii()
+            and id_number.isdecimal()
+        ):
+            raise InvalidNationalIDError(id_number, cls.ID_LENGTH)
+        return int(id_number)
+
+    @classmethod
+    def unpack(cls, value: int) -> str:
+        """The ID packed into ``value`` by ``pack``."""
+        return f"{value:0{cls.ID_LENGTH}d}"
+
     def validate(self):
         """Validates the Egyptian National ID."""
         logger.debug("Validating Egyptian National ID: %s", self.id_number)
@@ -149,8 +252,217 @@ class ApiCall(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            # Keyset pagination over (timestamp, id), see api.pagination
+            models.Index(
+                fields=["timestamp", "id"],
+                name="core_apicall_timestamp_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return (
             f"{self.timestamp} - {self.request_method} {self.path} - {self.status_code}"
         )
+
+
+class QuotaUsage(models.Model):
+    """Requests a user made in a day or month, persisted from the redis counters."""
+
+    class Period(models.TextChoices):
+        DAY = "day", "Day"
+        MONTH = "month", "Month"
+
+    user_id = models.IntegerField(db_index=True)
+    period = models.CharField(max_length=5, choices=Period.choices)
+    period_start = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-period_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_id", "period", "period_start"],
+                name="core_quotausage_unique_period",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.period} {self.period_start} - {self.count}"
+
+
+class RateLimitTier(models.Model):
+    """
+    Limits granted to some users or groups in place of the views' defaults,
+    an empty limit keeps the default.
+
+    A tier assigned to the user directly wins over their groups' tiers, then
+    the tier with the highest ``priority``. Served from an in-process cache,
+    see ``core.tiers``.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    priority = models.IntegerField(default=0)
+    rate_limit = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Requests per rate limit window",
+    )
+    rate_limit_window = models.PositiveIntegerField(
+        default=1,
+        help_text="Seconds",
+    )
+    concurrency_limit = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Requests in flight at once",
+    )
+    daily_quota = models.PositiveIntegerField(null=True, blank=True)
+    monthly_quota = models.PositiveIntegerField(null=True, blank=True)
+    users = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        related_name="rate_limit_tiers",
+    )
+    groups = models.ManyToManyField(
+        "auth.Group",
+        blank=True,
+        related_name="rate_limit_tiers",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-priority", "name"]
+
+    def __str__(self):
+        return self.name
+
+
+class APIKeyManager(models.Manager):
+    def create_key(self, user, name: str = "", **kwargs) -> tuple["APIKey", str]:
+        """
+        Issue a key to ``user``. Returns the record and the key, which is
+        shown only once: only its prefix and a salted hash are stored.
+        """
+        while True:
+            prefix = secrets.token_hex(APIKey.PREFIX_BYTES)
+            secret = secrets.token_urlsafe(APIKey.SECRET_BYTES)
+            salt = secrets.token_hex(16)
+            try:
+                with transaction.atomic():
+                    api_key = self.create(
+                        user=user,
+                        name=name,
+                        prefix=prefix,
+                        salt=salt,
+                        key_hash=APIKey.hash_secret(secret, salt),
+                        **kwargs,
+                    )
+            except IntegrityError:
+                # Prefix taken, draw again
+                continue
+            return api_key, f"{prefix}.{secret}"
+
+
+class APIKey(models.Model):
+    """
+    A key looks like ``<prefix>.<secret>``. The prefix is stored in clear and
+    indexed to find the record, the secret only as a salted SHA-256. Keys are
+    random, so a fast hash is enough and a slow one would only let invalid
+    keys burn CPU.
+    """
+
+    PREFIX_BYTES = 4
+    SECRET_BYTES = 32
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="api_keys",
+    )
+    name = models.CharField(max_length=100, blank=True, default="")
+    prefix = models.CharField(max_length=16, unique=True)
+    salt = models.CharField(max_length=32)
+    key_hash = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    revoked = models.BooleanField(default=False)
+
+    objects = APIKeyManager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "API key"
+
+    def __str__(self):
+        return f"{self.prefix} ({self.name})" if self.name else self.prefix
+
+    @staticmethod
+    def hash_secret(secret: str, salt: str) -> str:
+        return hashlib.sha256(f"{salt}{secret}".encode()).hexdigest()
+
+    def check_secret(self, secret: str) -> bool:
+        return hmac.compare_digest(self.hash_secret(secret, self.salt), self.key_hash)
+
+    @property
+    def is_usable(self) -> bool:
+        return not self.revoked and (
+            self.expires_at is None or self.expires_at > timezone.now()
+        )
+
+
+class BulkJob(models.Model):
+    """
+    Validation of a large batch of IDs in the background. The IDs and the
+    results are kept in chunks in the "bulk_jobs" storage, see ``core.bulk``.
+    In statistics mode only aggregate counts are kept, no result per ID.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    class Mode(models.TextChoices):
+        RESULTS = "results", "Results"
+        STATISTICS = "statistics", "Statistics"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="bulk_jobs",
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    mode = models.CharField(
+        max_length=10,
+        choices=Mode.choices,
+        default=Mode.RESULTS,
+    )
+    total = models.PositiveIntegerField(default=0)
+    chunks = models.PositiveIntegerField(default=0)
+    # Updated as chunks complete
+    processed = models.PositiveIntegerField(default=0)
+    valid = models.PositiveIntegerField(default=0)
+    duplicates_within_chunk = models.PositiveIntegerField(
+        default=0,
+        help_text="IDs repeated within their chunk of the job, validated once. "
+        "Repeats across chunks are not counted.",
+    )
+    # Demographic counts of the valid IDs, set when a statistics job succeeds
+    statistics = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.id} - {self.status} {self.processed}/{self.total}"
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from functools import cache
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from redis import StrictRedis
+from redis.exceptions import RedisError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from redis.client import PubSub
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def pubsub_client() -> StrictRedis[str]:
+    """
+    Client of the invalidation listeners and their publishers, on
+    ``REDIS_URL``. Bounded by ``RATELIMIT_REDIS_SOCKET_TIMEOUT`` like the rate
+    limiter's, as it's used from the request path.
+    """
+    return StrictRedis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.RATELIMIT_REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.RATELIMIT_REDIS_SOCKET_TIMEOUT,
+    )
+
+
+class InvalidationListener:
+    """
+    Keeps an in-process cache in sync with edits made by other processes.
+
+    ``on_message`` is called with the data of every message published on
+    ``channel``, from a daemon thread. Until it's subscribed, and after losing
+    redis, the listener tries to subscribe every ``retry_interval`` seconds and
+    calls ``on_missed`` once it's through, as messages may have been lost in
+    between.
+
+    The redis client should have socket timeouts, see ``pubsub_client``, so
+    that publishing never holds up a request on an unreachable server.
+    """
+
+    # Seconds between attempts to subscribe again after losing redis
+    retry_interval = 5.0
+    # Seconds the thread waits for a message before checking if it was stopped
+    poll_interval = 1.0
+
+    def __init__(
+        self,
+        client: StrictRedis[str],
+        channel: str,
+        on_message: Callable[[str], object],
+        on_missed: Callable[[], object],
+    ) -> None:
+        self.client = client
+        self.channel = channel
+        self.on_message = on_message
+        self.on_missed = on_missed
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        # Set while subscribed, edits published before then are missed
+        self.subscribed = threading.Event()
+
+    def start(self) -> None:
+        """
+        Start the listener thread of this process, once per fork. Call it
+        before filling the cache.
+
+        The thread subscribes in the background, so this never waits on
+        redis, and calls ``on_missed`` once subscribed to drop anything cached
+        while edits could still go unnoticed.
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+        threading.Thread(
+            target=self._listen,
+            name=f"{self.channel}-listener",
+            daemon=True,
+        ).start()
+
+    def stop(self) -> None:
+        """Let the listener thread exit within ``poll_interval`` seconds."""
+        self._stopped.set()
+
+    def publish(self, message: str = "") -> None:
+        try:
+            self.client.publish(self.channel, message)
+        except RedisError:
+            logger.exception(
+                "Failed to publish on %s, other processes keep their cache "
+                "until it expires",
+                self.channel,
+            )
+
+    def _subscribe(self) -> PubSub | None:
+        try:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+        except RedisError:
+            logger.warning("Failed to subscribe to %s", self.channel)
+            return None
+        return pubsub
+
+    def _listen(self) -> None:
+        pubsub = None
+        while not self._stopped.is_set():
+            if pubsub is None:
+                pubsub = self._subscribe()
+                if pubsub is None:
+                    self._stopped.wait(self.retry_interval)
+                    continue
+                self.on_missed()
+                self.subscribed.set()
+            try:
+                # Polled rather than blocking on listen(), which would trip
+                # the client's socket timeout between messages
+                message = pubsub.get_message(timeout=self.poll_interval)
+            except RedisError:
+                self.subscribed.clear()
+                if self._stopped.is_set():
+                    return
+                logger.warning("Lost %s, subscribing again", self.channel)
+                pubsub = None
+                self._stopped.wait(self.retry_interval)
+                continue
+            if message is not None:
+                data = message["data"]
+                self.on_message(data.decode() if isinstance(data, bytes) else str(data))
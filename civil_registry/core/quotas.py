@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import datetime
+import logging
+from time import time
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.utils import timezone
+from redis import StrictRedis
+from redis.exceptions import RedisError
+
+from civil_registry.core.types import Quota
+from civil_registry.core.types import QuotaMeta
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from redis.client import Pipeline
+
+logger = logging.getLogger(__name__)
+
+# Set of subjects whose counters changed since the last flush to Postgres
+DIRTY_SUBJECTS_KEY = "quota:dirty"
+# Idle counters outlive a month so a late flush still sees them
+QUOTA_KEY_TTL = 62 * 24 * 60 * 60
+
+DAY_FIELD_PREFIX = "d:"
+MONTH_FIELD_PREFIX = "m:"
+
+
+def _period_fields(request_time: float) -> tuple[str, str]:
+    """Hash fields of the day and month ``request_time`` falls in (local time)"""
+    local_time = timezone.localtime(
+        datetime.datetime.fromtimestamp(request_time, tz=datetime.UTC),
+    )
+    return (
+        f"{DAY_FIELD_PREFIX}{local_time:%Y%m%d}",
+        f"{MONTH_FIELD_PREFIX}{local_time:%Y%m}",
+    )
+
+
+def parse_period_field(field: str) -> tuple[str, datetime.date]:
+    """
+    Reverse of ``_period_fields`` for a single field.
+
+    Returns the period ("day" or "month") and the date the period starts on.
+    """
+    if field.startswith(DAY_FIELD_PREFIX):
+        start = datetime.datetime.strptime(field[2:], "%Y%m%d")  # noqa: DTZ007
+        return "day", start.date()
+    start = datetime.datetime.strptime(field[2:], "%Y%m")  # noqa: DTZ007
+    return "month", start.date()
+
+
+class RedisQuotaTracker:
+    """
+    Daily and monthly usage counters kept in Redis.
+
+    Every subject (usually a user id) owns one hash "quota:<subject>" with a
+    field per period, e.g. "d:20250110" and "m:202501". Increments are queued
+    on a pipeline so they can share a round trip with the rate limit check,
+    see ``RedisRateLimiter.is_limited_with_quota``, and live on the rate
+    limiter server of the subject, see ``RedisRateLimiter.get_client``.
+    Counters are persisted to Postgres by the ``flush_quota_usage`` task.
+    """
+
+    # Number of replies ``queue_increment`` adds to a pipeline
+    QUEUED_COMMANDS = 4
+
+    def __init__(self, client: StrictRedis[str] | None = None) -> None:
+        self.client: StrictRedis[str] = client or StrictRedis.from_url(
+            settings.REDIS_URL,
+        )
+
+    def _construct_redis_key(self, subject: str | int) -> str:
+        return f"quota:{subject}"
+
+    def queue_increment(
+        self,
+        pipe: Pipeline,
+        subject: str | int,
+        request_time: float,
+        amount: int = 1,
+    ) -> None:
+        """
+        Queue the counter updates for ``subject`` on ``pipe``. The first two
+        replies are the new daily and monthly usage.
+        """
+        redis_key = self._construct_redis_key(subject)
+        day_field, month_field = _period_fields(request_time)
+        pipe.hincrby(redis_key, day_field, amount)
+        pipe.hincrby(redis_key, month_field, amount)
+        pipe.expire(redis_key, QUOTA_KEY_TTL)
+        pipe.sadd(DIRTY_SUBJECTS_KEY, subject)
+
+    def build_meta(self, daily_used: int, monthly_used: int, quota: Quota) -> QuotaMeta:
+        return QuotaMeta(
+            is_exceeded=daily_used > quota.daily or monthly_used > quota.monthly,
+            daily_used=daily_used,
+            daily_remaining=max(quota.daily - daily_used, 0),
+            monthly_used=monthly_used,
+            monthly_remaining=max(quota.monthly - monthly_used, 0),
+        )
+
+    def increment(
+        self,
+        subject: str | int,
+        quota: Quota,
+        request_time: float | None = None,
+        amount: int = 1,
+    ) -> QuotaMeta | None:
+        """Count requests against the quota. Returns None if redis fails."""
+        if request_time is None:
+            request_time = time()
+        try:
+            pipe = self.client.pipeline()
+            self.queue_increment(pipe, subject, request_time, amount=amount)
+            daily_used, monthly_used, *_ = pipe.execute()
+        except RedisError:
+            logger.exception("Failed to update quota usage in redis")
+            return None
+        return self.build_meta(daily_used, monthly_used, quota)
+
+    def refund(self, subject: str | int, request_time: float, amount: int = 1) -> None:
+        """Give back requests that were counted but then rejected."""
+        try:
+            pipe = self.client.pipeline()
+            self.queue_increment(pipe, subject, request_time, amount=-amount)
+            pipe.execute()
+        except RedisError:
+            logger.exception("Failed to refund quota usage in redis")
+
+    def usage(
+        self,
+        subject: str | int,
+        quota: Quota,
+        request_time: float | None = None,
+    ) -> QuotaMeta | None:
+        """Current usage and remaining quota, a single HMGET without counting."""
+        if request_time is None:
+            request_time = time()
+        try:
+            daily_used, monthly_used = self.client.hmget(
+                self._construct_redis_key(subject),
+                _period_fields(request_time),
+            )
+        except RedisError:
+            logger.exception("Failed to retrieve quota usage from redis")
+            return None
+        return self.build_meta(int(daily_used or 0), int(monthly_used or 0), quota)
+
+    def collect(
+        self,
+        batch_size: int = 500,
+        request_time: float | None = None,
+    ) -> Iterator[dict[str, dict[str, int]]]:
+        """
+        Yield batches of ``{subject: {field: count}}`` for the subjects used
+        since the last collection.
+
+        Fields of periods that are already over are dropped from redis once
+        the caller asks for the next batch, i.e. after it persisted this one.
+        Counts are absolute, so writing them is idempotent and a subject hit
+        again while being collected is simply picked up next time. The subjects
+        of a batch the caller failed on, or didn't get to persist before
+        closing the generator, are marked as used again.
+        """
+        if request_time is None:
+            request_time = time()
+        current_fields = set(_period_fields(request_time))
+
+        while subjects := self.client.spop(DIRTY_SUBJECTS_KEY, batch_size):
+            subjects = [subject.decode() for subject in subjects]
+            try:
+                pipe = self.client.pipeline()
+                for subject in subjects:
+                    pipe.hgetall(self._construct_redis_key(subject))
+
+                batch = {
+                    subject: {
+                        field.decode(): int(count) for field, count in counters.items()
+                    }
+                    for subject, counters in zip(subjects, pipe.execute(), strict=True)
+                }
+                yield batch
+            except BaseException:
+                # Not persisted, e.g. the database is down or the generator was
+                # closed early: leave the subjects for the next collection
+                self.client.sadd(DIRTY_SUBJECTS_KEY, *subjects)
+                raise
+
+            pipe = self.client.pipeline()
+            for subject, counts in batch.items():
+                stale_fields = counts.keys() - current_fields
+                if stale_fields:
+                    pipe.hdel(self._construct_redis_key(subject), *stale_fields)
+            pipe.execute()
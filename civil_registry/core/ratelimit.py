@@ -1,16 +1,32 @@
 from __future__ import annotations
 
 import logging
+import threading
+from functools import cache
+from math import ceil
+from time import monotonic
 from time import time
+from typing import TYPE_CHECKING
 from typing import Any
+from uuid import uuid4
 
 from django.conf import settings
-from redis import StrictRedis
 from redis.exceptions import RedisError
 
+from civil_registry.core.circuitbreaker import CircuitBreaker
 from civil_registry.core.exceptions import InvalidConfigurationError
+from civil_registry.core.sharding import RedisShards
+from civil_registry.core.types import RateLimitStorage
 from civil_registry.core.utils import md5_text
 
+if TYPE_CHECKING:
+    from redis import StrictRedis
+    from redis.client import Pipeline
+
+    from civil_registry.core.quotas import RedisQuotaTracker
+    from civil_registry.core.types import Quota
+    from civil_registry.core.types import QuotaMeta
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,6 +55,21 @@ class RateLimiter:
     ) -> tuple[bool, int, int]:
         return False, 0, 0
 
+    def acquire_slot(
+        self,
+        key: str,
+        limit: int,
+        lease: int | None = None,
+    ) -> tuple[bool, str | None]:
+        """
+        Take one of ``limit`` slots for requests in flight under ``key``.
+        Returns whether one was free and the token to release it with.
+        """
+        return True, None
+
+    def release_slot(self, key: str, token: str | None) -> None:
+        return
+
     def validate(self) -> None:
         raise NotImplementedError
 
@@ -60,15 +91,156 @@ def _bucket_start_time(bucket_number: int, window: int) -> int:
     return bucket_number * window
 
 
+class LocalRateLimiter(RateLimiter):
+    """
+    Fixed window counters kept in process memory.
+
+    Only approximate across a deployment: every process counts on its own, so
+    limits are divided by ``processes``, the number of processes expected to
+    share the traffic. Used as the fallback of ``RedisRateLimiter``.
+    """
+
+    # Expired windows are dropped once this many counters are held
+    max_counters = 10_000
+
+    def __init__(self, window: int = 60, processes: int = 1) -> None:
+        self.window = window
+        self.processes = processes
+        # (key, window, time bucket) -> hits
+        self._counters: dict[tuple[str, int, int], int] = {}
+        self._lock = threading.Lock()
+
+    def validate(self) -> None:
+        return
+
+    def current_value(self, key: str, window: int | None = None) -> int:
+        window = window or self.window
+        bucket = _time_bucket(time(), window)
+        return self._counters.get((key, window, bucket), 0)
+
+    def is_limited_with_value(
+        self,
+        key: str,
+        limit: int,
+        window: int | None = None,
+    ) -> tuple[bool, int, int]:
+        request_time = time()
+        window = window or self.window
+        bucket = _time_bucket(request_time, window)
+        reset_time = _bucket_start_time(bucket + 1, window)
+
+        with self._lock:
+            if len(self._counters) >= self.max_counters:
+                self._prune(request_time)
+            result = self._counters.get((key, window, bucket), 0) + 1
+            self._counters[(key, window, bucket)] = result
+
+        return result > ceil(limit / self.processes), result, reset_time
+
+    def reset(self, key: str, window: int | None = None) -> None:
+        window = window or self.window
+        self._counters.pop((key, window, _time_bucket(time(), window)), None)
+
+    def _prune(self, request_time: float) -> None:
+        self._counters = {
+            counter: hits
+            for counter, hits in self._counters.items()
+            if _bucket_start_time(counter[2] + 1, counter[1]) > request_time
+        }
+
+
+@cache
+def ratelimit_redis_shards() -> RedisShards:
+    """
+    The redis servers of the rate limiter and quotas, ``RATELIMIT_REDIS_URLS``.
+    Shared by the process so connections are pooled across requests.
+    """
+    # Give up quickly on a slow server, the circuit breaker takes over from there
+    return RedisShards.from_urls(
+        settings.RATELIMIT_REDIS_URLS,
+        socket_timeout=settings.RATELIMIT_REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.RATELIMIT_REDIS_SOCKET_TIMEOUT,
+    )
+
+
+def _circuit_breaker(shard: str, client: StrictRedis[str]) -> CircuitBreaker:
+    return CircuitBreaker(
+        f"ratelimit-redis-{shard}",
+        probe=client.ping,
+        failure_threshold=settings.RATELIMIT_BREAKER_FAILURE_THRESHOLD,
+        latency_threshold=settings.RATELIMIT_BREAKER_LATENCY_THRESHOLD,
+        probe_interval=settings.RATELIMIT_BREAKER_PROBE_INTERVAL,
+    )
+
+
+@cache
+def redis_circuit_breaker(shard: str) -> CircuitBreaker:
+    """The breaker of one redis server, shared by the process."""
+    return _circuit_breaker(shard, ratelimit_redis_shards().clients[shard])
+
+
+@cache
+def local_fallback_limiter() -> LocalRateLimiter:
+    """The fallback shared by every ``RedisRateLimiter`` of this process."""
+    return LocalRateLimiter(processes=settings.RATELIMIT_FALLBACK_PROCESSES)
+
+
 class RedisRateLimiter(RateLimiter):
     """
     RateLimiter implementation using Redis as the backend storage for rate limiting.
     Suitable for distributed rate limiting across multiple servers.
+
+    Keys are spread over the servers of ``RATELIMIT_REDIS_URLS`` by
+    consistent hashing, see ``RedisShards``. Calls to each server go through
+    its circuit breaker. While it fails or is slow, checks are answered by an
+    in-process ``LocalRateLimiter`` instead, without waiting on the socket
+    timeout or logging every request.
+
+    Counters are stored according to ``storage``:
+
+    - ``KEYS``: one string key per rate limit key and window, see
+      ``_construct_redis_key``.
+    - ``HASH``: one field per rate limit key, holding the first 8 bytes of
+      its md5 digest, in one of ``hash_shards`` hashes per window, e.g.
+      "rl:1:1736500000:417". Small hashes are stored as compact listpacks,
+      and every client of a shard shares a single key and expiry.
     """
 
-    def __init__(self, window: int = 60, **options: Any) -> None:
-        self.client: StrictRedis[str] = StrictRedis.from_url(settings.REDIS_URL)
+    def __init__(
+        self,
+        window: int = 60,
+        breaker: CircuitBreaker | None = None,
+        fallback: RateLimiter | None = None,
+        storage: RateLimitStorage | None = None,
+        hash_shards: int | None = None,
+        **options: Any,
+    ) -> None:
+        self.shards = ratelimit_redis_shards()
         self.window = window
+        # One breaker per server unless given
+        self.breaker = breaker
+        self.fallback = fallback or local_fallback_limiter()
+        self.storage = RateLimitStorage(storage or settings.RATELIMIT_STORAGE)
+        self.hash_shards = hash_shards or settings.RATELIMIT_HASH_SHARDS
+
+    @property
+    def client(self) -> StrictRedis[str]:
+        """The client of the first server, the only one without sharding."""
+        return next(iter(self.shards.clients.values()))
+
+    @client.setter
+    def client(self, client: StrictRedis[str]) -> None:
+        self.shards = RedisShards({"default": client})
+        if self.breaker is None:
+            self.breaker = _circuit_breaker("default", client)
+
+    def get_client(self, key: str | int) -> StrictRedis[str]:
+        """Client of the server holding ``key``."""
+        return self.shards.get(key)[1]
+
+    def _get_shard(self, key: str) -> tuple[StrictRedis[str], CircuitBreaker]:
+        name, client = self.shards.get(key)
+        return client, self.breaker or redis_circuit_breaker(name)
 
     def _construct_redis_key(
         self,
@@ -93,10 +265,52 @@ class RedisRateLimiter(RateLimiter):
 
         return f"rl:{key_hex}:{time_bucket}"
 
+    def _construct_redis_counter(
+        self,
+        key: str,
+        window: int | None = None,
+        request_time: float | None = None,
+    ) -> tuple[str, bytes | None]:
+        """
+        Redis key and hash field of the counter of ``key``. The field is None
+        with the ``KEYS`` storage.
+        """
+        if self.storage == RateLimitStorage.KEYS:
+            return self._construct_redis_key(key, window, request_time), None
+
+        if window is None or window == 0:
+            window = self.window
+
+        if request_time is None:
+            request_time = time()
+
+        digest = md5_text(key).digest()
+        shard = int.from_bytes(digest[8:12]) % self.hash_shards
+        time_bucket = _time_bucket(request_time, window)
+
+        return f"rl:{window}:{time_bucket}:{shard}", digest[:8]
+
+    def _construct_semaphore_key(self, key: str) -> str:
+        return f"cl:{md5_text(key).hexdigest()}"
+
+    def _queue_increment(
+        self,
+        pipe: Pipeline,
+        counter: tuple[str, bytes | None],
+        expiration: int,
+    ) -> None:
+        redis_key, field = counter
+        if field is None:
+            pipe.incr(redis_key)
+        else:
+            pipe.hincrby(redis_key, field, 1)
+        pipe.expire(redis_key, expiration)
+
     def validate(self) -> None:
         try:
-            self.client.ping()
-            self.client.connection_pool.disconnect()
+            for client in self.shards.clients.values():
+                client.ping()
+                client.connection_pool.disconnect()
         except Exception as e:
             raise InvalidConfigurationError(str(e)) from e
 
@@ -108,10 +322,14 @@ class RedisRateLimiter(RateLimiter):
         """
         Get the current value stored in redis for the rate limit with key "key" and said window
         """
-        redis_key = self._construct_redis_key(key, window=window)
+        redis_key, field = self._construct_redis_counter(key, window=window)
+        client = self.get_client(key)
 
         try:
-            current_count = self.client.get(redis_key)
+            if field is None:
+                current_count = client.get(redis_key)
+            else:
+                current_count = client.hget(redis_key, field)
         except RedisError:
             # Don't report any existing hits when there is a redis error.
             # Log what happened and move on
@@ -138,35 +356,160 @@ class RedisRateLimiter(RateLimiter):
         request_time = time()
         if window is None or window == 0:
             window = self.window
-        redis_key = self._construct_redis_key(
+        counter = self._construct_redis_counter(
             key,
             window=window,
             request_time=request_time,
         )
 
+        client, breaker = self._get_shard(key)
+        if not breaker.allow_request():
+            return self.fallback.is_limited_with_value(key, limit, window=window)
+
         expiration = window - int(request_time % window)
         # Reset Time = next time bucket's start time
         reset_time = _bucket_start_time(_time_bucket(request_time, window) + 1, window)
+        start = monotonic()
         try:
-            pipe = self.client.pipeline()
-            pipe.incr(redis_key)
-            pipe.expire(redis_key, expiration)
+            pipe = client.pipeline()
+            self._queue_increment(pipe, counter, expiration)
             pipeline_result = pipe.execute()
-
-            # Handle potential None result (unlikely with incr and expire)
-            if None in pipeline_result:
-                logger.warning("Redis pipeline returned None for one of the commands.")
-                return False, 0, reset_time
-
-            result = pipeline_result[0]
         except RedisError:
             # We don't want rate limited endpoints to fail when ratelimits
             # can't be updated. We do want to know when that happens.
             logger.exception("Failed to retrieve current value from redis")
+            breaker.record_failure()
+            return self.fallback.is_limited_with_value(key, limit, window=window)
+        breaker.record_success(monotonic() - start)
+
+        # Handle potential None result (unlikely with incr and expire)
+        if None in pipeline_result:
+            logger.warning("Redis pipeline returned None for one of the commands.")
             return False, 0, reset_time
 
+        result = pipeline_result[0]
         return result > limit, result, reset_time
 
+    def is_limited_with_quota(  # noqa: PLR0913
+        self,
+        key: str,
+        limit: int,
+        quota_tracker: RedisQuotaTracker,
+        subject: str | int,
+        quota: Quota,
+        window: int | None = None,
+    ) -> tuple[bool, int, int, QuotaMeta | None]:
+        """
+        Same as ``is_limited_with_value`` but also counts the request against
+        the daily and monthly quota of ``subject``, in the same round trip.
+
+        Requests rejected by either check are refunded to the quota, so only
+        accepted requests consume it.
+
+        With several servers, ``key`` must live on the same one as ``subject``,
+        e.g. by tagging it "{<subject>}", and ``quota_tracker`` must use that
+        server's client, see ``get_client``.
+        """
+        request_time = time()
+        if window is None or window == 0:
+            window = self.window
+        counter = self._construct_redis_counter(
+            key,
+            window=window,
+            request_time=request_time,
+        )
+
+        client, breaker = self._get_shard(key)
+        if not breaker.allow_request():
+            # Quotas need the shared counters, they are not enforced meanwhile
+            return (
+                *self.fallback.is_limited_with_value(key, limit, window=window),
+                None,
+            )
+
+        expiration = window - int(request_time % window)
+        reset_time = _bucket_start_time(_time_bucket(request_time, window) + 1, window)
+        start = monotonic()
+        try:
+            pipe = client.pipeline()
+            self._queue_increment(pipe, counter, expiration)
+            quota_tracker.queue_increment(pipe, subject, request_time)
+            result, _, daily_used, monthly_used, *_ = pipe.execute()
+        except RedisError:
+            logger.exception("Failed to check rate limit and quota in redis")
+            breaker.record_failure()
+            return (
+                *self.fallback.is_limited_with_value(key, limit, window=window),
+                None,
+            )
+        breaker.record_success(monotonic() - start)
+
+        quota_meta = quota_tracker.build_meta(daily_used, monthly_used, quota)
+        is_limited = result > limit
+        if is_limited or quota_meta.is_exceeded:
+            quota_tracker.refund(subject, request_time)
+        return is_limited, result, reset_time, quota_meta
+
+    def acquire_slot(
+        self,
+        key: str,
+        limit: int,
+        lease: int | None = None,
+    ) -> tuple[bool, str | None]:
+        """
+        Distributed semaphore: the holders of ``key`` are kept in a sorted set
+        scored by the time their lease runs out, so slots of requests that
+        never released them (e.g. a killed worker) free up after ``lease``
+        seconds.
+
+        Contenders racing for the last slot may both be turned away, never
+        both let in. When redis fails the request is let through untracked,
+        with a None token.
+        """
+        request_time = time()
+        lease = lease or self.window
+        redis_key = self._construct_semaphore_key(key)
+        token = uuid4().hex
+
+        client, breaker = self._get_shard(key)
+        if not breaker.allow_request():
+            return True, None
+
+        start = monotonic()
+        try:
+            pipe = client.pipeline()
+            pipe.zremrangebyscore(redis_key, "-inf", request_time)
+            pipe.zadd(redis_key, {token: request_time + lease})
+            pipe.zcard(redis_key)
+            pipe.expire(redis_key, lease)
+            _, _, holders, _ = pipe.execute()
+            if holders > limit:
+                client.zrem(redis_key, token)
+        except RedisError:
+            logger.exception("Failed to acquire concurrency slot in redis")
+            breaker.record_failure()
+            return True, None
+        breaker.record_success(monotonic() - start)
+
+        if holders > limit:
+            return False, None
+        return True, token
+
+    def release_slot(self, key: str, token: str | None) -> None:
+        if token is None:
+            return
+        client, breaker = self._get_shard(key)
+        try:
+            client.zrem(self._construct_semaphore_key(key), token)
+        except RedisError:
+            # The lease runs out on its own
+            logger.exception("Failed to release concurrency slot in redis")
+            breaker.record_failure()
+
     def reset(self, key: str, window: int | None = None) -> None:
-        redis_key = self._construct_redis_key(key, window=window)
-        self.client.delete(redis_key)
+        redis_key, field = self._construct_redis_counter(key, window=window)
+        client = self.get_client(key)
+        if field is None:
+            client.delete(redis_key)
+        else:
+            client.hdel(redis_key, field)
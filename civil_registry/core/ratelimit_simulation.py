@@ -0,0 +1,232 @@
+"""
+Replays request traces against rate limiters under a simulated clock.
+
+Every decision of the limiter under test is compared with the one an ideal
+sliding window limiter makes for the same request, and the redis commands it
+needs are counted when it runs on ``counting_redis_client``.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import heapq
+import random
+from collections import defaultdict
+from collections import deque
+from dataclasses import dataclass
+from itertools import chain
+from time import perf_counter
+from time import time
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+
+from django.utils.dateparse import parse_datetime
+from fakeredis import FakeConnection
+from fakeredis import FakeServer
+from redis import ConnectionPool
+from redis import StrictRedis
+
+from civil_registry.core.ratelimit import RateLimiter
+from civil_registry.core.utils import freeze_time
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from collections.abc import Sequence
+    from typing import TextIO
+
+# 2000-01-01, synthetic traces start here
+DEFAULT_START = 946684800.0
+
+
+class TraceEvent(NamedTuple):
+    timestamp: float
+    key: str
+
+
+def synthetic_trace(  # noqa: PLR0913
+    clients: int,
+    rate: float,
+    duration: float,
+    start: float = DEFAULT_START,
+    spread: float = 0.5,
+    seed: int = 0,
+) -> Iterator[TraceEvent]:
+    """
+    Poisson arrivals of ``clients`` clients over ``duration`` seconds, in
+    timestamp order. Each client sends on average ``rate`` requests per
+    second, give or take ``spread`` (a fraction of ``rate``).
+    """
+    rng = random.Random(seed)  # noqa: S311
+
+    def arrivals(client: int) -> Iterator[TraceEvent]:
+        client_rate = rate * rng.uniform(1 - spread, 1 + spread)
+        timestamp = start + rng.expovariate(client_rate)
+        while timestamp < start + duration:
+            yield TraceEvent(timestamp, f"id-validate:{{{client}}}")
+            timestamp += rng.expovariate(client_rate)
+
+    return heapq.merge(*(list(arrivals(client)) for client in range(clients)))
+
+
+def load_trace(file: TextIO) -> Iterator[TraceEvent]:
+    """
+    Read a recorded trace from CSV with a "timestamp" column (ISO 8601 or
+    epoch seconds) and a "key" or "user_id" column. The API calls export
+    (``/api/api-calls/export/``) can be replayed as is. Rows are sorted by
+    timestamp.
+    """
+    events = []
+    for row in csv.DictReader(file):
+        raw_timestamp = row["timestamp"]
+        try:
+            timestamp = float(raw_timestamp)
+        except ValueError:
+            timestamp = parse_datetime(raw_timestamp).timestamp()
+        key = row.get("key") or f"id-validate:{{{row['user_id']}}}"
+        events.append(TraceEvent(timestamp, key))
+    return iter(sorted(events))
+
+
+class SlidingWindowLogRateLimiter(RateLimiter):
+    """
+    Exact reference limiter: a request is accepted if fewer than ``limit``
+    requests were accepted in the ``window`` seconds before it. Keeps every
+    accepted timestamp, only fit for simulations.
+    """
+
+    def __init__(self, window: int = 60) -> None:
+        self.window = window
+        self._accepted: dict[str, deque[float]] = defaultdict(deque)
+
+    def validate(self) -> None:
+        return
+
+    def is_limited_with_value(
+        self,
+        key: str,
+        limit: int,
+        window: int | None = None,
+    ) -> tuple[bool, int, int]:
+        request_time = time()
+        window = window or self.window
+        accepted = self._accepted[key]
+        while accepted and accepted[0] <= request_time - window:
+            accepted.popleft()
+
+        is_limited = len(accepted) >= limit
+        if not is_limited:
+            accepted.append(request_time)
+        reset_time = int(accepted[0] + window) if accepted else int(request_time)
+        return is_limited, len(accepted), reset_time
+
+
+class BalancedRateLimiter(RateLimiter):
+    """
+    Sends every check to one of ``limiters`` at random, like a load balancer
+    spreading requests over processes that each limit on their own.
+    """
+
+    def __init__(self, limiters: Sequence[RateLimiter], seed: int = 0) -> None:
+        self.limiters = limiters
+        self._rng = random.Random(seed)  # noqa: S311
+
+    def validate(self) -> None:
+        return
+
+    def is_limited_with_value(
+        self,
+        key: str,
+        limit: int,
+        window: int | None = None,
+    ) -> tuple[bool, int, int]:
+        limiter = self._rng.choice(self.limiters)
+        return limiter.is_limited_with_value(key, limit, window=window)
+
+
+class CommandCountingConnection(FakeConnection):
+    """fakeredis connection counting the commands run, one per reply read."""
+
+    commands = 0
+
+    def read_response(self, **kwargs):
+        CommandCountingConnection.commands += 1
+        return super().read_response(**kwargs)
+
+
+def counting_redis_client() -> StrictRedis[str]:
+    """A client of a fresh fakeredis server counting its commands."""
+    return StrictRedis(
+        connection_pool=ConnectionPool(
+            connection_class=CommandCountingConnection,
+            server=FakeServer(),
+        ),
+    )
+
+
+@dataclass
+class SimulationResult:
+    decisions: int = 0
+    accepted: int = 0
+    # Accepted although the ideal limiter rejected, and the other way round
+    false_accepts: int = 0
+    false_rejects: int = 0
+    redis_commands: int = 0
+    # Seconds spent in the limiter, wall clock
+    elapsed: float = 0.0
+
+    @property
+    def rejected(self) -> int:
+        return self.decisions - self.accepted
+
+    @property
+    def accuracy(self) -> float:
+        if not self.decisions:
+            return 1.0
+        return 1 - (self.false_accepts + self.false_rejects) / self.decisions
+
+    @property
+    def commands_per_decision(self) -> float:
+        return self.redis_commands / self.decisions if self.decisions else 0.0
+
+    @property
+    def decisions_per_second(self) -> float:
+        return self.decisions / self.elapsed if self.elapsed else 0.0
+
+
+def simulate(
+    limiter: RateLimiter,
+    trace: Iterable[TraceEvent],
+    limit: int,
+    window: int,
+) -> SimulationResult:
+    """
+    Replay ``trace`` against ``limiter``, moving the clock to each request's
+    timestamp before checking it.
+    """
+    ideal = SlidingWindowLogRateLimiter()
+    result = SimulationResult()
+    commands = CommandCountingConnection.commands
+
+    events = iter(trace)
+    first = next(events, None)
+    if first is None:
+        return result
+
+    start = datetime.datetime.fromtimestamp(first.timestamp, tz=datetime.UTC)
+    with freeze_time(start) as clock:
+        for event in chain([first], events):
+            clock.move_to(event.timestamp)
+            checked_at = perf_counter()
+            is_limited = limiter.is_limited(event.key, limit, window=window)
+            result.elapsed += perf_counter() - checked_at
+
+            should_limit = ideal.is_limited(event.key, limit, window=window)
+            result.decisions += 1
+            result.accepted += not is_limited
+            result.false_accepts += should_limit and not is_limited
+            result.false_rejects += is_limited and not should_limit
+
+    result.redis_commands = CommandCountingConnection.commands - commands
+    return result
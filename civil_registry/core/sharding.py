@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from bisect import bisect
+from typing import TYPE_CHECKING
+from typing import Any
+from urllib.parse import urlsplit
+
+from redis import StrictRedis
+
+from civil_registry.core.utils import md5_text
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+def routing_key(key: str | int) -> str:
+    """
+    The part of ``key`` that picks its shard: the text between the first "{"
+    and the next "}" if there is any, else the whole key. Same rule as Redis
+    Cluster hash tags, e.g. "id-validate:{42}" lands next to "42".
+    """
+    key = str(key)
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start + 1 : end]
+    return key
+
+
+def _server_name(url: str) -> str:
+    # Stable across restarts and free of credentials, it shows up in logs
+    parts = urlsplit(url)
+    return f"{parts.hostname}:{parts.port or 6379}{parts.path}"
+
+
+def _ring_point(value: str) -> int:
+    return int.from_bytes(md5_text(value).digest()[:8])
+
+
+class RedisShards:
+    """
+    Client side sharding over several redis servers.
+
+    Keys are placed on a consistent hash ring with ``replicas`` points per
+    server, named after the server, so adding or removing one only moves the
+    keys it gains or loses. With a single server every key goes to it without
+    hashing.
+    """
+
+    replicas = 160
+
+    def __init__(self, clients: dict[str, StrictRedis[str]]) -> None:
+        self.clients = clients
+        ring = sorted(
+            (_ring_point(f"{name}-{replica}"), name)
+            for name in clients
+            for replica in range(self.replicas)
+        )
+        self._points = [point for point, _ in ring]
+        self._names = [name for _, name in ring]
+
+    @classmethod
+    def from_urls(cls, urls: Iterable[str], **options: Any) -> RedisShards:
+        return cls(
+            {_server_name(url): StrictRedis.from_url(url, **options) for url in urls},
+        )
+
+    def get(self, key: str | int) -> tuple[str, StrictRedis[str]]:
+        """Name and client of the server holding ``key``."""
+        if len(self.clients) == 1:
+            return next(iter(self.clients.items()))
+        index = bisect(self._points, _ring_point(routing_key(key)))
+        name = self._names[index % len(self._names)]
+        return name, self.clients[name]
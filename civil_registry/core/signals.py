@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from civil_registry.core.api.authentication import invalidate_cached_token
+from civil_registry.core.api.authentication import revoke_cached_api_keys
+from civil_registry.core.models import APIKey
+from civil_registry.core.models import RateLimitTier
+from civil_registry.core.tiers import invalidate_tiers
+
+
+@receiver(post_delete, sender=Token)
+def revoke_cached_token(sender, instance, **kwargs):
+    invalidate_cached_token(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_cached_user_token(sender, instance, **kwargs):
+    # A deactivated user must not keep authenticating from the cache
+    token = Token.objects.filter(user=instance).only("key").first()
+    if token is not None:
+        invalidate_cached_token(token.key)
+
+
+@receiver(post_save, sender=APIKey)
+@receiver(post_delete, sender=APIKey)
+def revoke_cached_api_key(sender, instance, *, created=False, **kwargs):
+    if created:
+        return
+    transaction.on_commit(lambda: revoke_cached_api_keys(instance.prefix))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def revoke_cached_user_api_keys(sender, instance, *, created=False, **kwargs):
+    # Cached keys carry the user, drop them to pick up a deactivation
+    if created:
+        return
+    prefixes = list(
+        APIKey.objects.filter(user=instance).values_list("prefix", flat=True),
+    )
+    if prefixes:
+        transaction.on_commit(lambda: revoke_cached_api_keys(*prefixes))
+
+
+@receiver(post_save, sender=RateLimitTier)
+@receiver(post_delete, sender=RateLimitTier)
+@receiver(m2m_changed, sender=RateLimitTier.users.through)
+@receiver(m2m_changed, sender=RateLimitTier.groups.through)
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_rate_limit_tiers(sender, action=None, **kwargs):
+    if action is not None and not action.startswith("post_"):
+        return
+    # Other processes would reload the old assignments before the commit
+    transaction.on_commit(invalidate_tiers)
@@ -1,13 +1,26 @@
+import datetime
 import logging
+from contextlib import closing
 
+from celery import chord
 from celery import shared_task
+from django.conf import settings
+from django.db.models import F
+from django.db.models import Q
+from django.utils import timezone
 
+from civil_registry.core import bulk
 from civil_registry.core.models import ApiCall
+from civil_registry.core.models import BulkJob
+from civil_registry.core.models import QuotaUsage
+from civil_registry.core.quotas import RedisQuotaTracker
+from civil_registry.core.quotas import parse_period_field
+from civil_registry.core.ratelimit import ratelimit_redis_shards
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def create_api_call_record(data):
     try:
         ApiCall.objects.create(**data)
@@ -18,3 +31,124 @@ def create_api_call_record(data):
         )
     except Exception:
         logger.exception("Error saving API call:")
+
+
+@shared_task(ignore_result=True)
+def flush_quota_usage():
+    """Persist the quota counters kept in redis, scheduled by celery beat."""
+    flushed = 0
+    for client in ratelimit_redis_shards().clients.values():
+        flushed += _flush_quota_usage(RedisQuotaTracker(client=client))
+    logger.info("Quota usage flushed: %s counters", flushed)
+    return flushed
+
+
+def _flush_quota_usage(quota_tracker: RedisQuotaTracker) -> int:
+    flushed = 0
+    # Closed right away if persisting fails, so the batch is collected again
+    with closing(quota_tracker.collect()) as batches:
+        for batch in batches:
+            usages = []
+            for user_id, counts in batch.items():
+                for field, count in counts.items():
+                    period, period_start = parse_period_field(field)
+                    usages.append(
+                        QuotaUsage(
+                            user_id=int(user_id),
+                            period=period,
+                            period_start=period_start,
+                            count=count,
+                        ),
+                    )
+            QuotaUsage.objects.bulk_create(
+                usages,
+                update_conflicts=True,
+                unique_fields=["user_id", "period", "period_start"],
+                update_fields=["count", "updated_at"],
+            )
+            flushed += len(usages)
+    return flushed
+
+
+def start_bulk_job(job: BulkJob) -> None:
+    """
+    Fan the chunks of ``job`` out over the ``bulk`` queue, the job is marked
+    finished once all of them are done.
+    """
+    BulkJob.objects.filter(pk=job.pk).update(status=BulkJob.Status.RUNNING)
+    # Ages are computed on the submission date, whenever a chunk runs
+    as_of = timezone.localdate(job.created_at).isoformat()
+    chord(
+        validate_bulk_chunk.s(str(job.pk), index, job.mode, as_of)
+        for index in range(job.chunks)
+    )(
+        finish_bulk_job.s(str(job.pk), job.mode).on_error(
+            fail_bulk_job.s(str(job.pk)),
+        ),
+    )
+
+
+@shared_task(acks_late=True)
+def validate_bulk_chunk(job_id, index, mode=BulkJob.Mode.RESULTS, as_of=None):
+    if mode == BulkJob.Mode.STATISTICS:
+        stats = bulk.aggregate_chunk(
+            job_id,
+            index,
+            datetime.date.fromisoformat(as_of),
+        )
+    else:
+        stats = bulk.validate_chunk(job_id, index)
+    # Progress only, a redelivered chunk counts twice until the job finishes
+    BulkJob.objects.filter(pk=job_id).update(
+        processed=F("processed") + stats.processed,
+        valid=F("valid") + stats.valid,
+        duplicates_within_chunk=F("duplicates_within_chunk") + stats.duplicates,
+    )
+    return stats
+
+
+@shared_task(ignore_result=True)
+def finish_bulk_job(results, job_id, mode=BulkJob.Mode.RESULTS):
+    # Chunk stats come back from the result backend as plain lists
+    chunks = [bulk.ChunkStats(*result) for result in results]
+    processed = sum(chunk.processed for chunk in chunks)
+    BulkJob.objects.filter(pk=job_id).update(
+        status=BulkJob.Status.SUCCEEDED,
+        processed=processed,
+        valid=sum(chunk.valid for chunk in chunks),
+        duplicates_within_chunk=sum(chunk.duplicates for chunk in chunks),
+        statistics=bulk.merge_statistics(chunk.statistics for chunk in chunks)
+        if mode == BulkJob.Mode.STATISTICS
+        else None,
+        finished_at=timezone.now(),
+    )
+    logger.info("Bulk job %s validated %s IDs", job_id, processed)
+
+
+@shared_task(ignore_result=True)
+def fail_bulk_job(request, exc, traceback, job_id):
+    logger.error("Bulk job %s failed: %r", job_id, exc)
+    BulkJob.objects.filter(pk=job_id).update(
+        status=BulkJob.Status.FAILED,
+        error="Validation failed, please submit the job again.",
+        finished_at=timezone.now(),
+    )
+
+
+@shared_task(ignore_result=True)
+def delete_expired_bulk_jobs():
+    """
+    Delete bulk jobs, and their files, ``BULK_JOB_RETENTION_DAYS`` after they
+    finished. Jobs that never finished expire as long after they were
+    submitted. Scheduled by celery beat.
+    """
+    cutoff = timezone.now() - datetime.timedelta(days=settings.BULK_JOB_RETENTION_DAYS)
+    expired = BulkJob.objects.filter(
+        Q(finished_at__lt=cutoff) | Q(finished_at__isnull=True, created_at__lt=cutoff),
+    )
+    deleted = 0
+    for job_id in expired.values_list("pk", flat=True).iterator():
+        bulk.delete_job_files(job_id)
+        deleted += BulkJob.objects.filter(pk=job_id).delete()[0]
+    logger.info("Expired bulk jobs deleted: %s", deleted)
+    return deleted
@@ -0,0 +1,146 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+from django.contrib.auth.models import User
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from civil_registry.core.api.authentication import VerifiedKeyCache
+from civil_registry.core.models import APIKey
+from civil_registry.core.utils import freeze_time
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="partner")
+
+
+@pytest.fixture
+def client(api_client, tier_cache, user):
+    # Tiers are loaded once per process
+    tier_cache.get(user.id)
+    return api_client
+
+
+def validate(client, key):
+    return client.post(
+        "/api/validate/",
+        {"id_number": "29001011234567"},
+        format="json",
+        headers={"Authorization": f"Api-Key {key}"},
+    )
+
+
+def test_only_prefix_and_salted_hash_are_stored(user):
+    api_key, key = APIKey.objects.create_key(user, name="ci")
+    prefix, secret = key.split(".")
+    assert api_key.prefix == prefix
+    assert secret not in api_key.key_hash
+    assert api_key.check_secret(secret)
+    assert not api_key.check_secret(secret[:-1])
+
+    other, _ = APIKey.objects.create_key(user)
+    assert other.salt != api_key.salt
+
+
+def test_issue_and_list_keys(client, user):
+    client.force_authenticate(user)
+    response = client.post("/api/api-keys/", {"name": "ci"}, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    key = response.data["key"]
+    assert key.startswith(f"{response.data['prefix']}.")
+
+    response = client.get("/api/api-keys/")
+    assert [api_key["name"] for api_key in response.data] == ["ci"]
+    assert "key" not in response.data[0]
+
+
+def test_authenticates_from_memory(client, user, django_assert_num_queries):
+    _, key = APIKey.objects.create_key(user)
+    with django_assert_num_queries(1):
+        assert validate(client, key).status_code == status.HTTP_200_OK
+    with django_assert_num_queries(0):
+        assert validate(client, key).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.parametrize("mangle", [lambda key: key[:-1], lambda key: f"x{key}"])
+def test_invalid_keys(client, user, mangle):
+    _, key = APIKey.objects.create_key(user)
+    response = validate(client, mangle(key))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_revoked_keys_are_dropped_on_commit(
+    client,
+    user,
+    django_capture_on_commit_callbacks,
+):
+    api_key, key = APIKey.objects.create_key(user)
+    assert validate(client, key).status_code == status.HTTP_200_OK
+
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.delete(f"/api/api-keys/{api_key.prefix}/")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    api_key.refresh_from_db()
+    assert api_key.revoked
+
+    client.credentials()
+    assert validate(client, key).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_revocations_reach_every_process(
+    user,
+    api_key_cache,
+    redis_client,
+    wait_for,
+):
+    api_key_cache.set("abcd.secret", (user, None))
+    api_key_cache.set("abce.secret", (user, None))
+
+    # Another process revokes a key
+    redis_client.publish("api-keys:revoke", "abcd")
+    wait_for(lambda: api_key_cache.get("abcd.secret") is None)
+    assert api_key_cache.get("abce.secret") is not None
+
+
+def test_cache_is_bounded_and_expires(redis_client, wait_for):
+    api_key_cache = VerifiedKeyCache(redis_client, max_size=2, timeout=60)
+    # Subscribing clears the cache, in case a revocation was missed
+    api_key_cache.listener.start()
+    wait_for(api_key_cache.listener.subscribed.is_set)
+    with freeze_time("2000-01-01") as frozen_time:
+        api_key_cache.set("a.1", ("a", None))
+        api_key_cache.set("b.1", ("b", None))
+        api_key_cache.get("a.1")
+        api_key_cache.set("c.1", ("c", None))
+        # Least recently used first
+        assert api_key_cache.get("b.1") is None
+        assert api_key_cache.get("a.1") is not None
+
+        frozen_time.shift(61)
+        assert api_key_cache.get("a.1") is None
+    api_key_cache.listener.stop()
+
+
+def test_lookups_do_not_wait_for_the_subscription(wait_for):
+    subscribing = threading.Event()
+    unreachable = threading.Event()
+
+    def pubsub(**kwargs):
+        subscribing.set()
+        unreachable.wait()
+        raise RedisConnectionError
+
+    api_key_cache = VerifiedKeyCache(Mock(pubsub=pubsub))
+    assert api_key_cache.get("a.1") is None
+    wait_for(subscribing.is_set)
+    api_key_cache.set("a.1", ("a", None))
+    assert api_key_cache.get("a.1") is not None
+
+    api_key_cache.listener.stop()
+    unreachable.set()
@@ -0,0 +1,45 @@
+from unittest.mock import Mock
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from civil_registry.core.middleware.apiexempt import CsrfViewMiddleware
+from civil_registry.core.middleware.apiexempt import SessionMiddleware
+
+
+@pytest.fixture
+def request_factory():
+    return RequestFactory()
+
+
+def test_api_requests_skip_sessions(request_factory):
+    middleware = SessionMiddleware(lambda request: HttpResponse())
+    request = request_factory.get("/api/validate/")
+    middleware(request)
+    assert not hasattr(request, "session")
+
+
+def test_other_requests_keep_sessions(request_factory):
+    middleware = SessionMiddleware(lambda request: HttpResponse())
+    request = request_factory.get("/admin/")
+    middleware(request)
+    assert hasattr(request, "session")
+
+
+def test_api_requests_skip_csrf_checks(request_factory):
+    middleware = CsrfViewMiddleware(lambda request: HttpResponse())
+    view = Mock(csrf_exempt=False)
+    request = request_factory.post("/api/validate/")
+    assert middleware.process_view(request, view, (), {}) is None
+
+    request = request_factory.post("/admin/login/")
+    response = middleware.process_view(request, view, (), {})
+    assert response.status_code == 403  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_api_html_pages_keep_frame_options(client):
+    response = client.get("/api/docs/")
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response["X-Frame-Options"] == "DENY"
@@ -0,0 +1,38 @@
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from civil_registry.core.api.authentication import CachedTokenAuthentication
+
+
+@pytest.fixture
+def token(db):
+    user = User.objects.create_user(username="cached", password="cached")  # noqa: S106
+    return Token.objects.create(user=user)
+
+
+def test_cached_credentials(token, django_assert_num_queries):
+    authentication = CachedTokenAuthentication()
+    user, _ = authentication.authenticate_credentials(token.key)
+    with django_assert_num_queries(0):
+        cached_user, cached_token = authentication.authenticate_credentials(token.key)
+    assert cached_user.pk == user.pk
+    assert cached_token.key == token.key
+
+
+def test_deleted_token_is_evicted(token):
+    authentication = CachedTokenAuthentication()
+    authentication.authenticate_credentials(token.key)
+    token.delete()
+    with pytest.raises(AuthenticationFailed):
+        authentication.authenticate_credentials(token.key)
+
+
+def test_deactivated_user_is_evicted(token):
+    authentication = CachedTokenAuthentication()
+    authentication.authenticate_credentials(token.key)
+    token.user.is_active = False
+    token.user.save()
+    with pytest.raises(AuthenticationFailed):
+        authentication.authenticate_credentials(token.key)
@@ -0,0 +1,440 @@
+import datetime
+import io
+import json
+import uuid
+from unittest.mock import patch
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework import status
+
+from civil_registry.core import bulk
+from civil_registry.core import columnar
+from civil_registry.core.api.renderers import ArrowStreamRenderer
+from civil_registry.core.api.renderers import ParquetRenderer
+from civil_registry.core.api.serializers import national_id_result_data
+from civil_registry.core.exceptions import InvalidColumnarFileError
+from civil_registry.core.models import BulkJob
+from civil_registry.core.models import EgyptianNationalID
+from civil_registry.core.tasks import delete_expired_bulk_jobs
+from config.celery_app import app
+
+pytestmark = pytest.mark.django_db
+
+VALID_ID = "29001011234567"
+INVALID_ID = "29805239934567"
+# 2005-08-15, Cairo, male
+YOUNG_ID = "30508150112355"
+
+
+@pytest.fixture(autouse=True)
+def bulk_storage(settings, tmp_path):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "bulk_jobs": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": str(tmp_path)},
+        },
+    }
+    settings.BULK_JOB_CHUNK_SIZE = 2
+    return tmp_path
+
+
+@pytest.fixture
+def eager_celery():
+    app.conf.update(task_always_eager=True, task_eager_propagates=True)
+    yield
+    app.conf.update(task_always_eager=False, task_eager_propagates=False)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="partner")
+
+
+@pytest.fixture
+def client(api_client, user, rate_limiter):
+    client = api_client
+    client.force_authenticate(user)
+    with patch(
+        "civil_registry.core.api.views.RedisRateLimiter",
+        return_value=rate_limiter,
+    ):
+        yield client
+
+
+def test_chunks_round_trip():
+    id_numbers = [VALID_ID, INVALID_ID, VALID_ID, "x", VALID_ID]
+    assert bulk.write_input_chunks("job", id_numbers, chunk_size=2) == (5, 3)
+
+    assert [bulk.validate_chunk("job", index) for index in range(3)] == [
+        (2, 1, 0, None),
+        (2, 1, 0, None),
+        (1, 1, 0, None),
+    ]
+    results = b"".join(bulk.read_results("job", 3)).splitlines()
+    assert [json.loads(line)["is_valid"] for line in results] == [
+        True,
+        False,
+        True,
+        False,
+        True,
+    ]
+
+    bulk.delete_job_files("job")
+    assert not bulk.bulk_storage().exists("job")
+
+
+def test_duplicates_are_parsed_once():
+    id_numbers = [VALID_ID, INVALID_ID, VALID_ID, VALID_ID, INVALID_ID, "x"]
+    bulk.write_input_chunks("job", id_numbers, chunk_size=10)
+
+    with patch.object(
+        EgyptianNationalID,
+        "parse",
+        wraps=EgyptianNationalID.parse,
+    ) as parse:
+        stats = bulk.validate_chunk("job", 0)
+    assert parse.call_count == 3  # noqa: PLR2004
+    assert stats == bulk.ChunkStats(processed=6, valid=3, duplicates=3)
+
+    results = [
+        json.loads(line) for line in b"".join(bulk.read_results("job", 1)).splitlines()
+    ]
+    # Scattered back in input order
+    assert [result["id_number"] for result in results] == id_numbers
+    assert results[0] == results[2] == results[3]
+
+
+@pytest.mark.parametrize(
+    ("birth_date", "bucket"),
+    [
+        (datetime.date(2026, 10, 20), "0-17"),
+        (datetime.date(2008, 10, 19), "18-29"),
+        (datetime.date(2008, 10, 20), "0-17"),
+        (datetime.date(1981, 10, 19), "45-59"),
+        (datetime.date(1920, 1, 1), "60+"),
+    ],
+)
+def test_age_bucket(birth_date, bucket):
+    assert bulk.age_bucket(birth_date, datetime.date(2026, 10, 19)) == bucket
+
+
+def test_aggregate_chunks():
+    id_numbers = [VALID_ID, YOUNG_ID, VALID_ID, INVALID_ID, "x"]
+    bulk.write_input_chunks("job", id_numbers, chunk_size=3)
+
+    on = datetime.date(2026, 10, 19)
+    chunks = [bulk.aggregate_chunk("job", index, on) for index in range(2)]
+    assert chunks[0][:3] == (3, 3, 1)
+    assert chunks[1][:3] == (2, 0, 0)
+    assert bulk.merge_statistics(chunk.statistics for chunk in chunks) == {
+        "governorates": {"Cairo": 1, "Dakahlia": 2},
+        "genders": {"Female": 2, "Male": 1},
+        "age_buckets": {"18-29": 1, "30-44": 2},
+        "birth_years": {"1990": 2, "2005": 1},
+        "errors": {"invalid_format": 1, "invalid_governorate": 1},
+    }
+    # Nothing stored per ID
+    assert not bulk.bulk_storage().exists("job/results")
+
+
+def test_submit_poll_and_download(
+    client,
+    eager_celery,
+    django_capture_on_commit_callbacks,
+):
+    id_numbers = [VALID_ID, INVALID_ID, VALID_ID, VALID_ID, INVALID_ID]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            "/api/jobs/",
+            {"id_numbers": id_numbers},
+            format="json",
+        )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["total"] == 5  # noqa: PLR2004
+
+    response = client.get(response["Location"])
+    assert response.data["status"] == BulkJob.Status.SUCCEEDED
+    assert response.data["processed"] == 5  # noqa: PLR2004
+    assert response.data["valid"] == 3  # noqa: PLR2004
+    # Chunks of 2: the repeated ID of the second chunk
+    assert response.data["duplicates_within_chunk"] == 1
+
+    response = client.get(f"/api/jobs/{response.data['id']}/results/")
+    assert response["Content-Type"] == "application/x-ndjson"
+    results = [
+        json.loads(line) for line in b"".join(response.streaming_content).splitlines()
+    ]
+    assert [result["id_number"] for result in results] == id_numbers
+
+
+def test_submit_a_statistics_job(
+    client,
+    eager_celery,
+    django_capture_on_commit_callbacks,
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            "/api/jobs/",
+            {"id_numbers": [VALID_ID, YOUNG_ID, INVALID_ID], "mode": "statistics"},
+            format="json",
+        )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+
+    response = client.get(response["Location"])
+    assert response.data["status"] == BulkJob.Status.SUCCEEDED
+    assert response.data["mode"] == BulkJob.Mode.STATISTICS
+    assert response.data["valid"] == 2  # noqa: PLR2004
+    assert response.data["statistics"]["governorates"] == {
+        "Cairo": 1,
+        "Dakahlia": 1,
+    }
+    assert sum(response.data["statistics"]["age_buckets"].values()) == 2  # noqa: PLR2004
+
+    response = client.get(f"/api/jobs/{response.data['id']}/results/")
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+def test_submit_a_file(client):
+    upload = SimpleUploadedFile(
+        "ids.txt",
+        f"{VALID_ID}\n\n{INVALID_ID}\r\n{VALID_ID}\n".encode(),
+    )
+    with patch("civil_registry.core.api.views.start_bulk_job") as start_bulk_job:
+        response = client.post("/api/jobs/", {"file": upload}, format="multipart")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["total"] == 3  # noqa: PLR2004
+    job = BulkJob.objects.get()
+    assert job.chunks == 2  # noqa: PLR2004
+    # Started once committed
+    start_bulk_job.assert_not_called()
+
+
+@pytest.mark.parametrize("separator", ["\n", "\r", "\t", "\x00"])
+def test_ids_must_be_one_line(client, separator):
+    response = client.post(
+        "/api/jobs/",
+        {"id_numbers": [f"{VALID_ID}{separator}{INVALID_ID}"]},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "id_numbers" in response.data
+    assert not BulkJob.objects.exists()
+
+
+def test_results_wait_for_the_job(client, user):
+    job = BulkJob.objects.create(user=user, status=BulkJob.Status.RUNNING)
+    response = client.get(f"/api/jobs/{job.pk}/results/")
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+def test_jobs_are_private(client):
+    other = User.objects.create_user(username="other")
+    job = BulkJob.objects.create(user=other)
+    assert client.get(f"/api/jobs/{job.pk}/").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/api/jobs/").data == []
+
+
+def test_jobs_over_quota_are_rejected(client, bulk_storage):
+    response = client.post(
+        "/api/jobs/",
+        {"id_numbers": [VALID_ID] * 101},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert not BulkJob.objects.exists()
+    assert not any(path.is_file() for path in bulk_storage.rglob("*"))
+
+
+def parquet_file(table, **kwargs):
+    file = io.BytesIO()
+    pq.write_table(table, file, **kwargs)
+    file.seek(0)
+    return file
+
+
+def arrow_file(table, *, stream=False):
+    sink = pa.BufferOutputStream()
+    new_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+    with new_writer(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=2)
+    return io.BytesIO(sink.getvalue().to_pybytes())
+
+
+@pytest.mark.parametrize(
+    "make_file",
+    [
+        parquet_file,
+        arrow_file,
+        lambda table: arrow_file(table, stream=True),
+    ],
+    ids=["parquet", "arrow-file", "arrow-stream"],
+)
+def test_read_id_column(make_file):
+    table = pa.table(
+        {
+            "name": ["a", "b", "c", "d"],
+            "id_number": [VALID_ID, None, f" {INVALID_ID} ", ""],
+        },
+    )
+    file = make_file(table)
+
+    assert list(columnar.read_id_column(file, "id_number", batch_size=2)) == [
+        VALID_ID,
+        INVALID_ID,
+    ]
+
+
+def test_read_integer_id_column():
+    table = pa.table({"national_id": pa.array([int(VALID_ID)], pa.int64())})
+    file = parquet_file(table, row_group_size=1)
+
+    assert list(columnar.read_id_column(file, "national_id", batch_size=1)) == [
+        VALID_ID,
+    ]
+
+
+def test_read_id_column_errors():
+    file = parquet_file(pa.table({"id": [VALID_ID]}))
+    with pytest.raises(InvalidColumnarFileError, match='no "id_number" column'):
+        columnar.read_id_column(file, "id_number", batch_size=1)
+
+    with pytest.raises(InvalidColumnarFileError):
+        columnar.read_id_column(io.BytesIO(b"PAR1 truncated"), "id", batch_size=1)
+
+
+def test_results_table():
+    ndjson = b"".join(
+        json.dumps(
+            national_id_result_data(EgyptianNationalID.parse(id_number)),
+        ).encode()
+        + b"\n"
+        for id_number in [VALID_ID, INVALID_ID, YOUNG_ID]
+    )
+    table = columnar.results_table(ndjson)
+
+    assert table.schema == columnar.RESULT_SCHEMA
+    assert table.to_pylist()[0] == {
+        "id_number": VALID_ID,
+        "is_valid": True,
+        "birth_date": datetime.date(1990, 1, 1),
+        "governorate": "Dakahlia",
+        "gender": "Female",
+        "detail": "",
+        "error_code": None,
+    }
+    assert table["governorate"].to_pylist() == ["Dakahlia", None, "Cairo"]
+    assert table["error_code"].to_pylist() == [None, "invalid_governorate", None]
+
+
+def test_submit_parquet_and_download_columnar(
+    client,
+    eager_celery,
+    django_capture_on_commit_callbacks,
+):
+    id_numbers = [VALID_ID, INVALID_ID, YOUNG_ID, VALID_ID, INVALID_ID]
+    upload = SimpleUploadedFile(
+        "ids.parquet",
+        parquet_file(pa.table({"nid": id_numbers})).read(),
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            "/api/jobs/",
+            {"file": upload, "column": "nid"},
+            format="multipart",
+        )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["total"] == 5  # noqa: PLR2004
+    results_url = f"{response['Location']}results/"
+
+    response = client.get(results_url, HTTP_ACCEPT=ParquetRenderer.media_type)
+    assert response["Content-Type"] == ParquetRenderer.media_type
+    assert response["Content-Disposition"].endswith('.parquet"')
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(response.streaming_content)))
+    # A row group per chunk
+    assert parquet.num_row_groups == 3  # noqa: PLR2004
+    table = parquet.read()
+    assert table.schema == columnar.RESULT_SCHEMA
+    assert table["id_number"].to_pylist() == id_numbers
+    assert table["is_valid"].to_pylist() == [True, False, True, True, False]
+
+    response = client.get(f"{results_url}?format=arrow")
+    assert response["Content-Type"] == ArrowStreamRenderer.media_type
+    with pa.ipc.open_stream(b"".join(response.streaming_content)) as reader:
+        assert reader.read_all().equals(table)
+
+
+def test_submit_a_parquet_file_without_the_column(client):
+    upload = SimpleUploadedFile(
+        "ids.parquet",
+        parquet_file(pa.table({"nid": [VALID_ID]})).read(),
+    )
+    response = client.post("/api/jobs/", {"file": upload}, format="multipart")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"file": ['The file has no "id_number" column.']}
+    assert not BulkJob.objects.exists()
+
+
+def test_submit_a_parquet_file_with_multiline_ids(client, bulk_storage):
+    upload = SimpleUploadedFile(
+        "ids.parquet",
+        parquet_file(pa.table({"id_number": [VALID_ID, f"{VALID_ID}\n1"]})).read(),
+    )
+    response = client.post("/api/jobs/", {"file": upload}, format="multipart")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "whitespace" in response.data["file"][0]
+    assert not BulkJob.objects.exists()
+    assert not any(path.is_file() for path in bulk_storage.rglob("*"))
+
+
+def test_columnar_errors_are_json(client, user):
+    job = BulkJob.objects.create(user=user, status=BulkJob.Status.RUNNING)
+    response = client.get(
+        f"/api/jobs/{job.pk}/results/",
+        HTTP_ACCEPT=ParquetRenderer.media_type,
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response["Content-Type"] == "application/json"
+    assert "running" in response.json()["detail"]
+
+    response = client.get(
+        f"/api/jobs/{uuid.uuid4()}/results/",
+        HTTP_ACCEPT=ArrowStreamRenderer.media_type,
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response["Content-Type"] == "application/json"
+
+
+def test_expired_jobs_are_deleted(settings, user, bulk_storage):
+    settings.BULK_JOB_RETENTION_DAYS = 7
+    now = timezone.now()
+    expired = [
+        BulkJob.objects.create(
+            user=user,
+            status=BulkJob.Status.SUCCEEDED,
+            finished_at=now - datetime.timedelta(days=8),
+        ),
+        # Never finished
+        BulkJob.objects.create(user=user, status=BulkJob.Status.RUNNING),
+    ]
+    BulkJob.objects.filter(pk=expired[1].pk).update(
+        created_at=now - datetime.timedelta(days=8),
+    )
+    kept = BulkJob.objects.create(
+        user=user,
+        status=BulkJob.Status.SUCCEEDED,
+        finished_at=now - datetime.timedelta(days=6),
+    )
+    for job in [*expired, kept]:
+        bulk.write_input_chunks(job.pk, [VALID_ID], chunk_size=1)
+        bulk.validate_chunk(job.pk, 0)
+
+    assert delete_expired_bulk_jobs() == 2  # noqa: PLR2004
+
+    assert list(BulkJob.objects.all()) == [kept]
+    assert [path.name for path in bulk_storage.iterdir()] == [str(kept.pk)]
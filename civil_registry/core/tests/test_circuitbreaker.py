@@ -0,0 +1,57 @@
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+
+from civil_registry.core.circuitbreaker import CircuitBreaker
+
+
+@pytest.fixture
+def probe():
+    return Mock()
+
+
+@pytest.fixture
+def breaker(probe):
+    breaker = CircuitBreaker("test", probe=probe, failure_threshold=3)
+    with patch("civil_registry.core.circuitbreaker.threading.Thread") as thread:
+        breaker.probe_thread = thread
+        yield breaker
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    breaker.probe_thread.return_value.start.assert_called_once_with()
+
+
+def test_success_resets_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(latency=0.001)
+    breaker.record_failure()
+    assert breaker.allow_request()
+
+
+def test_slow_calls_count_as_failures(breaker):
+    for _ in range(3):
+        breaker.record_success(latency=1)
+    assert not breaker.allow_request()
+
+
+def test_probe_closes_circuit(breaker, probe):
+    for _ in range(3):
+        breaker.record_failure()
+
+    probe.side_effect = ConnectionError
+    assert not breaker.probe_once()
+    assert not breaker.allow_request()
+
+    probe.side_effect = None
+    assert breaker.probe_once()
+    assert breaker.allow_request()
+    assert breaker.consecutive_failures == 0
@@ -1,27 +1,38 @@
+import csv
+import io
+import json
 import uuid
+from unittest.mock import patch
 
+import msgpack
 import pytest
-from django.conf import settings
 from django.contrib.auth.models import User
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from civil_registry.core.api.views import NationalIDLookupView
+from civil_registry.core.api.views import NationalIDStreamView
+from civil_registry.core.api.views import NationalIDView
+from civil_registry.core.models import ApiCall
+from civil_registry.core.types import Quota
+from civil_registry.core.types import RateLimitCategory
+
+from .factories import ApiCallFactory
 
 
 @pytest.mark.django_db
 class TestNationalIDView:
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, api_client):
         self.user = User.objects.create_user(
             username="testuser",
             password="testpassword",  # noqa: S106
         )
         self.token = Token.objects.create(user=self.user)
-        self.client = APIClient()
+        self.client = api_client
         self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
-        settings.MIDDLEWARE += [
-            "civil_registry.core.middleware.requestid.RequestIDMiddleware",
-        ]  # to attach request_id to request object
 
     def test_valid_national_id(self):
         request_id = str(uuid.uuid4())
@@ -44,3 +55,410 @@ class TestNationalIDView:
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "detail" in response.data
+
+    def test_concurrency_limit(self, rate_limiter):
+        key = f"id-validate:{{{self.user.id}}}"
+        limit = NationalIDView.rate_limits["POST"][RateLimitCategory.CONCURRENCY].limit
+        with patch(
+            "civil_registry.core.api.views.RedisRateLimiter",
+            return_value=rate_limiter,
+        ):
+            response = self.client.post(
+                "/api/validate/",
+                {"id_number": "29001011234567"},
+                format="json",
+            )
+            assert response.status_code == status.HTTP_200_OK
+            # The slot was given back with the response, all of them are free
+            for _ in range(limit):
+                assert rate_limiter.acquire_slot(key, limit)[0]
+
+            response = self.client.post(
+                "/api/validate/",
+                {"id_number": "29001011234567"},
+                format="json",
+            )
+            assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+            assert "in progress" in response.data["detail"]
+
+    def test_msgpack_request_and_response(self):
+        response = self.client.post(
+            "/api/validate/",
+            msgpack.packb({"id_number": "29001011234567"}),
+            content_type="application/msgpack",
+            headers={"accept": "application/msgpack"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/msgpack"
+        data = msgpack.unpackb(response.content)
+        assert data["birth_date"] == "1990-01-01"
+        assert data["governorate"] == "Dakahlia"
+
+    def test_malformed_msgpack(self):
+        response = self.client.post(
+            "/api/validate/",
+            b"\xc1",
+            content_type="application/msgpack",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("body", ["29001011234567", ["29001011234567"], 42])
+    def test_msgpack_body_must_be_a_map(self, body):
+        response = self.client.post(
+            "/api/validate/",
+            msgpack.packb(body),
+            content_type="application/msgpack",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["detail"] == "Expected an object with an id_number key."
+
+    def test_json_body_must_be_an_object(self):
+        response = self.client.post("/api/validate/", [], format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["detail"] == "Expected an object with an id_number key."
+
+    def test_invalid_governorate_code(self):
+        response = self.client.post(
+            "/api/validate/",
+            {"id_number": "29805239934567"},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["error_code"] == "invalid_governorate"
+        assert response.data["detail"] == "Invalid governorate code: 99."
+
+    def test_validate_is_not_wrapped_in_a_transaction(
+        self,
+        django_assert_num_queries,
+        tier_cache,
+    ):
+        # Only the token authentication lookup should hit the database,
+        # no SAVEPOINT/RELEASE from ATOMIC_REQUESTS. Tiers are loaded once
+        # per process.
+        tier_cache.get(self.user.id)
+        with django_assert_num_queries(1):
+            response = self.client.post(
+                "/api/validate/",
+                {"id_number": "29001011234567"},
+                format="json",
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_token_auth_is_served_from_cache(self, django_assert_num_queries):
+        self.client.post(
+            "/api/validate/",
+            {"id_number": "29001011234567"},
+            format="json",
+        )
+        with django_assert_num_queries(0):
+            response = self.client.post(
+                "/api/validate/",
+                {"id_number": "29001011234567"},
+                format="json",
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_jwt_auth_does_not_query_the_database(
+        self,
+        django_assert_num_queries,
+        tier_cache,
+    ):
+        tier_cache.get(self.user.id)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}",
+        )
+        with django_assert_num_queries(0):
+            response = client.post(
+                "/api/validate/",
+                {"id_number": "29001011234567"},
+                format="json",
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestNationalIDLookupView:
+    @pytest.fixture(autouse=True)
+    def setup(self, api_client):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",  # noqa: S106
+        )
+        self.client = api_client
+        self.client.force_authenticate(self.user)
+
+    def test_valid_national_id_is_cacheable(self):
+        response = self.client.get("/api/validate/29001011234567/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["governorate"] == "Dakahlia"
+        assert response["ETag"].startswith('"')
+        assert "max-age=" in response["Cache-Control"]
+
+    def test_head_is_limited_like_get(self):
+        response = self.client.head("/api/validate/29001011234567/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"].startswith('"')
+        assert not response.content
+
+    def test_method_without_rate_limit_is_not_limited(self):
+        with patch.object(NationalIDLookupView, "rate_limits", {}):
+            response = self.client.get("/api/validate/29001011234567/")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get("/api/validate/29001011234567/")["ETag"]
+
+        response = self.client.get(
+            "/api/validate/29001011234567/",
+            headers={"if-none-match": f'"other", W/{etag}'},
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert not response.content
+
+    def test_etag_differs_per_id(self):
+        first = self.client.get("/api/validate/29001011234567/")["ETag"]
+        second = self.client.get("/api/validate/29805231234568/")["ETag"]
+        assert first != second
+
+    def test_etag_differs_per_format(self):
+        json_response = self.client.get("/api/validate/29001011234567/")
+        msgpack_response = self.client.get(
+            "/api/validate/29001011234567/",
+            headers={
+                "accept": "application/msgpack",
+                "if-none-match": json_response["ETag"],
+            },
+        )
+        assert msgpack_response.status_code == status.HTTP_200_OK
+        assert msgpack_response["ETag"] != json_response["ETag"]
+        vary = {header.strip() for header in msgpack_response["Vary"].split(",")}
+        assert {"Accept", "Authorization"} <= vary
+
+    def test_invalid_national_id_is_not_cached(self):
+        response = self.client.get("/api/validate/29805239934567/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["error_code"] == "invalid_governorate"
+        assert not response.has_header("ETag")
+
+    def test_post_is_not_allowed(self):
+        response = self.client.post("/api/validate/29001011234567/")
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+@pytest.mark.django_db
+class TestNationalIDStreamView:
+    @pytest.fixture(autouse=True)
+    def setup(self, api_client):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",  # noqa: S106
+        )
+        self.client = api_client
+        self.client.force_authenticate(self.user)
+
+    def test_one_result_per_line(self):
+        body = b'"29001011234567"\n\n{"id_number": "29805239934567"}\nnot-json\n'
+        response = self.client.post(
+            "/api/validate/stream/",
+            body,
+            content_type="application/x-ndjson",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+
+        lines = b"".join(response.streaming_content).splitlines()
+        results = [json.loads(line) for line in lines]
+        assert [result["is_valid"] for result in results] == [True, False, False]
+        assert results[0]["birth_date"] == "1990-01-01"
+        assert results[1]["error_code"] == "invalid_governorate"
+        assert results[2]["error_code"] == "invalid_format"
+
+    def test_chunked_body(self):
+        response = self.client.post(
+            "/api/validate/stream/",
+            b'"29001011234567"\n"29805239934567"\n',
+            content_type="application/x-ndjson",
+            # As gunicorn passes a chunked upload
+            CONTENT_LENGTH="",
+            **{"wsgi.input_terminated": True},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [json.loads(line)["is_valid"] for line in lines] == [True, False]
+
+    def test_length_required(self):
+        response = self.client.post(
+            "/api/validate/stream/",
+            b'"29001011234567"\n',
+            content_type="application/x-ndjson",
+            CONTENT_LENGTH="",
+        )
+        assert response.status_code == status.HTTP_411_LENGTH_REQUIRED
+
+    def test_concurrency_slot_is_held_until_the_stream_is_sent(self, rate_limiter):
+        key = f"id-validate:{{{self.user.id}}}"
+        limit = NationalIDStreamView.rate_limits["POST"][
+            RateLimitCategory.CONCURRENCY
+        ].limit
+        with patch(
+            "civil_registry.core.api.views.RedisRateLimiter",
+            return_value=rate_limiter,
+        ):
+            response = self.client.post(
+                "/api/validate/stream/",
+                b'"29001011234567"\n',
+                content_type="application/x-ndjson",
+            )
+            assert response.status_code == status.HTTP_200_OK
+            tokens = [rate_limiter.acquire_slot(key, limit) for _ in range(limit)]
+            assert [acquired for acquired, _ in tokens].count(False) == 1
+
+            for _, token in tokens:
+                rate_limiter.release_slot(key, token)
+            b"".join(response.streaming_content)
+            for _ in range(limit):
+                assert rate_limiter.acquire_slot(key, limit)[0]
+
+    def test_msgpack_stream(self):
+        body = msgpack.packb("29001011234567") + msgpack.packb(
+            {"id_number": "29805239934567"},
+        )
+        response = self.client.post(
+            "/api/validate/stream/",
+            body,
+            content_type="application/msgpack",
+            headers={"accept": "application/msgpack"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/msgpack"
+
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(b"".join(response.streaming_content))
+        results = list(unpacker)
+        assert [result["is_valid"] for result in results] == [True, False]
+
+    @pytest.mark.parametrize(
+        ("accept", "decode"),
+        [
+            (
+                "application/msgpack",
+                lambda content: list(msgpack.Unpacker(io.BytesIO(content))),
+            ),
+            (
+                "application/json",
+                lambda content: [json.loads(line) for line in content.splitlines()],
+            ),
+        ],
+        ids=["msgpack", "ndjson"],
+    )
+    def test_malformed_msgpack_stream_ends_with_an_error(self, accept, decode):
+        # 0xc1 is never used by MessagePack
+        body = (
+            msgpack.packb("29001011234567") + b"\xc1" + msgpack.packb("29001011234567")
+        )
+        response = self.client.post(
+            "/api/validate/stream/",
+            body,
+            content_type="application/msgpack",
+            headers={"accept": accept},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        results = decode(b"".join(response.streaming_content))
+        assert [result.get("is_valid") for result in results] == [True, None]
+        assert "Malformed MessagePack" in results[-1]["detail"]
+
+    def test_stops_when_quota_is_used_up(self, quota_tracker):
+        view = NationalIDStreamView()
+        view.quota = Quota(daily=3, monthly=100)
+        view.chunk_size = 2
+        id_numbers = ["29001011234567"] * 5
+
+        output = b"".join(
+            view.stream_results(id_numbers, quota_tracker, "1", view.encode_ndjson),
+        )
+        results = [json.loads(line) for line in output.splitlines()]
+        assert [result.get("is_valid") for result in results] == [
+            True,
+            True,
+            True,
+            None,
+        ]
+        assert "quota" in results[-1]["detail"]
+        assert quota_tracker.usage("1", view.quota).daily_used == 3  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+class TestApiCallViews:
+    @pytest.fixture(autouse=True)
+    def setup(self, api_client):
+        self.admin = User.objects.create_superuser(
+            username="admin",
+            password="adminpassword",  # noqa: S106
+        )
+        self.client = api_client
+        self.client.force_authenticate(self.admin)
+
+    def test_requires_admin(self):
+        user = User.objects.create_user(username="user", password="password")  # noqa: S106
+        client = APIClient()
+        client.force_authenticate(user)
+        assert client.get("/api/api-calls/").status_code == status.HTTP_403_FORBIDDEN
+        assert (
+            client.get("/api/api-calls/export/").status_code
+            == status.HTTP_403_FORBIDDEN
+        )
+
+    def test_keyset_pagination_walks_every_record_once(self):
+        api_calls = ApiCallFactory.create_batch(7)
+        # Same timestamp for a few rows so the id tie-breaker is exercised
+        ApiCall.objects.filter(pk__in=[c.pk for c in api_calls[:4]]).update(
+            timestamp=api_calls[0].timestamp,
+        )
+
+        seen = []
+        url = "/api/api-calls/?page_size=3"
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            seen += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+
+        expected = list(
+            ApiCall.objects.order_by("-timestamp", "-id").values_list("id", flat=True),
+        )
+        assert seen == expected
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/api-calls/?cursor=bogus")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_filters(self):
+        ApiCallFactory.create_batch(3, user_id=1, status_code=200)
+        match = ApiCallFactory(user_id=2, status_code=400)
+
+        response = self.client.get("/api/api-calls/?user_id=2&status_code=400")
+        assert [row["id"] for row in response.data["results"]] == [match.pk]
+
+        response = self.client.get(f"/api/api-calls/?request_id={match.request_id}")
+        assert [row["id"] for row in response.data["results"]] == [match.pk]
+
+    def test_invalid_filter(self):
+        response = self.client.get("/api/api-calls/?status_code=abc")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_csv_export(self):
+        ApiCallFactory.create_batch(3, path="/api/validate/")
+        ApiCallFactory(path="/api/other/")
+
+        response = self.client.get("/api/api-calls/export/?path=/api/validate/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv"
+
+        content = b"".join(response.streaming_content).decode()
+        header, *rows = list(csv.reader(io.StringIO(content)))
+        assert header[:2] == ["id", "timestamp"]
+        assert len(rows) == 3  # noqa: PLR2004
+        assert {row[header.index("path")] for row in rows} == {"/api/validate/"}
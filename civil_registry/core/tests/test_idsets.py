@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from civil_registry.core import idsets
+from civil_registry.core.idsets import IDSet
+from civil_registry.core.idsets import write_id_set
+
+ID_NUMBERS = [
+    "30508150112355",
+    "29001011234567",
+    "29805239934567",
+    "29001011234567",
+    "20001010100001",
+]
+
+
+@pytest.fixture
+def id_set_path(tmp_path):
+    return tmp_path / "ids.bin"
+
+
+def test_write_and_look_up(id_set_path):
+    # Several runs to merge
+    with patch.object(idsets, "RUN_SIZE", 2):
+        assert write_id_set(id_set_path, ID_NUMBERS) == 4  # noqa: PLR2004
+    assert id_set_path.stat().st_size == idsets.HEADER.size + 4 * idsets.ITEM_SIZE
+
+    with IDSet(id_set_path) as id_set:
+        assert len(id_set) == 4  # noqa: PLR2004
+        assert list(id_set) == sorted(set(ID_NUMBERS))
+        for id_number in ID_NUMBERS:
+            assert id_number in id_set
+            assert int(id_number) in id_set
+        assert "29001011234568" not in id_set
+        assert "20001010100000" not in id_set
+        assert "39912319999999" not in id_set
+        assert "not an ID" not in id_set
+        assert None not in id_set
+
+
+def test_empty_set(id_set_path):
+    assert write_id_set(id_set_path, []) == 0
+    with IDSet(id_set_path) as id_set:
+        assert len(id_set) == 0
+        assert "29001011234567" not in id_set
+        assert list(id_set) == []
+
+
+def test_not_an_id_set(id_set_path):
+    id_set_path.write_bytes(b"2900101\n")
+    with pytest.raises(ValueError, match="not an ID set file"):
+        IDSet(id_set_path)
+
+    write_id_set(id_set_path, ID_NUMBERS)
+    with id_set_path.open("ab") as file:
+        file.write(b"\0")
+    with pytest.raises(ValueError, match="not an ID set file"):
+        IDSet(id_set_path)
+
+
+@pytest.mark.django_db
+def test_build_id_set_command(tmp_path, id_set_path, capsys):
+    source = tmp_path / "ids.txt"
+    source.write_text("\n".join([*ID_NUMBERS, "", " 29001011234567 "]))
+
+    call_command("build_id_set", str(source), str(id_set_path))
+
+    assert capsys.readouterr().out.startswith("4 distinct IDs, 48 bytes")
+    with IDSet(id_set_path) as id_set:
+        assert list(id_set) == sorted(set(ID_NUMBERS))
+
+
+@pytest.mark.django_db
+def test_build_id_set_command_rejects_bad_ids(tmp_path, id_set_path):
+    source = tmp_path / "ids.txt"
+    source.write_text("29001011234567\n2900101123456x\n")
+
+    with pytest.raises(CommandError, match="2900101123456x"):
+        call_command("build_id_set", str(source), str(id_set_path))
+    assert not id_set_path.exists()
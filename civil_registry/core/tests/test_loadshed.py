@@ -0,0 +1,126 @@
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.authtoken.models import Token
+
+from civil_registry.core.api.views import NationalIDStreamView
+from civil_registry.core.api.views import NationalIDView
+from civil_registry.core.middleware.loadshed import LoadSheddingMiddleware
+from civil_registry.core.middleware.loadshed import parse_request_start
+
+
+@pytest.fixture
+def request_factory():
+    return RequestFactory()
+
+
+@pytest.fixture
+def loadshed_middleware():
+    return LoadSheddingMiddleware(lambda request: HttpResponse())
+
+
+def view_func(view_class):
+    return view_class.as_view()
+
+
+@pytest.mark.parametrize(
+    "header",
+    ["t=1700000000.5", "1700000000500", "t=1700000000500000"],
+)
+def test_parse_request_start_units(header):
+    assert parse_request_start(header) == pytest.approx(1700000000.5)
+
+
+def test_parse_request_start_invalid():
+    assert parse_request_start("t=soon") is None
+    assert parse_request_start("") is None
+
+
+def test_drops_requests_that_waited_too_long(api_client):
+    response = api_client.post(
+        "/api/validate/",
+        headers={"X-Request-Start": f"t={time.time() - 30:.3f}"},
+    )
+    assert response.status_code == 503  # noqa: PLR2004
+    assert int(response["Retry-After"]) >= 1
+
+
+@pytest.mark.django_db
+def test_serves_requests_that_just_arrived(api_client):
+    response = api_client.post(
+        "/api/validate/",
+        headers={"X-Request-Start": f"t={time.time():.3f}"},
+    )
+    # Rejected by authentication, not shed
+    assert response.status_code == 401  # noqa: PLR2004
+
+
+def test_drops_expensive_requests_first(request_factory, loadshed_middleware):
+    loadshed_middleware.queue_time = loadshed_middleware.target_queue_time * 1.5
+    request = request_factory.post("/api/validate/")
+    request.queue_time = None
+    assert (
+        loadshed_middleware.process_view(request, view_func(NationalIDView), (), {})
+        is None
+    )
+    response = loadshed_middleware.process_view(
+        request,
+        view_func(NationalIDStreamView),
+        (),
+        {},
+    )
+    assert response.status_code == 503  # noqa: PLR2004
+
+    loadshed_middleware.queue_time = loadshed_middleware.target_queue_time * 2.5
+    response = loadshed_middleware.process_view(
+        request,
+        view_func(NationalIDView),
+        (),
+        {},
+    )
+    assert response.status_code == 503  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_priority_users_are_served_longer(settings, request_factory):
+    user = User.objects.create_user(username="partner")
+    token = Token.objects.create(user=user)
+    settings.LOADSHED_PRIORITY_USER_IDS = [str(user.id)]
+    middleware = LoadSheddingMiddleware(lambda request: HttpResponse())
+    middleware.latency = middleware.target_latency * 2.5
+
+    request = request_factory.post(
+        "/api/validate/",
+        headers={"Authorization": f"Token {token.key}"},
+    )
+    request.queue_time = None
+    assert middleware.process_view(request, view_func(NationalIDView), (), {}) is None
+
+    request = request_factory.post("/api/validate/")
+    request.queue_time = None
+    response = middleware.process_view(request, view_func(NationalIDView), (), {})
+    assert response.status_code == 503  # noqa: PLR2004
+
+
+def test_recovers_once_requests_are_dropped(request_factory):
+    middleware = LoadSheddingMiddleware(lambda request: HttpResponse())
+    middleware.latency = middleware.target_latency * 2.5
+    middleware.get_response = (
+        lambda request: middleware.process_view(
+            request,
+            view_func(NationalIDView),
+            (),
+            {},
+        )
+        or HttpResponse()
+    )
+
+    statuses = [
+        middleware(request_factory.post("/api/validate/")).status_code
+        for _ in range(20)
+    ]
+    assert statuses[0] == 503  # noqa: PLR2004
+    assert statuses[-1] == 200  # noqa: PLR2004
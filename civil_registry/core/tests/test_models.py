@@ -8,6 +8,7 @@ from civil_registry.core.exceptions import InvalidCenturyDigitError
 from civil_registry.core.exceptions import InvalidNationalIDError
 from civil_registry.core.models import ApiCall
 from civil_registry.core.models import EgyptianNationalID
+from civil_registry.core.types import NationalIDErrorCode
 
 from .factories import ApiCallFactory
 
@@ -56,6 +57,72 @@ def test_invalid_characters():
         EgyptianNationalID(id_number)
 
 
+def test_parse_valid_national_id():
+    result = EgyptianNationalID.parse(" 29001011234567 ")
+    assert result.is_valid
+    assert result.id_number == "29001011234567"
+    assert result.birth_date == datetime.date(1990, 1, 1)
+    assert result.governorate == "Dakahlia"
+    assert result.gender == "Female"
+
+
+@pytest.mark.parametrize(
+    ("id_number", "error"),
+    [
+        (None, NationalIDErrorCode.REQUIRED),
+        ("", NationalIDErrorCode.REQUIRED),
+        ("2980523123456a", NationalIDErrorCode.INVALID_FORMAT),
+        ("298052312345678", NationalIDErrorCode.INVALID_FORMAT),
+        (["29001011234567"], NationalIDErrorCode.INVALID_FORMAT),
+        ("49805231234567", NationalIDErrorCode.INVALID_CENTURY),
+        ("29802291234567", NationalIDErrorCode.INVALID_BIRTH_DATE),
+        ("29813011234567", NationalIDErrorCode.INVALID_BIRTH_DATE),
+        ("29805239934567", NationalIDErrorCode.INVALID_GOVERNORATE),
+    ],
+)
+def test_parse_invalid_national_id(id_number, error):
+    result = EgyptianNationalID.parse(id_number)
+    assert not result.is_valid
+    assert result.error == error
+    assert result.detail
+
+
+def test_parse_matches_constructor():
+    for id_number in ("29001011234567", "30002291234561", "29805231234568"):
+        national_id = EgyptianNationalID(id_number)
+        result = EgyptianNationalID.parse(id_number)
+        assert (result.birth_date, result.governorate, result.gender) == (
+            national_id.birth_date,
+            national_id.governorate,
+            national_id.gender,
+        )
+
+
+def test_pack_national_id():
+    assert EgyptianNationalID.pack("29001011234567") == 29001011234567  # noqa: PLR2004
+    assert EgyptianNationalID.unpack(29001011234567) == "29001011234567"
+    assert EgyptianNationalID.unpack(EgyptianNationalID.pack("39912319999999")) == (
+        "39912319999999"
+    )
+    assert EgyptianNationalID.pack("39912319999999") < 2**63
+
+
+@pytest.mark.parametrize(
+    "id_number",
+    [
+        "2900101123456",
+        "290010112345678",
+        "2900101123456x",
+        # Full width digits
+        "\uff12" * 14,
+        29001011234567,
+    ],
+)
+def test_pack_invalid_national_id(id_number):
+    with pytest.raises(InvalidNationalIDError):
+        EgyptianNationalID.pack(id_number)
+
+
 @pytest.mark.django_db
 def test_api_call_creation():
     api_call = ApiCall.objects.create(
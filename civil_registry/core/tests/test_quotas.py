@@ -0,0 +1,88 @@
+import datetime
+
+from civil_registry.core.quotas import parse_period_field
+from civil_registry.core.types import Quota
+from civil_registry.core.utils import freeze_time
+
+QUOTA = Quota(daily=2, monthly=3)
+
+
+def test_increment(quota_tracker):
+    with freeze_time("2000-01-01 12:00"):
+        meta = quota_tracker.increment("1", QUOTA)
+        assert not meta.is_exceeded
+        assert meta.daily_used == 1
+        assert meta.daily_remaining == 1
+
+        quota_tracker.increment("1", QUOTA)
+        meta = quota_tracker.increment("1", QUOTA)
+        assert meta.is_exceeded
+        assert meta.daily_remaining == 0
+
+
+def test_monthly_quota_spans_days(quota_tracker):
+    with freeze_time("2000-01-01 12:00") as frozen_time:
+        quota_tracker.increment("1", QUOTA)
+        quota_tracker.increment("1", QUOTA)
+        frozen_time.shift(datetime.timedelta(days=1))
+        meta = quota_tracker.increment("1", QUOTA)
+        assert not meta.is_exceeded
+        meta = quota_tracker.increment("1", QUOTA)
+        assert meta.is_exceeded
+        assert meta.daily_used == 2  # noqa: PLR2004
+        assert meta.monthly_used == 4  # noqa: PLR2004
+
+
+def test_usage_does_not_count(quota_tracker):
+    with freeze_time("2000-01-01 12:00"):
+        assert quota_tracker.usage("1", QUOTA).daily_used == 0
+        quota_tracker.increment("1", QUOTA)
+        assert quota_tracker.usage("1", QUOTA).daily_used == 1
+        assert quota_tracker.usage("1", QUOTA).daily_used == 1
+
+
+def test_rate_limited_requests_are_refunded(rate_limiter, quota_tracker):
+    with freeze_time("2000-01-01 12:00"):
+        limited, _, _, meta = rate_limiter.is_limited_with_quota(
+            "foo",
+            1,
+            quota_tracker=quota_tracker,
+            subject="1",
+            quota=QUOTA,
+        )
+        assert not limited
+        assert meta.daily_used == 1
+
+        limited, _, _, _ = rate_limiter.is_limited_with_quota(
+            "foo",
+            1,
+            quota_tracker=quota_tracker,
+            subject="1",
+            quota=QUOTA,
+        )
+        assert limited
+        assert quota_tracker.usage("1", QUOTA).daily_used == 1
+
+
+def test_collect_prunes_finished_periods(quota_tracker):
+    with freeze_time("2000-01-31 12:00") as frozen_time:
+        quota_tracker.increment("1", QUOTA)
+        frozen_time.shift(datetime.timedelta(days=1))
+        quota_tracker.increment("1", QUOTA)
+
+        batches = list(quota_tracker.collect())
+        assert batches == [
+            {"1": {"d:20000131": 1, "m:200001": 1, "d:20000201": 1, "m:200002": 1}},
+        ]
+        # Nothing changed since the last collection
+        assert list(quota_tracker.collect()) == []
+
+        quota_tracker.increment("1", QUOTA)
+        assert list(quota_tracker.collect()) == [
+            {"1": {"d:20000201": 2, "m:200002": 2}},
+        ]
+
+
+def test_parse_period_field():
+    assert parse_period_field("d:20000131") == ("day", datetime.date(2000, 1, 31))
+    assert parse_period_field("m:200001") == ("month", datetime.date(2000, 1, 1))
@@ -1,5 +1,12 @@
 from time import time
+from unittest.mock import Mock
+from unittest.mock import patch
 
+from redis.exceptions import RedisError
+
+from civil_registry.core.ratelimit import LocalRateLimiter
+from civil_registry.core.ratelimit import RedisRateLimiter
+from civil_registry.core.types import RateLimitStorage
 from civil_registry.core.utils import freeze_time
 
 
@@ -77,3 +84,84 @@ def test_reset(rate_limiter):
         assert rate_limiter.is_limited("foo", 1)
         rate_limiter.reset("foo")
         assert not rate_limiter.is_limited("foo", 1)
+
+
+def test_falls_back_to_local_limiter(rate_limiter):
+    rate_limiter.client = Mock()
+    rate_limiter.client.pipeline.side_effect = RedisError
+    with freeze_time("2000-01-01"):
+        assert not rate_limiter.is_limited("foo", 1)
+        assert rate_limiter.is_limited("foo", 1)
+    assert rate_limiter.breaker.consecutive_failures == 2  # noqa: PLR2004
+
+
+def test_open_circuit_skips_redis(rate_limiter):
+    rate_limiter.client = Mock()
+    rate_limiter.client.pipeline.side_effect = RedisError
+    with patch("civil_registry.core.circuitbreaker.threading.Thread"):
+        for _ in range(rate_limiter.breaker.failure_threshold):
+            rate_limiter.is_limited("foo", 100)
+    assert not rate_limiter.breaker.allow_request()
+
+    rate_limiter.client.pipeline.reset_mock()
+    rate_limiter.is_limited("foo", 100)
+    rate_limiter.client.pipeline.assert_not_called()
+
+
+def test_local_limiter_splits_limit_across_processes():
+    limiter = LocalRateLimiter(processes=2)
+    with freeze_time("2000-01-01") as frozen_time:
+        assert not limiter.is_limited("foo", 4)
+        assert not limiter.is_limited("foo", 4)
+        assert limiter.is_limited("foo", 4)
+
+        frozen_time.shift(60)
+        assert limiter.current_value("foo") == 0
+        assert not limiter.is_limited("foo", 4)
+
+
+def test_local_limiter_drops_expired_windows():
+    limiter = LocalRateLimiter()
+    limiter.max_counters = 2
+    with freeze_time("2000-01-01") as frozen_time:
+        limiter.is_limited("foo", 1)
+        limiter.is_limited("bar", 1)
+        frozen_time.shift(60)
+        limiter.is_limited("foo", 1)
+    assert len(limiter._counters) == 1  # noqa: SLF001
+
+
+def test_hash_storage_groups_counters(redis_client):
+    rate_limiter = RedisRateLimiter(storage=RateLimitStorage.HASH, hash_shards=4)
+    rate_limiter.client = redis_client
+    with freeze_time("2000-01-01"):
+        for i in range(100):
+            rate_limiter.is_limited(f"user:{i}", 10, window=1)
+        assert rate_limiter.current_value("user:7", window=1) == 1
+
+        keys = redis_client.keys("rl:*")
+        assert len(keys) == 4  # noqa: PLR2004
+        assert sum(redis_client.hlen(key) for key in keys) == 100  # noqa: PLR2004
+
+
+def test_concurrency_slots(rate_limiter):
+    with freeze_time("2000-01-01") as frozen_time:
+        acquired, token = rate_limiter.acquire_slot("foo", 2)
+        assert acquired
+        assert rate_limiter.acquire_slot("foo", 2)[0]
+        assert rate_limiter.acquire_slot("foo", 2) == (False, None)
+
+        rate_limiter.release_slot("foo", token)
+        assert rate_limiter.acquire_slot("foo", 2)[0]
+
+        # Leases of requests that never released their slot run out
+        frozen_time.shift(61)
+        assert rate_limiter.acquire_slot("foo", 2)[0]
+
+
+def test_concurrency_slot_fails_open(rate_limiter):
+    rate_limiter.client = Mock()
+    rate_limiter.client.pipeline.side_effect = RedisError
+    assert rate_limiter.acquire_slot("foo", 1) == (True, None)
+    rate_limiter.release_slot("foo", None)
+    rate_limiter.client.zrem.assert_not_called()
@@ -0,0 +1,90 @@
+import io
+
+import pytest
+
+from civil_registry.core.circuitbreaker import CircuitBreaker
+from civil_registry.core.ratelimit import LocalRateLimiter
+from civil_registry.core.ratelimit import RedisRateLimiter
+from civil_registry.core.ratelimit_simulation import DEFAULT_START
+from civil_registry.core.ratelimit_simulation import SlidingWindowLogRateLimiter
+from civil_registry.core.ratelimit_simulation import TraceEvent
+from civil_registry.core.ratelimit_simulation import counting_redis_client
+from civil_registry.core.ratelimit_simulation import load_trace
+from civil_registry.core.ratelimit_simulation import simulate
+from civil_registry.core.ratelimit_simulation import synthetic_trace
+from civil_registry.core.types import RateLimitStorage
+from civil_registry.core.utils import freeze_time
+
+
+def test_sliding_window_log():
+    limiter = SlidingWindowLogRateLimiter()
+    with freeze_time("2000-01-01") as clock:
+        assert not limiter.is_limited("foo", 2, window=10)
+        clock.shift(5)
+        assert not limiter.is_limited("foo", 2, window=10)
+        assert limiter.is_limited("foo", 2, window=10)
+        # A fixed window would have reset here, the first hit is still in range
+        clock.shift(4)
+        assert limiter.is_limited("foo", 2, window=10)
+        clock.shift(1)
+        assert not limiter.is_limited("foo", 2, window=10)
+
+
+def test_synthetic_trace():
+    trace = list(synthetic_trace(clients=5, rate=10, duration=10, seed=1))
+    assert trace == list(synthetic_trace(clients=5, rate=10, duration=10, seed=1))
+    assert trace == sorted(trace)
+    assert all(DEFAULT_START <= event.timestamp < DEFAULT_START + 10 for event in trace)
+    assert len({event.key for event in trace}) == 5  # noqa: PLR2004
+    assert 250 < len(trace) < 750  # noqa: PLR2004
+
+
+def test_load_trace():
+    file = io.StringIO(
+        "id,timestamp,user_id\n"
+        "2,2025-01-10T10:00:01+00:00,7\n"
+        "1,2025-01-10T10:00:00+00:00,7\n",
+    )
+    assert list(load_trace(file)) == [
+        TraceEvent(1736503200.0, "id-validate:{7}"),
+        TraceEvent(1736503201.0, "id-validate:{7}"),
+    ]
+
+
+def test_simulate_within_one_window():
+    trace = [TraceEvent(DEFAULT_START + i / 100, "foo") for i in range(20)]
+    result = simulate(LocalRateLimiter(), trace, limit=10, window=1)
+    assert result.decisions == 20  # noqa: PLR2004
+    assert result.accepted == 10  # noqa: PLR2004
+    assert result.accuracy == 1
+    assert result.redis_commands == 0
+
+
+def test_simulate_fixed_window_boundary():
+    # Bursts on both sides of a window boundary: the fixed window accepts
+    # both, the ideal limiter only the first
+    trace = [
+        *(TraceEvent(DEFAULT_START + 0.9, "foo") for _ in range(10)),
+        *(TraceEvent(DEFAULT_START + 1.1, "foo") for _ in range(10)),
+    ]
+    result = simulate(LocalRateLimiter(), trace, limit=10, window=1)
+    assert result.accepted == 20  # noqa: PLR2004
+    assert result.false_accepts == 10  # noqa: PLR2004
+    assert result.accuracy == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("storage", list(RateLimitStorage))
+def test_simulate_counts_redis_commands(storage):
+    client = counting_redis_client()
+    limiter = RedisRateLimiter(
+        storage=storage,
+        breaker=CircuitBreaker("test", probe=client.ping),
+        fallback=LocalRateLimiter(),
+    )
+    limiter.client = client
+    trace = list(synthetic_trace(clients=3, rate=5, duration=2))
+
+    result = simulate(limiter, trace, limit=10, window=1)
+    # MULTI, INCR or HINCRBY, EXPIRE, EXEC, plus the connection handshake
+    assert result.commands_per_decision == pytest.approx(4, abs=0.1)
+    assert result.decisions_per_second > 0
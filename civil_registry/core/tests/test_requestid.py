@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+
 def test_process_request_generates_request_id(requestid_middleware, requestid_request):
     requestid_middleware.process_request(requestid_request)
     assert hasattr(requestid_request, "request_id")
@@ -11,3 +14,13 @@ def test_process_request_uses_header_request_id(
     requestid_request.headers["X-Request-ID"] = "test-request-id"
     requestid_middleware.process_request(requestid_request)
     assert requestid_request.request_id == "test-request-id"
+
+
+def test_process_request_skips_uuid_with_header(
+    requestid_middleware,
+    requestid_request,
+):
+    requestid_request.headers["X-Request-ID"] = "test-request-id"
+    with patch("civil_registry.core.middleware.requestid.uuid.uuid4") as uuid4:
+        requestid_middleware.process_request(requestid_request)
+    uuid4.assert_not_called()
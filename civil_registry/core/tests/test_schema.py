@@ -0,0 +1,68 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from civil_registry.core.api.schema import CachedSpectacularAPIView
+
+
+@pytest.mark.django_db
+class TestCachedSpectacularAPIView:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        CachedSpectacularAPIView.clear_cache()
+        self.client = APIClient()
+        yield
+        CachedSpectacularAPIView.clear_cache()
+
+    def test_schema_is_generated_once(self):
+        with patch.object(
+            SchemaGenerator,
+            "get_schema",
+            autospec=True,
+            side_effect=SchemaGenerator.get_schema,
+        ) as get_schema:
+            first = self.client.get("/api/schema/")
+            second = self.client.get("/api/schema/")
+
+        assert first.status_code == status.HTTP_200_OK
+        assert first.content == second.content
+        assert b"/api/validate/" in first.content
+        get_schema.assert_called_once()
+
+    def test_formats_are_cached_separately(self):
+        yaml_response = self.client.get("/api/schema/", format="yaml")
+        json_response = self.client.get(
+            "/api/schema/",
+            headers={"accept": "application/vnd.oai.openapi+json"},
+        )
+        assert yaml_response["Content-Type"].startswith("application/vnd.oai.openapi")
+        assert json_response.json()["openapi"].startswith("3.")
+        assert yaml_response["ETag"] != json_response["ETag"]
+
+    def test_not_modified(self):
+        etag = self.client.get("/api/schema/")["ETag"]
+        response = self.client.get("/api/schema/", headers={"if-none-match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert not response.content
+
+    def test_serves_exported_schema(self, settings, tmp_path):
+        settings.API_SCHEMA_DIR = str(tmp_path)
+        call_command("export_schema")
+        (tmp_path / "schema.yaml").write_bytes(b"openapi: 3.0.3\n")
+
+        with patch.object(SchemaGenerator, "get_schema") as get_schema:
+            response = self.client.get("/api/schema/")
+
+        assert response.content == b"openapi: 3.0.3\n"
+        get_schema.assert_not_called()
+
+
+def test_export_schema(tmp_path):
+    call_command("export_schema", "--dir", str(tmp_path))
+    assert (tmp_path / "schema.yaml").read_bytes().startswith(b"openapi:")
+    assert (tmp_path / "schema.json").read_bytes().startswith(b"{")
@@ -0,0 +1,87 @@
+import fakeredis
+import pytest
+
+from civil_registry.core.circuitbreaker import CircuitBreaker
+from civil_registry.core.quotas import RedisQuotaTracker
+from civil_registry.core.ratelimit import LocalRateLimiter
+from civil_registry.core.ratelimit import RedisRateLimiter
+from civil_registry.core.sharding import RedisShards
+from civil_registry.core.sharding import routing_key
+from civil_registry.core.types import Quota
+
+
+@pytest.fixture
+def shards():
+    return RedisShards(
+        {
+            f"redis-{i}:6379/0": fakeredis.FakeStrictRedis(
+                server=fakeredis.FakeServer(),
+            )
+            for i in range(3)
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    ("key", "expected"),
+    [
+        ("id-validate:{42}", "42"),
+        ("id-validate:42", "id-validate:42"),
+        ("a:{}:{b}", "a:{}:{b}"),
+        (42, "42"),
+    ],
+)
+def test_routing_key(key, expected):
+    assert routing_key(key) == expected
+
+
+def test_keys_spread_over_servers(shards):
+    counts = dict.fromkeys(shards.clients, 0)
+    for i in range(3000):
+        name, _ = shards.get(f"user:{i}")
+        counts[name] += 1
+    assert all(count > 800 for count in counts.values())  # noqa: PLR2004
+
+
+def test_tagged_keys_share_a_server(shards):
+    for i in range(100):
+        assert shards.get(f"id-validate:{{{i}}}") == shards.get(i)
+
+
+def test_removing_a_server_only_moves_its_keys(shards):
+    removed = next(iter(shards.clients))
+    remaining = RedisShards(
+        {name: client for name, client in shards.clients.items() if name != removed},
+    )
+    for i in range(1000):
+        name, _ = shards.get(i)
+        if name != removed:
+            assert remaining.get(i)[0] == name
+
+
+def test_rate_limiter_routes_counters(shards):
+    rate_limiter = RedisRateLimiter(
+        breaker=CircuitBreaker("test", probe=lambda: True),
+        fallback=LocalRateLimiter(),
+    )
+    rate_limiter.shards = shards
+    quota = Quota(daily=100, monthly=3000)
+
+    for user_id in range(20):
+        limited, value, _, meta = rate_limiter.is_limited_with_quota(
+            f"id-validate:{{{user_id}}}",
+            limit=10,
+            quota_tracker=RedisQuotaTracker(client=rate_limiter.get_client(user_id)),
+            subject=user_id,
+            quota=quota,
+            window=60,
+        )
+        assert not limited
+        assert value == 1
+        assert meta.daily_used == 1
+
+    for user_id in range(20):
+        client = rate_limiter.get_client(user_id)
+        assert RedisQuotaTracker(client=client).usage(user_id, quota).daily_used == 1
+        assert rate_limiter.current_value(f"id-validate:{{{user_id}}}", window=60) == 1
+    assert all(client.dbsize() for client in shards.clients.values())
@@ -1,7 +1,19 @@
+import datetime
 from unittest.mock import Mock
 from unittest.mock import patch
 
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+
+from civil_registry.core.models import QuotaUsage
 from civil_registry.core.tasks import create_api_call_record
+from civil_registry.core.tasks import flush_quota_usage
+from civil_registry.core.tasks import validate_bulk_chunk
+from civil_registry.core.types import Quota
+from civil_registry.core.utils import freeze_time
+from config.celery_app import WORKER_PROFILES
+from config.celery_app import get_worker_profile
 
 
 @patch("civil_registry.core.tasks.ApiCall.objects.create")
@@ -31,3 +43,63 @@ def test_create_api_call_record_logging(api_call_data):
             api_call_data["request_id"],
         )
         mock_create.assert_called_once_with(**api_call_data)
+
+
+@pytest.mark.django_db
+def test_flush_quota_usage(quota_tracker):
+    with (
+        freeze_time("2000-01-01 12:00"),
+        patch(
+            "civil_registry.core.tasks.RedisQuotaTracker",
+            return_value=quota_tracker,
+        ),
+    ):
+        quota_tracker.increment("1", Quota(daily=100, monthly=3000))
+        assert flush_quota_usage() == 2  # noqa: PLR2004
+        quota_tracker.increment("1", Quota(daily=100, monthly=3000))
+        flush_quota_usage()
+
+    usage = QuotaUsage.objects.get(user_id=1, period=QuotaUsage.Period.DAY)
+    assert usage.period_start == datetime.date(2000, 1, 1)
+    assert usage.count == 2  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_failed_flush_is_retried(quota_tracker):
+    with (
+        freeze_time("2000-01-01 12:00"),
+        patch(
+            "civil_registry.core.tasks.RedisQuotaTracker",
+            return_value=quota_tracker,
+        ),
+    ):
+        quota_tracker.increment("1", Quota(daily=100, monthly=3000))
+        with (
+            patch(
+                "civil_registry.core.tasks.QuotaUsage.objects.bulk_create",
+                side_effect=DatabaseError,
+            ),
+            pytest.raises(DatabaseError),
+        ):
+            flush_quota_usage()
+        assert flush_quota_usage() == 2  # noqa: PLR2004
+
+    assert QuotaUsage.objects.get(user_id=1, period=QuotaUsage.Period.DAY).count == 1
+
+
+@pytest.mark.parametrize("task", [create_api_call_record, flush_quota_usage])
+def test_tracking_tasks_are_routed_to_tracking_queue(settings, task):
+    route = task.app.amqp.router.route({}, task.name)
+    assert route["queue"].name == settings.TRACKING_TASK_QUEUE
+    assert task.ignore_result
+
+
+def test_bulk_chunks_are_routed_to_the_bulk_job_queue(settings):
+    route = validate_bulk_chunk.app.amqp.router.route({}, validate_bulk_chunk.name)
+    assert route["queue"].name == settings.BULK_JOB_QUEUE
+
+
+def test_worker_profiles():
+    assert get_worker_profile("tracking") is WORKER_PROFILES["tracking"]
+    with pytest.raises(ImproperlyConfigured, match="expected one of: tracking"):
+        get_worker_profile("trakcing")
@@ -0,0 +1,125 @@
+import threading
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import Group
+from django.contrib.auth.models import User
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from civil_registry.core.models import RateLimitTier
+from civil_registry.core.tiers import LimitTier
+from civil_registry.core.tiers import TierCache
+from civil_registry.core.tiers import load_tiers
+from civil_registry.core.types import Quota
+from civil_registry.core.types import RateLimit
+from civil_registry.core.types import RateLimitCategory
+from civil_registry.core.utils import freeze_time
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="partner")
+
+
+def test_user_tier_wins_over_group_tiers(user):
+    group = Group.objects.create(name="partners")
+    user.groups.add(group)
+    RateLimitTier.objects.create(name="group", rate_limit=50).groups.add(group)
+    RateLimitTier.objects.create(name="premium", priority=10).groups.add(group)
+    assert load_tiers()[user.id].name == "premium"
+
+    RateLimitTier.objects.create(name="direct").users.add(user)
+    assert load_tiers()[user.id].name == "direct"
+
+
+def test_tier_overrides_only_its_limits():
+    tier = LimitTier(name="gold", concurrency_limit=50, daily_quota=1000)
+    default = RateLimit(limit=20, window=60)
+    assert tier.get_rate_limit(RateLimitCategory.USER, default) is default
+    assert tier.get_rate_limit(RateLimitCategory.CONCURRENCY, default) == RateLimit(
+        limit=50,
+        window=60,
+    )
+    assert tier.get_quota(Quota(daily=100, monthly=3000)) == Quota(
+        daily=1000,
+        monthly=3000,
+    )
+
+
+def test_lookups_are_served_from_memory(user, tier_cache, django_assert_num_queries):
+    RateLimitTier.objects.create(name="gold").users.add(user)
+    with django_assert_num_queries(3):
+        assert tier_cache.get(user.id).name == "gold"
+    with django_assert_num_queries(0):
+        assert tier_cache.get(user.id).name == "gold"
+        assert tier_cache.get(user.id + 1) is None
+
+
+def test_edits_invalidate_every_process(user, tier_cache, redis_client, wait_for):
+    tier = RateLimitTier.objects.create(name="gold")
+    assert tier_cache.get(user.id) is None
+
+    # Another process publishes the edit
+    tier.users.add(user)
+    redis_client.publish("ratelimit-tiers:invalidate", "")
+    wait_for(lambda: tier_cache._tiers is None)  # noqa: SLF001
+    assert tier_cache.get(user.id).name == "gold"
+
+
+def test_lookups_do_not_wait_for_the_subscription(user, wait_for):
+    subscribing = threading.Event()
+    unreachable = threading.Event()
+
+    def pubsub(**kwargs):
+        subscribing.set()
+        unreachable.wait()
+        raise RedisConnectionError
+
+    tier_cache = TierCache(Mock(pubsub=pubsub))
+    RateLimitTier.objects.create(name="gold").users.add(user)
+    assert tier_cache.get(user.id).name == "gold"
+    wait_for(subscribing.is_set)
+    assert tier_cache.get(user.id).name == "gold"
+
+    tier_cache.listener.stop()
+    unreachable.set()
+
+
+def test_edits_are_published_on_commit(
+    user,
+    tier_cache,
+    django_capture_on_commit_callbacks,
+):
+    assert tier_cache.get(user.id) is None
+    with django_capture_on_commit_callbacks(execute=True):
+        RateLimitTier.objects.create(name="gold").users.add(user)
+    assert tier_cache.get(user.id).name == "gold"
+
+
+def test_tier_rate_limit_applies(user, rate_limiter, api_client):
+    RateLimitTier.objects.create(name="trial", rate_limit=1).users.add(user)
+    client = api_client
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}",
+    )
+    with (
+        patch(
+            "civil_registry.core.api.views.RedisRateLimiter",
+            return_value=rate_limiter,
+        ),
+        freeze_time("2000-01-01"),
+    ):
+        statuses = [
+            client.post(
+                "/api/validate/",
+                {"id_number": "29001011234567"},
+                format="json",
+            ).status_code
+            for _ in range(2)
+        ]
+    assert statuses == [status.HTTP_200_OK, status.HTTP_429_TOO_MANY_REQUESTS]
@@ -0,0 +1,20 @@
+from unittest.mock import patch
+
+from django.urls import get_resolver
+
+from civil_registry.core.warmup import WARM_UP_PATHS
+from civil_registry.core.warmup import freeze
+from civil_registry.core.warmup import warm_up
+
+
+def test_warm_up_resolves_hot_paths():
+    warm_up()
+    for path in WARM_UP_PATHS:
+        assert get_resolver().resolve(path).url_name
+
+
+@patch("civil_registry.core.warmup.gc")
+def test_freeze_collects_then_freezes(gc):
+    freeze()
+    gc.collect.assert_called_once_with()
+    gc.freeze.assert_called_once_with()
@@ -0,0 +1,177 @@
+"""
+Rate limit tiers, resolved from an in-process copy of the ``RateLimitTier``
+assignments so looking up a user's tier costs no query.
+
+Each process loads every assignment at once, on first use, and keeps them
+until a tier or a user's groups are edited: the change is published on
+``TIERS_CHANNEL`` and a listener thread in every process drops its copy. The
+copy also expires after ``RATELIMIT_TIERS_CACHE_TIMEOUT`` seconds, in case an
+invalidation was missed while redis was unreachable.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from functools import cache
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from civil_registry.core.pubsub import InvalidationListener
+from civil_registry.core.pubsub import pubsub_client
+from civil_registry.core.types import Quota
+from civil_registry.core.types import RateLimit
+from civil_registry.core.types import RateLimitCategory
+
+if TYPE_CHECKING:
+    from redis import StrictRedis
+
+    from civil_registry.core.models import RateLimitTier
+
+TIERS_CHANNEL = "ratelimit-tiers:invalidate"
+
+
+@dataclass(frozen=True)
+class LimitTier:
+    name: str
+    rate_limit: RateLimit | None = None
+    concurrency_limit: int | None = None
+    daily_quota: int | None = None
+    monthly_quota: int | None = None
+
+    @classmethod
+    def from_model(cls, tier: RateLimitTier) -> LimitTier:
+        return cls(
+            name=tier.name,
+            rate_limit=RateLimit(limit=tier.rate_limit, window=tier.rate_limit_window)
+            if tier.rate_limit is not None
+            else None,
+            concurrency_limit=tier.concurrency_limit,
+            daily_quota=tier.daily_quota,
+            monthly_quota=tier.monthly_quota,
+        )
+
+    def get_rate_limit(
+        self,
+        category: RateLimitCategory,
+        default: RateLimit | None,
+    ) -> RateLimit | None:
+        if category == RateLimitCategory.USER and self.rate_limit is not None:
+            return self.rate_limit
+        if (
+            category == RateLimitCategory.CONCURRENCY
+            and self.concurrency_limit is not None
+            and default is not None
+        ):
+            # The view keeps its lease length
+            return RateLimit(limit=self.concurrency_limit, window=default.window)
+        return default
+
+    def get_quota(self, default: Quota) -> Quota:
+        return Quota(
+            daily=default.daily if self.daily_quota is None else self.daily_quota,
+            monthly=default.monthly
+            if self.monthly_quota is None
+            else self.monthly_quota,
+        )
+
+
+def load_tiers() -> dict[int, LimitTier]:
+    """Tier of every user with one, in three queries."""
+    from civil_registry.core.models import RateLimitTier
+
+    tiers = {tier.id: tier for tier in RateLimitTier.objects.all()}
+    # Ranked by (assigned directly, priority)
+    ranked: dict[int, tuple[tuple[bool, int], int]] = {}
+
+    def assign(user_id: int, tier_id: int, *, direct: bool) -> None:
+        rank = (direct, tiers[tier_id].priority)
+        if user_id not in ranked or rank > ranked[user_id][0]:
+            ranked[user_id] = (rank, tier_id)
+
+    for user_id, tier_id in RateLimitTier.users.through.objects.values_list(
+        "user_id",
+        "ratelimittier_id",
+    ):
+        assign(user_id, tier_id, direct=True)
+    for user_id, tier_id in (
+        get_user_model()
+        .groups.through.objects.filter(group__rate_limit_tiers__isnull=False)
+        .values_list("user_id", "group__rate_limit_tiers")
+    ):
+        assign(user_id, tier_id, direct=False)
+
+    limit_tiers = {
+        tier_id: LimitTier.from_model(tier) for tier_id, tier in tiers.items()
+    }
+    return {user_id: limit_tiers[tier_id] for user_id, (_, tier_id) in ranked.items()}
+
+
+class TierCache:
+    """
+    Per-process copy of the tier assignments, dropped on a message on
+    ``TIERS_CHANNEL`` or after ``timeout`` seconds.
+    """
+
+    def __init__(self, client: StrictRedis[str], timeout: float = 300) -> None:
+        self.client = client
+        self.timeout = timeout
+        self.listener = InvalidationListener(
+            client,
+            TIERS_CHANNEL,
+            on_message=lambda _: self.clear(),
+            on_missed=self.clear,
+        )
+        self._tiers: dict[int, LimitTier] | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int | str | None) -> LimitTier | None:
+        if user_id is None:
+            return None
+        self.listener.start()
+        tiers = self._tiers
+        if tiers is None or monotonic() - self._loaded_at > self.timeout:
+            tiers = self._load()
+        return tiers.get(int(user_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._tiers = None
+
+    def invalidate(self) -> None:
+        """Drop the copies of every process, call once the edit is committed."""
+        self.clear()
+        self.listener.publish()
+
+    def _load(self) -> dict[int, LimitTier]:
+        generation = self._generation
+        tiers = load_tiers()
+        with self._lock:
+            # Keep serving the fresh result, but don't cache it over a newer
+            # invalidation that arrived while loading
+            if generation == self._generation:
+                self._tiers = tiers
+                self._loaded_at = monotonic()
+        return tiers
+
+
+@cache
+def tier_cache() -> TierCache:
+    return TierCache(
+        pubsub_client(),
+        timeout=settings.RATELIMIT_TIERS_CACHE_TIMEOUT,
+    )
+
+
+def get_user_tier(user_id: int | str | None) -> LimitTier | None:
+    return tier_cache().get(user_id)
+
+
+def invalidate_tiers() -> None:
+    tier_cache().invalidate()
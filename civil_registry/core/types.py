@@ -1,10 +1,14 @@
+import datetime
 from dataclasses import dataclass
 from enum import Enum
+from enum import IntEnum
 
 
 class RateLimitCategory(str, Enum):
     IP = "ip"
     USER = "user"
+    # Requests in flight at once, the limit's window is the lease in seconds
+    CONCURRENCY = "concurrency"
 
 
 @dataclass
@@ -21,6 +25,22 @@ class RateLimit:
     window: int
 
 
+class RateLimitStorage(str, Enum):
+    """How ``RedisRateLimiter`` lays out its counters in redis"""
+
+    KEYS = "keys"
+    HASH = "hash"
+
+
+class RequestPriority(IntEnum):
+    """Order in which ``LoadSheddingMiddleware`` drops requests, lowest first"""
+
+    # Expensive requests, e.g. streams and exports
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+
 class RateLimitType(Enum):
     NOT_LIMITED = "not_limited"
     FIXED_WINDOW = "fixed_window"
@@ -47,3 +67,71 @@ class RateLimitMeta:
     window: int
     group: str
     reset_time: int
+
+
+@dataclass
+class Quota:
+    """Dataclass for defining a usage quota
+
+    Attributes:
+        daily (int): Max number of requests allowed per calendar day
+        monthly (int): Max number of requests allowed per calendar month
+
+    """
+
+    daily: int
+    monthly: int
+
+
+@dataclass
+class QuotaMeta:
+    """
+    Quota response metadata
+
+    Attributes:
+        is_exceeded (bool): request is over the daily or the monthly quota
+        daily_used (int): number of requests done today
+        daily_remaining (int): number of requests left today
+        monthly_used (int): number of requests done this month
+        monthly_remaining (int): number of requests left this month
+    """
+
+    is_exceeded: bool
+    daily_used: int
+    daily_remaining: int
+    monthly_used: int
+    monthly_remaining: int
+
+
+class NationalIDErrorCode(str, Enum):
+    REQUIRED = "required"
+    INVALID_FORMAT = "invalid_format"
+    INVALID_CENTURY = "invalid_century"
+    INVALID_BIRTH_DATE = "invalid_birth_date"
+    INVALID_GOVERNORATE = "invalid_governorate"
+
+
+@dataclass(frozen=True, slots=True)
+class NationalIDResult:
+    """
+    Outcome of parsing a national ID
+
+    Attributes:
+        id_number (str): the ID as given, stripped of surrounding whitespace
+        error (NationalIDErrorCode | None): why the ID is invalid, None if valid
+        detail (str): human readable error message, empty if valid
+        birth_date (datetime.date | None): decoded birth date
+        governorate (str | None): decoded governorate name
+        gender (str | None): decoded gender
+    """
+
+    id_number: str
+    error: NationalIDErrorCode | None = None
+    detail: str = ""
+    birth_date: datetime.date | None = None
+    governorate: str | None = None
+    gender: str | None = None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None
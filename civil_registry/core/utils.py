@@ -2,11 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime
 from hashlib import md5 as _md5
+from typing import TYPE_CHECKING
 from typing import Any
 
-import time_machine
 from django.utils.encoding import force_bytes
 
+if TYPE_CHECKING:
+    import time_machine
+
 
 def md5_text(*args: Any):
     m = _md5()  # noqa: S324
@@ -16,6 +19,9 @@ def md5_text(*args: Any):
 
 
 def freeze_time(t: str | datetime | None = None) -> time_machine.travel:
+    # Test helper: time_machine pulls in pytest, keep it out of server boot
+    import time_machine
+
     if t is None:
         t = datetime.now(datetime.UTC)
     return time_machine.travel(t, tick=False)
@@ -0,0 +1,50 @@
+"""
+Work done once in the parent process before workers are forked.
+
+Anything imported, compiled or cached here is shared copy-on-write by every
+worker instead of being rebuilt by each of them on its first request.
+"""
+
+import gc
+import json
+
+import msgpack
+from django.urls import get_resolver
+from django.utils import timezone
+
+# Hot API routes, resolving them imports the views and everything they use
+WARM_UP_PATHS = (
+    "/api/validate/",
+    "/api/validate/29001011234567/",
+    "/api/validate/stream/",
+    "/api/quota/",
+)
+
+
+def warm_up() -> None:
+    """Needs the app registry to be ready."""
+    from civil_registry.core.api.serializers import national_id_result_data
+    from civil_registry.core.models import EgyptianNationalID
+
+    resolver = get_resolver()
+    for path in WARM_UP_PATHS:
+        resolver.resolve(path)
+
+    # Loads the zoneinfo data used for quota periods and the date tables used
+    # by the ID parser, and primes the encoders used for responses
+    timezone.localtime()
+    data = national_id_result_data(EgyptianNationalID.parse("29001011234567"))
+    json.loads(json.dumps(data))
+    msgpack.unpackb(msgpack.packb(data))
+
+
+def freeze() -> None:
+    """
+    Move every object alive now out of reach of the garbage collector.
+
+    A collection writes to the header of each object it visits, which copies
+    the page it lives on into the worker. Frozen objects are never visited,
+    so the pages loaded before the fork stay shared.
+    """
+    gc.collect()
+    gc.freeze()
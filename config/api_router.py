@@ -1,7 +1,47 @@
 from django.urls import path
 
+from civil_registry.core.api.views import ApiCallExportView
+from civil_registry.core.api.views import ApiCallListView
+from civil_registry.core.api.views import APIKeyListView
+from civil_registry.core.api.views import APIKeyRevokeView
+from civil_registry.core.api.views import BulkJobDetailView
+from civil_registry.core.api.views import BulkJobListView
+from civil_registry.core.api.views import BulkJobResultsView
+from civil_registry.core.api.views import NationalIDLookupView
+from civil_registry.core.api.views import NationalIDStreamView
 from civil_registry.core.api.views import NationalIDView
+from civil_registry.core.api.views import QuotaView
 
 urlpatterns = [
     path("validate/", NationalIDView.as_view(), name="validate_national_id"),
+    path(
+        "validate/stream/",
+        NationalIDStreamView.as_view(),
+        name="validate_national_id_stream",
+    ),
+    path(
+        "validate/<str:id_number>/",
+        NationalIDLookupView.as_view(),
+        name="lookup_national_id",
+    ),
+    path("quota/", QuotaView.as_view(), name="quota"),
+    path("jobs/", BulkJobListView.as_view(), name="bulk_job_list"),
+    path("jobs/<uuid:pk>/", BulkJobDetailView.as_view(), name="bulk_job_detail"),
+    path(
+        "jobs/<uuid:pk>/results/",
+        BulkJobResultsView.as_view(),
+        name="bulk_job_results",
+    ),
+    path("api-keys/", APIKeyListView.as_view(), name="api_key_list"),
+    path(
+        "api-keys/<str:prefix>/",
+        APIKeyRevokeView.as_view(),
+        name="api_key_revoke",
+    ),
+    path("api-calls/", ApiCallListView.as_view(), name="api_call_list"),
+    path(
+        "api-calls/export/",
+        ApiCallExportView.as_view(),
+        name="api_call_export",
+    ),
 ]
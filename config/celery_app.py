@@ -1,6 +1,8 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_init
+from django.core.exceptions import ImproperlyConfigured
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
@@ -13,5 +15,52 @@ app = Celery("civil_registry")
 #   should have a `CELERY_` prefix.
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
+# Worker profiles, picked with the CELERY_WORKER_PROFILE environment variable.
+# They override the settings for workers dedicated to one kind of work, e.g.
+#   CELERY_WORKER_PROFILE=tracking celery -A config.celery_app worker -Q tracking
+# with TRACKING_TASK_QUEUE=tracking set for the web servers and the beat.
+WORKER_PROFILES = {
+    # Tracking tasks are a single INSERT spent waiting on Postgres: run many of
+    # them in threads and ack them as they start rather than once done. A crash
+    # loses the records in progress, up to 32 (worker_concurrency), which is
+    # cheaper than redelivering them. The rest of the 128 prefetched
+    # (worker_concurrency * worker_prefetch_multiplier) aren't acked yet and
+    # get redelivered.
+    # Every thread keeps its own Postgres connection for CONN_MAX_AGE, budget
+    # 32 connections per tracking worker in max_connections (or set
+    # CONN_MAX_AGE=0 for these workers, at the cost of a connect per record).
+    "tracking": {
+        "worker_pool": "threads",
+        "worker_concurrency": 32,
+        "worker_prefetch_multiplier": 4,
+        "task_acks_late": False,
+        "worker_send_task_events": False,
+    },
+}
+
+
+def get_worker_profile(name):
+    try:
+        return WORKER_PROFILES[name]
+    except KeyError:
+        msg = (
+            f"Unknown CELERY_WORKER_PROFILE {name!r}, "
+            f"expected one of: {', '.join(WORKER_PROFILES)}"
+        )
+        raise ImproperlyConfigured(msg) from None
+
+
+if profile := os.environ.get("CELERY_WORKER_PROFILE"):
+    app.conf.update(get_worker_profile(profile))
+
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
+
+
+@worker_init.connect
+def freeze_before_fork(**kwargs):
+    # The prefork pool forks its children after this signal, keep the loaded
+    # tasks and Django state shared with them
+    from civil_registry.core.warmup import freeze
+
+    freeze()
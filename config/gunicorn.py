@@ -0,0 +1,26 @@
+"""
+Gunicorn settings, used with ``gunicorn -c config/gunicorn.py config.wsgi``.
+
+The app is loaded and warmed up once in the master (see ``config.wsgi``) and
+frozen out of the garbage collector's reach before the workers are forked, so
+they boot without importing anything and share its memory copy-on-write.
+
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1),
+)
+preload_app = os.environ.get("GUNICORN_PRELOAD_APP", "true").lower() == "true"
+
+
+def pre_fork(server, worker):
+    # Only worth doing when the master holds the loaded app
+    if preload_app:
+        from civil_registry.core.warmup import freeze
+
+        freeze()
@@ -43,6 +43,10 @@ DATABASES = {
     ),
 }
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# https://docs.djangoproject.com/en/dev/ref/settings/#conn-max-age
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+# https://docs.djangoproject.com/en/dev/ref/settings/#conn-health-checks
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -79,18 +83,21 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 
+# Browser oriented middleware is swapped for the apiexempt variants, which
+# skip requests under /api/ (token authenticated, no sessions or CSRF).
 MIDDLEWARE = [
     "civil_registry.core.middleware.requestid.RequestIDMiddleware",
+    "civil_registry.core.middleware.loadshed.LoadSheddingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "civil_registry.core.middleware.apiexempt.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "civil_registry.core.middleware.apiexempt.CsrfViewMiddleware",
+    "civil_registry.core.middleware.apiexempt.AuthenticationMiddleware",
     "civil_registry.core.middleware.apitrack.APICallTrackingMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "civil_registry.core.middleware.apiexempt.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.locale.LocaleMiddleware",
+    "civil_registry.core.middleware.apiexempt.LocaleMiddleware",
 ]
 
 
@@ -187,6 +194,56 @@ LOGGING = {
 REDIS_URL = env("REDIS_URL", default="redis://redis:6379/0")
 REDIS_SSL = REDIS_URL.startswith("rediss://")
 
+# Rate limiting, see civil_registry.core.ratelimit.RedisRateLimiter
+# ------------------------------------------------------------------------------
+# Redis servers of the rate limiter and quota counters, comma separated. Keys
+# are spread over them by consistent hashing. Defaults to REDIS_URL, which is
+# shared with Celery, give the limiter servers of its own under load.
+RATELIMIT_REDIS_URLS = env.list("RATELIMIT_REDIS_URLS", default=[REDIS_URL])
+# Counter layout, "hash" (compact, counters grouped in RATELIMIT_HASH_SHARDS
+# hashes per window) or "keys" (one key per counter). Keep active clients per
+# window / shards under redis' hash-max-listpack-entries (128 by default).
+RATELIMIT_STORAGE = env("RATELIMIT_STORAGE", default="hash")
+RATELIMIT_HASH_SHARDS = env.int("RATELIMIT_HASH_SHARDS", default=1024)
+# Seconds a rate limit check waits on redis before counting as failed
+RATELIMIT_REDIS_SOCKET_TIMEOUT = env.float(
+    "RATELIMIT_REDIS_SOCKET_TIMEOUT",
+    default=0.1,
+)
+# Consecutive failed or slow checks that trip the circuit breaker, and how slow
+# (seconds) counts as failed. While tripped, limits are enforced in memory and
+# redis is probed every RATELIMIT_BREAKER_PROBE_INTERVAL seconds.
+RATELIMIT_BREAKER_FAILURE_THRESHOLD = env.int(
+    "RATELIMIT_BREAKER_FAILURE_THRESHOLD",
+    default=5,
+)
+RATELIMIT_BREAKER_LATENCY_THRESHOLD = env.float(
+    "RATELIMIT_BREAKER_LATENCY_THRESHOLD",
+    default=0.05,
+)
+RATELIMIT_BREAKER_PROBE_INTERVAL = env.float(
+    "RATELIMIT_BREAKER_PROBE_INTERVAL",
+    default=1.0,
+)
+# Processes sharing the traffic, the in-memory fallback divides limits by it
+RATELIMIT_FALLBACK_PROCESSES = env.int("RATELIMIT_FALLBACK_PROCESSES", default=1)
+# Seconds each process keeps its copy of the RateLimitTier assignments. Edits
+# are also published on REDIS_URL to drop the copies right away.
+RATELIMIT_TIERS_CACHE_TIMEOUT = env.int("RATELIMIT_TIERS_CACHE_TIMEOUT", default=300)
+
+# Load shedding, see civil_registry.core.middleware.loadshed
+# ------------------------------------------------------------------------------
+LOADSHED_ENABLED = env.bool("LOADSHED_ENABLED", default=True)
+# Seconds a request may have waited since the proxy's X-Request-Start before it
+# is dropped unprocessed, set it to about the clients' timeout
+LOADSHED_MAX_QUEUE_TIME = env.float("LOADSHED_MAX_QUEUE_TIME", default=10.0)
+# Average queue time and response time (seconds) past which requests are
+# dropped by priority
+LOADSHED_TARGET_QUEUE_TIME = env.float("LOADSHED_TARGET_QUEUE_TIME", default=0.5)
+LOADSHED_TARGET_LATENCY = env.float("LOADSHED_TARGET_LATENCY", default=1.0)
+# Users served ahead of others under load
+LOADSHED_PRIORITY_USER_IDS = env.list("LOADSHED_PRIORITY_USER_IDS", default=[])
+
 
 # Celery
 # ------------------------------------------------------------------------------
@@ -222,10 +279,49 @@ CELERY_TASK_TIME_LIMIT = 5 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 60
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-scheduler
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-schedule
+CELERY_BEAT_SCHEDULE = {
+    "flush-quota-usage": {
+        "task": "civil_registry.core.tasks.flush_quota_usage",
+        "schedule": env.int("QUOTA_FLUSH_INTERVAL", default=60),
+    },
+    "delete-expired-bulk-jobs": {
+        "task": "civil_registry.core.tasks.delete_expired_bulk_jobs",
+        "schedule": 60 * 60,
+    },
+}
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-send-task-events
-CELERY_WORKER_SEND_TASK_EVENTS = True
+CELERY_WORKER_SEND_TASK_EVENTS = env.bool(
+    "CELERY_WORKER_SEND_TASK_EVENTS",
+    default=True,
+)
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std-setting-task_send_sent_event
-CELERY_TASK_SEND_SENT_EVENT = True
+# One extra event per published task, only useful when monitoring the broker side
+CELERY_TASK_SEND_SENT_EVENT = env.bool("CELERY_TASK_SEND_SENT_EVENT", default=False)
+# Tracking tasks are tiny and best effort. Set their queue to e.g. "tracking",
+# served by workers with the tracking profile of config/celery_app.py, so a
+# backlog never delays other work. By default they stay on celery's default
+# queue, which a plain worker consumes.
+TRACKING_TASK_QUEUE = env("TRACKING_TASK_QUEUE", default="celery")
+# Bulk validation chunks, spread over the workers of every node. Set to e.g.
+# "bulk" to run them on dedicated workers, celery's default queue otherwise.
+BULK_JOB_QUEUE = env("BULK_JOB_QUEUE", default="celery")
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-routes
+CELERY_TASK_ROUTES = {
+    "civil_registry.core.tasks.create_api_call_record": {"queue": TRACKING_TASK_QUEUE},
+    "civil_registry.core.tasks.flush_quota_usage": {"queue": TRACKING_TASK_QUEUE},
+    "civil_registry.core.tasks.validate_bulk_chunk": {"queue": BULK_JOB_QUEUE},
+}
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-prefetch-multiplier
+CELERY_WORKER_PREFETCH_MULTIPLIER = env.int(
+    "CELERY_WORKER_PREFETCH_MULTIPLIER",
+    default=4,
+)
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-pool
+# "prefork", "threads" or "gevent" (the latter needs gevent installed)
+CELERY_WORKER_POOL = env("CELERY_WORKER_POOL", default="prefork")
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-disable-rate-limits
+CELERY_WORKER_DISABLE_RATE_LIMITS = True
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -263,6 +359,33 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# https://docs.djangoproject.com/en/5.0/ref/settings/#std-setting-STORAGES
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    # Input and result chunks of bulk validation jobs, see civil_registry.core.bulk.
+    # Every Celery node reads and writes them: use a shared volume or an object
+    # store backend when running workers on several machines.
+    "bulk_jobs": {
+        "BACKEND": env(
+            "BULK_JOBS_STORAGE_BACKEND",
+            default="django.core.files.storage.FileSystemStorage",
+        ),
+        "OPTIONS": {
+            "location": env(
+                "BULK_JOBS_STORAGE_DIR",
+                default=str(BASE_DIR / "bulk_jobs"),
+            ),
+        },
+    },
+}
+# IDs per bulk validation task
+BULK_JOB_CHUNK_SIZE = env.int("BULK_JOB_CHUNK_SIZE", default=10_000)
+# Days bulk jobs and their files are kept once finished
+BULK_JOB_RETENTION_DAYS = env.int("BULK_JOB_RETENTION_DAYS", default=7)
+
 
 # django-rest-framework
 # -------------------------------------------------------------------------------
@@ -271,12 +394,32 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
         "rest_framework.authentication.TokenAuthentication",
+        "civil_registry.core.api.authentication.APIKeyAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "civil_registry.core.api.renderers.MessagePackRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+        "civil_registry.core.api.parsers.MessagePackParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "EXCEPTION_HANDLER": "civil_registry.core.exceptions.custom_exception_handler",
     "NON_FIELD_ERRORS_KEY": "detail",
 }
+# Seconds a DRF token lookup is served from the cache, see
+# civil_registry.core.api.authentication.CachedTokenAuthentication
+AUTH_TOKEN_CACHE_TIMEOUT = env.int("AUTH_TOKEN_CACHE_TIMEOUT", default=60)
+# Verified API keys each process keeps in memory, and for how many seconds.
+# Revoked keys are dropped right away through pub/sub on REDIS_URL, see
+# civil_registry.core.api.authentication.APIKeyAuthentication
+API_KEY_CACHE_SIZE = env.int("API_KEY_CACHE_SIZE", default=10_000)
+API_KEY_CACHE_TIMEOUT = env.int("API_KEY_CACHE_TIMEOUT", default=300)
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
@@ -297,3 +440,7 @@ SPECTACULAR_SETTINGS = {
     "SERVE_PERMISSIONS": ["rest_framework.permissions.AllowAny"],
     "SCHEMA_PATH_PREFIX": "/api/",
 }
+# Directory with the output of `manage.py export_schema`. When set, api/schema/
+# serves those files instead of generating the schema at runtime, see
+# civil_registry.core.api.schema.CachedSpectacularAPIView
+API_SCHEMA_DIR = env("API_SCHEMA_DIR", default=None)
@@ -1,12 +1,13 @@
 from django.contrib import admin
 from django.urls import include
 from django.urls import path
-from drf_spectacular.views import SpectacularAPIView
 from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework.authtoken.views import obtain_auth_token
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from civil_registry.core.api.schema import CachedSpectacularAPIView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
 ]
@@ -19,7 +20,7 @@ urlpatterns += [
     path("api/auth-token/", obtain_auth_token),
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+    path("api/schema/", CachedSpectacularAPIView.as_view(), name="api-schema"),
     path(
         "api/docs/",
         SpectacularSwaggerView.as_view(url_name="api-schema"),
@@ -11,6 +11,12 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "national_identity.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
 
 application = get_wsgi_application()
+
+# Needs the app registry populated by get_wsgi_application()
+from civil_registry.core.warmup import warm_up  # noqa: E402
+
+# With gunicorn's preload_app this runs once in the master, see config/gunicorn.py
+warm_up()